@@ -1,39 +1,53 @@
-from flask import Flask
+from flask import Flask, g, request
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_bcrypt import Bcrypt
 from config import config
+from app.assets import init_assets
+from app.json_provider import FastJSONProvider
+from app.engine_profile import configure_engine_options, install_sqlite_pragmas
+from app.db_routing import RoutingSession, configure_read_bind, init_db_routing
+from app.metrics import Metrics
+from app.page_cache import PageCache
+from app.query_budget import init_query_budgets
+from app.services.water_coalescer import WaterCoalescer
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 migrate = Migrate()
 bcrypt = Bcrypt()
+water_coalescer = WaterCoalescer()
+metrics = Metrics()
+page_cache = PageCache()
 
 def create_app(config_name='default'):
     """Application factory function"""
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config.from_object(config[config_name])
 
-    # Enable template auto-reload and disable caching in development
+    # Enable template auto-reload and disable caching of unfingerprinted files in development
     if app.config.get('DEBUG', False):
         app.config['TEMPLATES_AUTO_RELOAD'] = True
         app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
-
-        @app.after_request
-        def add_no_cache_headers(response):
-            response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-            response.headers['Pragma'] = 'no-cache'
-            response.headers['Expires'] = '0'
-            return response
     
     # Initialize extensions with app
+    configure_engine_options(app)
+    configure_read_bind(app)
     db.init_app(app)
+    install_sqlite_pragmas(app, db)
+    init_db_routing(app, db)
     jwt.init_app(app)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
+    water_coalescer.init_app(app)
+    metrics.init_app(app, db)
+    init_query_budgets(app, db)
+    init_assets(app)
+    page_cache.init_app(app)
     CORS(app)
     
     # JWT error handlers
@@ -52,7 +66,28 @@ def create_app(config_name='default'):
     @jwt.needs_fresh_token_loader
     def token_not_fresh_callback(jwt_header, jwt_payload):
         return {'error': 'Fresh token required'}, 401
-    
+
+    # Deleted accounts are deactivated before their data is purged. Their
+    # tokens may still read (e.g. the deletion status) until they expire,
+    # but writing would leave rows behind the purge.
+    @jwt.token_in_blocklist_loader
+    def deactivated_user_callback(jwt_header, jwt_payload):
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return False
+        # Tokens can be verified twice per request (view, then cache invalidation)
+        revoked = g.get('jwt_user_revoked')
+        if revoked is None:
+            from app.models.user import User
+            is_active = db.session.execute(
+                db.select(User.is_active).where(User.id == int(jwt_payload['sub']))
+            ).first()
+            revoked = g.jwt_user_revoked = is_active is None or is_active[0] is False
+        return revoked
+
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return {'error': 'Account has been deactivated'}, 401
+
     # Register blueprints
     from app.routes.auth import auth_bp
     from app.routes.user import user_bp
@@ -61,6 +96,10 @@ def create_app(config_name='default'):
     from app.routes.resources import resources_bp
     from app.routes.nutrition import nutrition_bp
     from app.routes.activities import activities_bp
+    from app.routes.dashboard import dashboard_bp
+    from app.routes.admin import admin_bp
+    from app.routes.calendar import calendar_bp
+    from app.routes.pages import pages_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(user_bp, url_prefix='/api/user')
@@ -69,9 +108,33 @@ def create_app(config_name='default'):
     app.register_blueprint(resources_bp, url_prefix='/api/resources')
     app.register_blueprint(nutrition_bp, url_prefix='/api/nutrition')
     app.register_blueprint(activities_bp, url_prefix='/api/activities')
+    app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(calendar_bp, url_prefix='/api/calendar')
+    app.register_blueprint(pages_bp)
+    
+    # Drop a user's cached dashboard sections once they write
+    from app.services.dashboard import init_dashboard_cache
+    init_dashboard_cache(app, db)
+    
+    # Register CLI commands
+    from app.schema import ensure_schema, init_db_command
+    from app.services.account_purge import purge_accounts_command
+    from app.services.daily_features import rebuild_daily_features_command
+    from app.services.cohort_stats import cohort_stats_command
+    from app.services.mood_anomalies import rebuild_mood_baselines_command
+    from app.services.mood_forecast import fit_mood_forecasts_command
+    from app.services.streaks import rebuild_streaks_command
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(purge_accounts_command)
+    app.cli.add_command(rebuild_daily_features_command)
+    app.cli.add_command(cohort_stats_command)
+    app.cli.add_command(rebuild_mood_baselines_command)
+    app.cli.add_command(fit_mood_forecasts_command)
+    app.cli.add_command(rebuild_streaks_command)
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # Check the schema version (one row read) instead of reflecting tables
+    if app.config.get('SCHEMA_CHECK_ON_STARTUP', True):
+        ensure_schema(app)
     
     return app 
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""Fingerprinted static assets
+
+Templates call ``asset_url('app.css')`` and get ``/assets/app.<hash>.css``,
+where the hash is taken from the file's content. Because the URL changes
+whenever the content does, those responses are cached for a year and marked
+immutable. Files are served with conditional and Range support, so the audio
+can seek without downloading the whole file again.
+"""
+
+import hashlib
+import os
+import re
+import threading
+
+from flask import abort, current_app, request, send_from_directory, url_for
+from werkzeug.security import safe_join
+
+FINGERPRINT_LENGTH = 12
+_FINGERPRINTED = re.compile(r'^(?P<stem>.+)\.(?P<digest>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % FINGERPRINT_LENGTH)
+
+
+class AssetManifest:
+    """Content hashes of files in the static folder, computed on first use"""
+
+    def __init__(self, static_folder, watch=False):
+        self.static_folder = static_folder
+        self.watch = watch
+        self._lock = threading.Lock()
+        self._digests = {}
+
+    def digest(self, filename):
+        path = safe_join(self.static_folder, filename)
+        if path is None:
+            # Escapes the static folder: never read it or remember the name
+            raise FileNotFoundError(filename)
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self._digests.get(filename)
+        if cached and (not self.watch or cached[0] == mtime):
+            return cached[1]
+
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()[:FINGERPRINT_LENGTH]
+        with self._lock:
+            self._digests[filename] = (mtime, digest)
+        return digest
+
+    def fingerprinted(self, filename):
+        stem, ext = os.path.splitext(filename)
+        return f'{stem}.{self.digest(filename)}{ext}'
+
+
+def asset_url(filename, **values):
+    """URL of ``filename`` in the static folder with its content hash in the name"""
+    manifest = current_app.extensions['assets']
+    return url_for('assets', filename=manifest.fingerprinted(filename), **values)
+
+
+def serve_asset(filename):
+    manifest = current_app.extensions['assets']
+    match = _FINGERPRINTED.match(filename)
+    if not match:
+        abort(404)
+    original = match.group('stem') + match.group('ext')
+    try:
+        current = manifest.digest(original)
+    except OSError:
+        abort(404)
+
+    response = send_from_directory(manifest.static_folder, original, conditional=True)
+    # Advertise Range support up front so media elements seek with partial requests
+    response.headers['Accept-Ranges'] = 'bytes'
+    if match.group('digest') == current:
+        max_age = current_app.config.get('ASSET_MAX_AGE', 31536000)
+        response.headers['Cache-Control'] = f'public, max-age={max_age}, immutable'
+    else:
+        # A page from an older deploy asked for content that has since changed
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def init_assets(app):
+    """Register the /assets route, the ``asset_url`` template helper and API no-store"""
+    app.extensions['assets'] = AssetManifest(app.static_folder, watch=app.debug)
+    app.add_url_rule('/assets/<path:filename>', 'assets', serve_asset)
+    app.add_template_global(asset_url)
+
+    @app.after_request
+    def no_store_api_responses(response):
+        # Views that validate with an ETag choose their own caching
+        if 'Cache-Control' in response.headers or response.get_etag()[0]:
+            return response
+        if request.path.startswith('/api/'):
+            response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
+            response.headers['Pragma'] = 'no-cache'
+            response.headers['Expires'] = '0'
+        return response
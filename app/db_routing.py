@@ -0,0 +1,99 @@
+"""Read/write routing between the primary database and an optional read bind
+
+Views decorated with ``read_only`` send their queries to the ``read`` bind
+(a read-only connection to the SQLite file, or a replica URL) when one is
+configured. Everything else, and any session that has written, stays on
+the primary. Clients that wrote recently are pinned to the primary with a
+short-lived cookie so they read their own writes on any worker.
+"""
+
+from functools import wraps
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+READ_BIND = 'read'
+PIN_COOKIE = 'db_primary_pin'
+
+
+class RoutingSession(Session):
+    """Session that sends reads from ``read_only`` views to the read bind"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_read_bind():
+            return self._db.engines[READ_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_read_bind(self):
+        if self.info.get('wrote') or not has_request_context():
+            return False
+        if not g.get('db_read_only') or PIN_COOKIE in request.cookies:
+            return False
+        return READ_BIND in self._db.engines
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _mark_flush_as_write(session, flush_context, instances):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_bulk_statement_as_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+
+def read_only(view):
+    """Route a view's queries to the read bind when one is configured"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def sqlite_read_only_uri(uri):
+    """``mode=ro`` URI for a SQLite database file, or None for anything else"""
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    return f"sqlite:///file:{url.database}?mode=ro&uri=true"
+
+
+def configure_read_bind(app):
+    """Add the ``read`` bind from SQLALCHEMY_READ_DATABASE_URI
+
+    ``auto`` opens the primary SQLite file with ``mode=ro``, which in WAL
+    mode reads concurrently with the writer. Must run before ``db.init_app``.
+    """
+    read_uri = app.config.get('SQLALCHEMY_READ_DATABASE_URI')
+    if not read_uri:
+        return
+
+    if read_uri == 'auto':
+        read_uri = sqlite_read_only_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+        if read_uri is None:
+            return
+
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    binds.setdefault(READ_BIND, read_uri)
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+
+def init_db_routing(app, db):
+    """Pin clients that just wrote to the primary for READ_YOUR_WRITES_SECONDS"""
+    if READ_BIND not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        return
+
+    @app.after_request
+    def pin_writers_to_primary(response):
+        if db.session.registry.has() and db.session.info.get('wrote'):
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=app.config.get('READ_YOUR_WRITES_SECONDS', 5),
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
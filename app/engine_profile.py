@@ -0,0 +1,69 @@
+"""Database engine profile: pool settings and SQLite connection pragmas"""
+
+from sqlalchemy import event
+
+POOL_OPTIONS = {
+    'DB_POOL_SIZE': 'pool_size',
+    'DB_MAX_OVERFLOW': 'max_overflow',
+    'DB_POOL_TIMEOUT': 'pool_timeout',
+    'DB_POOL_RECYCLE': 'pool_recycle',
+    'DB_POOL_PRE_PING': 'pool_pre_ping',
+}
+
+
+def is_sqlite(uri):
+    return bool(uri) and uri.startswith('sqlite')
+
+
+def configure_engine_options(app):
+    """Apply DB_POOL_* settings for server databases
+
+    Must run before ``db.init_app`` because Flask-SQLAlchemy builds its
+    engines there. SQLite keeps the pool Flask-SQLAlchemy picks for it.
+    """
+    if is_sqlite(app.config.get('SQLALCHEMY_DATABASE_URI')):
+        return
+
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    for config_key, option in POOL_OPTIONS.items():
+        value = app.config.get(config_key)
+        if value is not None:
+            options.setdefault(option, value)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def install_sqlite_pragmas(app, db):
+    """Run SQLITE_PRAGMAS on every new connection of each SQLite engine"""
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    if not pragmas:
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name != 'sqlite':
+                continue
+
+            engine_pragmas = pragmas
+            if engine.url.query.get('mode') == 'ro':
+                # A read-only connection cannot change the journal mode
+                engine_pragmas = {k: v for k, v in pragmas.items() if k != 'journal_mode'}
+
+            _listen_for_connect(engine, engine_pragmas)
+
+
+def _listen_for_connect(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Execute ``PRAGMA key=value`` for each configured pragma"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if value is None:
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
@@ -0,0 +1,67 @@
+"""JSON provider that uses orjson when it is installed
+
+orjson encodes datetime, date, time, UUID and dataclass values natively,
+so views can hand it model values without pre-formatting them. Without
+orjson the standard library encoder is used. Either way dates and times
+are written as ISO 8601, the format ``to_dict()`` already uses, instead of
+Flask's default HTTP date strings.
+"""
+
+import datetime
+import decimal
+
+from flask.json.provider import DefaultJSONProvider, _default as _flask_default
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    # ISO 8601, matching to_dict() and orjson, rather than Flask's HTTP dates
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    return _flask_default(obj)
+
+
+def _orjson_default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson when available"""
+
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        # Callers asking for stdlib-specific options get the stdlib encoder
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._orjson_dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._orjson_dumps(obj, pretty=pretty) + b'\n', mimetype=self.mimetype
+        )
+
+    def _orjson_dumps(self, obj, pretty=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_orjson_default, option=option)
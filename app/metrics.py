@@ -0,0 +1,337 @@
+"""Per-endpoint latency, response size, status and SQL metrics
+
+Every request records its latency, response size, status code and the
+number and total time of SQL statements it ran (via cursor execute
+events). ``/metrics`` renders them in the Prometheus text format.
+
+With ``METRICS_DIR`` set, each worker process periodically writes its
+counters to ``METRICS_DIR/metrics-<pid>.json`` and ``/metrics`` sums all
+of them, so any gunicorn worker can answer for the whole server. When a
+worker exits, the master folds its snapshot into ``metrics-totals.json``
+and deletes it (``retire_snapshot``), so recycled workers do not leave an
+ever-growing number of files behind.
+
+``/metrics`` exposes endpoint names and traffic volumes, so it is not
+public: scrapers send ``Authorization: Bearer <METRICS_TOKEN>``. Without a
+token configured, only direct loopback requests (no proxy in between) are
+answered.
+"""
+
+import atexit
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+
+from flask import Response, abort, g, has_request_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+TOTALS_FILE = 'metrics-totals.json'
+
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('Request latency in seconds', LATENCY_BUCKETS),
+    'http_response_size_bytes': ('Response body size in bytes', SIZE_BUCKETS),
+    'http_request_sql_statements': ('SQL statements executed per request', SQL_COUNT_BUCKETS),
+    'http_request_sql_duration_seconds': ('Time spent in SQL per request in seconds', LATENCY_BUCKETS),
+}
+
+
+class Metrics:
+    """Collects request metrics and serves them at ``/metrics``"""
+
+    def __init__(self, app=None, db=None):
+        self._lock = threading.Lock()
+        self._hooks_registered = False
+        self._reset()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('METRICS_ENABLED', True)
+        app.config.setdefault('METRICS_DIR', None)
+        app.config.setdefault('METRICS_FLUSH_INTERVAL', 5)
+        app.config.setdefault('METRICS_TOKEN', None)
+        if not app.config['METRICS_ENABLED']:
+            return
+
+        self.app = app
+        app.extensions['metrics'] = self
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+        if app.config['METRICS_DIR']:
+            os.makedirs(app.config['METRICS_DIR'], exist_ok=True)
+        # Process hooks cannot be unregistered; create_app may run many times
+        if not self._hooks_registered:
+            self._hooks_registered = True
+            atexit.register(self.write_snapshot)
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start_request(self):
+        g.metrics_started = time.perf_counter()
+        g.sql_statements = 0
+        g.sql_seconds = 0.0
+
+    def _finish_request(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None or request.endpoint == 'metrics':
+            return response
+
+        endpoint = request.endpoint or 'unmatched'
+        size = response.calculate_content_length()
+        if size is None:
+            size = 0
+
+        self.observe(
+            endpoint=endpoint,
+            method=request.method,
+            status=response.status_code,
+            seconds=time.perf_counter() - started,
+            size=size,
+            sql_statements=g.get('sql_statements', 0),
+            sql_seconds=g.get('sql_seconds', 0.0),
+        )
+        return response
+
+    def observe(self, endpoint, method, status, seconds, size, sql_statements, sql_seconds):
+        """Record one finished request"""
+        with self._lock:
+            key = f'{endpoint}|{method}|{status}'
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._observe('http_request_duration_seconds', endpoint, seconds)
+            self._observe('http_response_size_bytes', endpoint, size)
+            self._observe('http_request_sql_statements', endpoint, sql_statements)
+            self._observe('http_request_sql_duration_seconds', endpoint, sql_seconds)
+
+            due = time.monotonic() - self._last_write >= self.app.config['METRICS_FLUSH_INTERVAL']
+
+        if due and self.app.config['METRICS_DIR']:
+            self.write_snapshot()
+
+    def _observe(self, name, endpoint, value):
+        # Caller holds the lock. Buckets are stored non-cumulatively.
+        buckets = HISTOGRAMS[name][1]
+        series = self._histograms[name].get(endpoint)
+        if series is None:
+            series = self._histograms[name][endpoint] = {
+                'buckets': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0
+            }
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(buckets)
+        series['buckets'][i] += 1
+        series['sum'] += value
+        series['count'] += 1
+
+    def snapshot(self):
+        """This process's counters as a JSON-serializable dict"""
+        with self._lock:
+            data = json.loads(json.dumps({
+                'requests': self._requests,
+                'histograms': self._histograms,
+            }))
+
+        coalescer = self.app.extensions.get('water_coalescer')
+        if coalescer is not None:
+            stats = coalescer.stats()
+            data['water_coalescer'] = {
+                key: stats[key] for key in (
+                    'taps_received', 'taps_flushed', 'rows_written',
+                    'flushes', 'flush_failures', 'flush_latency_total_ms'
+                )
+            }
+        return data
+
+    def write_snapshot(self):
+        """Atomically write this process's counters into METRICS_DIR"""
+        directory = self.app.config.get('METRICS_DIR')
+        if not directory:
+            return
+        path = os.path.join(directory, f'metrics-{os.getpid()}.json')
+        # Threaded workers (gthread) can write from several requests at once.
+        # A shared temp name would let one thread's os.replace publish another
+        # thread's half-written file, so each thread gets its own temp file.
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._last_write = time.monotonic()
+
+    def collect(self):
+        """Counters merged across every worker that has written a snapshot"""
+        directory = self.app.config.get('METRICS_DIR')
+        if not directory:
+            return self.snapshot()
+
+        self.write_snapshot()
+        merged = _empty()
+        # Read the totals first: a snapshot retired after this read is still on disk
+        totals = _load(os.path.join(directory, TOTALS_FILE)) or {}
+        _merge(merged, totals)
+        retired = {f'metrics-{pid}.json' for pid in totals.get('retired_pids', [])}
+        for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+            name = os.path.basename(path)
+            if name == TOTALS_FILE or name in retired:
+                continue
+            data = _load(path)
+            if data is not None:
+                _merge(merged, data)
+        return merged
+
+    def metrics_view(self):
+        if not self._authorized():
+            abort(404)
+        return Response(render_prometheus(self.collect()), mimetype='text/plain; version=0.0.4')
+
+    def _authorized(self):
+        token = self.app.config.get('METRICS_TOKEN')
+        if token:
+            header = request.headers.get('Authorization', '')
+            return hmac.compare_digest(header.encode(), f'Bearer {token}'.encode())
+        # A proxy on the same host would make every client look local
+        return request.remote_addr in ('127.0.0.1', '::1') and 'X-Forwarded-For' not in request.headers
+
+    def _reset(self):
+        self._requests = {}
+        self._histograms = {name: {} for name in HISTOGRAMS}
+        self._last_write = 0.0
+
+    def _after_fork(self):
+        # Workers start from zero so the parent's counts are not summed twice
+        self._lock = threading.Lock()
+        self._reset()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    pending = conn.info.get('metrics_query_started')
+    if not pending:
+        return
+    started = pending.pop()
+    if has_request_context() and 'sql_statements' in g:
+        g.sql_statements += 1
+        g.sql_seconds += time.perf_counter() - started
+
+
+def _empty():
+    return {'requests': {}, 'histograms': {name: {} for name in HISTOGRAMS}}
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def retire_snapshot(directory, pid):
+    """Fold an exited worker's snapshot into the totals file and delete it
+
+    Called by the gunicorn master (``child_exit``), the only writer of the
+    totals file. The totals list the pid until its snapshot is gone, so a
+    concurrent ``collect`` never counts it twice.
+    """
+    path = os.path.join(directory, f'metrics-{pid}.json')
+    data = _load(path)
+    if data is None:
+        return
+
+    totals_path = os.path.join(directory, TOTALS_FILE)
+    previous = _load(totals_path) or {}
+    totals = _empty()
+    _merge(totals, previous)
+    _merge(totals, data)
+    totals['retired_pids'] = [
+        retired for retired in previous.get('retired_pids', [])
+        if os.path.exists(os.path.join(directory, f'metrics-{retired}.json'))
+    ] + [pid]
+
+    tmp_path = f'{totals_path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(totals, f)
+    os.replace(tmp_path, totals_path)
+    os.remove(path)
+
+
+def _merge(merged, data):
+    for key, value in data.get('requests', {}).items():
+        merged['requests'][key] = merged['requests'].get(key, 0) + value
+
+    for name, series_by_endpoint in data.get('histograms', {}).items():
+        target = merged['histograms'].setdefault(name, {})
+        for endpoint, series in series_by_endpoint.items():
+            existing = target.get(endpoint)
+            if existing is None:
+                target[endpoint] = series
+                continue
+            existing['buckets'] = [a + b for a, b in zip(existing['buckets'], series['buckets'])]
+            existing['sum'] += series['sum']
+            existing['count'] += series['count']
+
+    if 'water_coalescer' in data:
+        target = merged.setdefault('water_coalescer', {})
+        for key, value in data['water_coalescer'].items():
+            target[key] = target.get(key, 0) + value
+
+
+def _labels(**labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels.items())
+
+
+def render_prometheus(data):
+    """Render merged counters in the Prometheus text exposition format"""
+    lines = [
+        '# HELP http_requests_total Requests by endpoint, method and status code',
+        '# TYPE http_requests_total counter',
+    ]
+    for key in sorted(data['requests']):
+        endpoint, method, status = key.split('|')
+        labels = _labels(endpoint=endpoint, method=method, status=status)
+        lines.append(f'http_requests_total{{{labels}}} {data["requests"][key]}')
+
+    for name, (description, buckets) in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} histogram')
+        for endpoint in sorted(data['histograms'].get(name, {})):
+            series = data['histograms'][name][endpoint]
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], series['buckets']):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{_labels(endpoint=endpoint, le=bound)}}} {cumulative}')
+            lines.append(f'{name}_sum{{{_labels(endpoint=endpoint)}}} {round(series["sum"], 6)}')
+            lines.append(f'{name}_count{{{_labels(endpoint=endpoint)}}} {series["count"]}')
+
+    coalescer = data.get('water_coalescer')
+    if coalescer:
+        for key in ('taps_received', 'taps_flushed', 'rows_written', 'flushes', 'flush_failures'):
+            lines.append(f'# TYPE water_coalescer_{key}_total counter')
+            lines.append(f'water_coalescer_{key}_total {coalescer[key]}')
+        lines.append('# TYPE water_coalescer_flush_seconds_total counter')
+        lines.append(f'water_coalescer_flush_seconds_total {round(coalescer["flush_latency_total_ms"] / 1000, 6)}')
+        ratio = coalescer['taps_flushed'] / coalescer['rows_written'] if coalescer['rows_written'] else 0
+        lines.append('# HELP water_coalescer_ratio Water taps merged per row written')
+        lines.append('# TYPE water_coalescer_ratio gauge')
+        lines.append(f'water_coalescer_ratio {round(ratio, 4)}')
+
+    return '\n'.join(lines) + '\n'
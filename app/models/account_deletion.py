@@ -0,0 +1,49 @@
+from app import db
+from datetime import datetime
+
+class AccountDeletion(db.Model):
+    """Background purge job for a deleted user account"""
+    __tablename__ = 'account_deletions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # Not a foreign key: the job outlives the user row it purges
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, completed, failed
+    current_table = db.Column(db.String(100), nullable=True)
+    rows_total = db.Column(db.Integer, default=0)
+    rows_deleted = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    
+    def __init__(self, user_id, **kwargs):
+        self.user_id = user_id
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+    
+    def to_dict(self):
+        """Convert deletion job to dictionary"""
+        rows_total = self.rows_total or 0
+        rows_deleted = self.rows_deleted or 0
+        if self.status == 'completed':
+            progress = 100.0
+        else:
+            progress = round(min(rows_deleted / rows_total, 1) * 100, 1) if rows_total else 0.0
+        
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'status': self.status,
+            'current_table': self.current_table,
+            'rows_total': rows_total,
+            'rows_deleted': rows_deleted,
+            'progress_percent': progress,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+    
+    def __repr__(self):
+        return f'<AccountDeletion user={self.user_id} {self.status}>'
@@ -0,0 +1,24 @@
+from app import db
+from datetime import datetime
+
+class ActivityBitmap(db.Model):
+    """The days a user was active in one tracker, one bit per day
+
+    Bit ``i`` (byte ``i // 8``, least significant bit first) is set when
+    the user has at least one entry on ``start_date + i`` days. Maintained
+    by ``app.services.streaks`` as entries are written.
+    """
+    __tablename__ = 'activity_bitmaps'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'tracker', name='uq_activity_bitmaps_user_tracker'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    tracker = db.Column(db.String(20), nullable=False)
+    start_date = db.Column(db.Date, nullable=True)
+    bits = db.Column(db.LargeBinary, nullable=False, default=b'')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ActivityBitmap {self.user_id} {self.tracker}>'
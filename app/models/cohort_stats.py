@@ -0,0 +1,51 @@
+from app import db
+from datetime import datetime
+
+class CohortRun(db.Model):
+    """One run of the population statistics batch job"""
+    __tablename__ = 'cohort_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='running')  # running, completed, failed
+    processes = db.Column(db.Integer, nullable=False)
+    shards = db.Column(db.Integer, nullable=False)
+    users_total = db.Column(db.Integer, nullable=True)
+    duration_ms = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        """Convert run to dictionary"""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'processes': self.processes,
+            'shards': self.shards,
+            'users_total': self.users_total,
+            'duration_ms': self.duration_ms,
+            'error': self.error,
+            'started_at': self.started_at.isoformat(),
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+    def __repr__(self):
+        return f'<CohortRun {self.id} - {self.status}>'
+
+class CohortStat(db.Model):
+    """One anonymized aggregate of a cohort run, e.g. mean mood on Mondays"""
+    __tablename__ = 'cohort_stats'
+    __table_args__ = (
+        db.Index('ix_cohort_stats_run_metric', 'run_id', 'metric'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('cohort_runs.id'), nullable=False)
+    metric = db.Column(db.String(50), nullable=False)  # mood_by_weekday, activity_adoption, sentiment_mix
+    bucket = db.Column(db.String(50), nullable=False)
+    users = db.Column(db.Integer, nullable=False)
+    entries = db.Column(db.Integer, nullable=False)
+    value = db.Column(db.Float, nullable=True)
+
+    def __repr__(self):
+        return f'<CohortStat {self.metric}:{self.bucket}>'
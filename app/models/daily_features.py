@@ -0,0 +1,30 @@
+from app import db
+from datetime import datetime
+
+class DailyFeatures(db.Model):
+    """One user's activity across every tracker for one calendar day
+
+    Maintained by ``app.services.daily_features`` as entries are written;
+    days without any activity have no row.
+    """
+    __tablename__ = 'daily_features'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'feature_date', name='uq_daily_features_user_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    feature_date = db.Column(db.Date, nullable=False)
+    mood_entries = db.Column(db.Integer, nullable=False, default=0)
+    mood_mean = db.Column(db.Float, nullable=True)
+    journal_entries = db.Column(db.Integer, nullable=False, default=0)
+    sentiment_mean = db.Column(db.Float, nullable=True)  # positive = 1, neutral = 0, negative = -1
+    exercise_seconds = db.Column(db.Integer, nullable=False, default=0)
+    meditation_seconds = db.Column(db.Integer, nullable=False, default=0)
+    breathing_seconds = db.Column(db.Integer, nullable=False, default=0)
+    meals = db.Column(db.Integer, nullable=False, default=0)
+    water_glasses = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<DailyFeatures {self.user_id} - {self.feature_date}>'
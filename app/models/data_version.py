@@ -0,0 +1,20 @@
+from app import db
+from datetime import datetime
+
+class UserDataVersion(db.Model):
+    """Counter bumped by every transaction that changes a user's data
+
+    Maintained by ``app.services.data_versions``. Caches of a user's data
+    keep the version they were built at and are only served while it is
+    still current, so a write on any worker retires them on every worker.
+    Users who never wrote since it was added have no row (version 0).
+    """
+    __tablename__ = 'user_data_versions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<UserDataVersion {self.user_id} v{self.version}>'
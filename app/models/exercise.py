@@ -4,6 +4,9 @@ from datetime import datetime
 class ExerciseSession(db.Model):
     
     __tablename__ = 'exercise_sessions'
+    __table_args__ = (
+        db.Index('ix_exercise_sessions_user_date', 'user_id', 'session_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -47,6 +50,9 @@ class ExerciseSession(db.Model):
 class MeditationSession(db.Model):
     
     __tablename__ = 'meditation_sessions'
+    __table_args__ = (
+        db.Index('ix_meditation_sessions_user_date', 'user_id', 'session_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -92,6 +98,9 @@ class MeditationSession(db.Model):
 class BreathingMethod(db.Model):
    
     __tablename__ = 'breathing_methods'
+    __table_args__ = (
+        db.Index('ix_breathing_methods_user_date', 'user_id', 'session_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
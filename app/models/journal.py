@@ -4,6 +4,9 @@ from datetime import datetime
 class JournalEntry(db.Model):
     
     __tablename__ = 'journal_entries'
+    __table_args__ = (
+        db.Index('ix_journal_entries_user_created', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -4,6 +4,9 @@ from datetime import datetime
 class MoodEntry(db.Model):
     """Mood entry model for tracking user mood"""
     __tablename__ = 'mood_entries'
+    __table_args__ = (
+        db.Index('ix_mood_entries_user_created', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -41,4 +44,19 @@ class MoodEntry(db.Model):
         }
     
     def __repr__(self):
-        return f'<MoodEntry {self.mood_label} - {self.mood_score}/10>' 
\ No newline at end of file
+        return f'<MoodEntry {self.mood_label} - {self.mood_score}/10>' 
+
+class MoodActivity(db.Model):
+    """One activity of a mood entry, normalized from ``MoodEntry.activities``"""
+    __tablename__ = 'mood_entry_activities'
+    __table_args__ = (
+        db.Index('ix_mood_entry_activities_user_activity', 'user_id', 'activity', 'mood_entry_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    mood_entry_id = db.Column(db.Integer, db.ForeignKey('mood_entries.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    activity = db.Column(db.String(100), nullable=False)
+    
+    def __repr__(self):
+        return f'<MoodActivity {self.activity}>'
@@ -0,0 +1,51 @@
+from app import db
+from datetime import datetime
+
+class MoodBaseline(db.Model):
+    """A user's running mood statistics, updated as each mood is logged
+
+    Exponentially weighted, so recent entries count most and an update
+    never needs the history.
+    """
+    __tablename__ = 'mood_baselines'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
+    entries = db.Column(db.Integer, nullable=False, default=0)
+    mean = db.Column(db.Float, nullable=False, default=0.0)
+    variance = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MoodBaseline {self.user_id} - {self.mean:.2f}>'
+
+class MoodAlert(db.Model):
+    """A mood entry that fell far below the user's baseline when logged"""
+    __tablename__ = 'mood_alerts'
+    __table_args__ = (
+        db.Index('ix_mood_alerts_user_created', 'user_id', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    mood_entry_id = db.Column(db.Integer, db.ForeignKey('mood_entries.id'), nullable=False, index=True)
+    mood_score = db.Column(db.Integer, nullable=False)
+    baseline_mean = db.Column(db.Float, nullable=False)
+    baseline_std = db.Column(db.Float, nullable=False)
+    z_score = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert alert to dictionary"""
+        return {
+            'id': self.id,
+            'mood_entry_id': self.mood_entry_id,
+            'mood_score': self.mood_score,
+            'baseline_mean': self.baseline_mean,
+            'baseline_std': self.baseline_std,
+            'z_score': self.z_score,
+            'created_at': self.created_at.isoformat()
+        }
+
+    def __repr__(self):
+        return f'<MoodAlert {self.mood_entry_id} z={self.z_score}>'
@@ -0,0 +1,32 @@
+from app import db
+from datetime import datetime
+
+class MoodForecastModel(db.Model):
+    """A user's fitted mood forecast coefficients
+
+    Written by the ``fit-mood-forecasts`` batch job; ``/api/mood/forecast``
+    only evaluates them. ``entries`` and ``entries_updated_at`` describe the
+    mood history the fit saw, so the job can tell which users changed.
+    ``level`` is null while the user has too few days for a forecast.
+    """
+    __tablename__ = 'mood_forecast_models'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
+    entries = db.Column(db.Integer, nullable=False)
+    entries_updated_at = db.Column(db.DateTime, nullable=True)
+    days = db.Column(db.Integer, nullable=False)
+    last_day = db.Column(db.Date, nullable=False)
+    level = db.Column(db.Float, nullable=True)
+    weekday_offsets = db.Column(db.Text, nullable=True)  # JSON list, Monday first
+    sleep_coef = db.Column(db.Float, nullable=False, default=0.0)
+    stress_coef = db.Column(db.Float, nullable=False, default=0.0)
+    sleep_mean = db.Column(db.Float, nullable=True)
+    stress_mean = db.Column(db.Float, nullable=True)
+    recent_sleep = db.Column(db.Float, nullable=True)
+    recent_stress = db.Column(db.Float, nullable=True)
+    residual_std = db.Column(db.Float, nullable=True)
+    fitted_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MoodForecastModel {self.user_id} - {self.level}>'
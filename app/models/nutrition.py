@@ -4,6 +4,9 @@ from datetime import datetime
 class NutritionEntry(db.Model):
     """Nutrition tracking model for meals and hydration"""
     __tablename__ = 'nutrition_entries'
+    __table_args__ = (
+        db.Index('ix_nutrition_entries_user_date', 'user_id', 'entry_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -0,0 +1,13 @@
+from app import db
+from datetime import datetime
+
+class SchemaMeta(db.Model):
+    """Single-row table recording the schema version of the database"""
+    __tablename__ = 'schema_meta'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SchemaMeta v{self.version}>'
@@ -0,0 +1,104 @@
+"""Rendered page cache
+
+The HTML pages have no per-request context, so each template is rendered
+once per process and kept in memory together with gzip (and, when the
+``brotli`` package is installed, br) variants and a strong ETag per
+variant. Clients revalidate with If-None-Match and get a 304. With
+TEMPLATES_AUTO_RELOAD the page is re-rendered when its template or a
+static asset changes on disk.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+
+from flask import current_app, render_template, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CachedPage:
+    """One rendered template and its encoded variants"""
+
+    def __init__(self, body, uptodate=None, assets_mtime=None):
+        self.uptodate = uptodate
+        self.assets_mtime = assets_mtime
+        self.variants = {'identity': body, 'gzip': gzip.compress(body, 9, mtime=0)}
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(body)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etags = {
+            encoding: digest if encoding == 'identity' else f'{digest}-{encoding}'
+            for encoding in self.variants
+        }
+
+    def choose_encoding(self, accept_encodings):
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accept_encodings[encoding] > 0:
+                return encoding
+        return 'identity'
+
+
+class PageCache:
+    """Per-process cache of rendered, precompressed page templates"""
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._pages = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PAGE_CACHE_ENABLED', True)
+        app.extensions['page_cache'] = self
+
+    def render(self, template_name):
+        """Response for ``template_name``, rendered at most once per change"""
+        app = current_app._get_current_object()
+        if not app.config['PAGE_CACHE_ENABLED']:
+            return app.response_class(render_template(template_name), mimetype='text/html')
+
+        with self._lock:
+            page = self._pages.get(template_name)
+        if page is None or (app.jinja_env.auto_reload and self._is_stale(app, page)):
+            page = self._render(app, template_name)
+            with self._lock:
+                self._pages[template_name] = page
+
+        encoding = page.choose_encoding(request.accept_encodings)
+        response = app.response_class(page.variants[encoding], mimetype='text/html')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'no-cache'
+        response.set_etag(page.etags[encoding])
+        return response.make_conditional(request)
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def _render(self, app, template_name):
+        body = render_template(template_name).encode('utf-8')
+        if not app.jinja_env.auto_reload:
+            return CachedPage(body)
+        _, _, uptodate = app.jinja_env.loader.get_source(app.jinja_env, template_name)
+        return CachedPage(body, uptodate=uptodate, assets_mtime=_assets_mtime(app))
+
+    def _is_stale(self, app, page):
+        if page.uptodate is not None and not page.uptodate():
+            return True
+        # Rendered pages embed fingerprinted asset URLs
+        return page.assets_mtime != _assets_mtime(app)
+
+
+def _assets_mtime(app):
+    latest = 0.0
+    for root, _, files in os.walk(app.static_folder):
+        for name in files:
+            latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+    return latest
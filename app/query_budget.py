@@ -0,0 +1,75 @@
+"""Per-view SQL statement budgets
+
+Views declare the most statements they may run with ``@query_budget(n)``.
+When ``QUERY_BUDGET_ENFORCE`` is on (the testing config), every statement
+is captured with the application frames that issued it and a request
+that goes over its view's budget raises ``QueryBudgetExceeded`` with
+the offending SQL.
+"""
+
+import os
+import traceback
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a view runs more SQL statements than its budget"""
+
+
+def query_budget(max_statements):
+    """Declare the most SQL statements a view may run per request"""
+    def decorator(view):
+        view.query_budget = max_statements
+        return view
+    return decorator
+
+
+def get_query_budget(app, endpoint):
+    view = app.view_functions.get(endpoint)
+    return getattr(view, 'query_budget', None)
+
+
+def init_query_budgets(app, db):
+    app.config.setdefault('QUERY_BUDGET_ENFORCE', False)
+    if not app.config['QUERY_BUDGET_ENFORCE']:
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _capture_statement)
+
+    @app.before_request
+    def start_query_log():
+        g.query_log = []
+
+    @app.after_request
+    def check_query_budget(response):
+        statements = g.get('query_log')
+        budget = get_query_budget(current_app, request.endpoint)
+        if statements is None or budget is None or len(statements) <= budget:
+            return response
+        raise QueryBudgetExceeded(format_query_log(request.endpoint, budget, statements))
+
+
+def _capture_statement(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context() or 'query_log' not in g:
+        return
+    origin = [
+        f"{os.path.relpath(frame.filename, os.path.dirname(APP_DIR))}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(APP_DIR) and frame.filename != __file__
+    ]
+    g.query_log.append((statement, origin[-3:]))
+
+
+def format_query_log(endpoint, budget, statements):
+    lines = [f"{endpoint} ran {len(statements)} SQL statements (budget {budget}):"]
+    for i, (statement, origin) in enumerate(statements, 1):
+        lines.append(f"  [{i}] {' '.join(statement.split())}")
+        for frame in origin:
+            lines.append(f"        at {frame}")
+    return '\n'.join(lines)
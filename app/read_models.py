@@ -0,0 +1,111 @@
+"""Column-projected read models for list endpoints
+
+A ``ReadModel`` selects only the columns a response needs with a Core
+``select()`` and maps each row onto a namedtuple record. No ORM instance is
+built, so list endpoints skip identity-map bookkeeping, change tracking and
+attribute instrumentation per row. ``dump()`` returns the same JSON shape as
+the model's ``to_dict()``; dates and times are left to the JSON provider.
+"""
+
+from collections import namedtuple
+
+from app import db
+from app.models.mood import MoodEntry
+from app.models.mood_anomaly import MoodAlert
+from app.models.journal import JournalEntry
+from app.models.exercise import ExerciseSession, MeditationSession, BreathingMethod
+from app.models.nutrition import NutritionEntry, DailyNutritionSummary
+
+
+class ReadModel:
+    """Named set of columns of ``model`` and the record type rows map onto
+
+    ``expressions`` adds SQL expressions (e.g. correlated subqueries) as
+    further fields; ``computed`` adds Python-side fields in ``dump()``.
+    """
+
+    def __init__(self, name, model, fields, computed=None, expressions=None):
+        self.model = model
+        expressions = expressions or {}
+        self.fields = tuple(fields) + tuple(expressions)
+        self.computed = computed or {}
+        self.record = namedtuple(name, self.fields)
+        self.columns = [getattr(model, field) for field in fields]
+        self.columns += [expression.label(field) for field, expression in expressions.items()]
+
+    def select(self):
+        """``select()`` of this read model's columns, ready for where/order_by"""
+        return db.select(*self.columns)
+
+    def all(self, statement):
+        make = self.record._make
+        return [make(row) for row in db.session.execute(statement)]
+
+    def page(self, statement, page, per_page):
+        """One page of records, without the COUNT query ``paginate()`` runs"""
+        # Same fallbacks as paginate(error_out=False)
+        page = max(page, 1)
+        per_page = per_page if per_page > 0 else 20
+        return self.all(statement.limit(per_page).offset((page - 1) * per_page))
+
+    def dump(self, records):
+        """``to_dict()``-shaped dicts for ``records``"""
+        fields = self.fields
+        rows = [dict(zip(fields, record)) for record in records]
+        if self.computed:
+            for row, record in zip(rows, records):
+                for key, compute in self.computed.items():
+                    row[key] = compute(record)
+        return rows
+
+
+def _duration_minutes(record):
+    return round(record.duration_seconds / 60, 1)
+
+
+MOOD_FIELDS = (
+    'id', 'user_id', 'mood_score', 'mood_label', 'notes', 'activities', 'sleep_hours',
+    'stress_level', 'energy_level', 'created_at', 'updated_at'
+)
+
+JOURNAL_FIELDS = (
+    'id', 'user_id', 'title', 'content', 'sentiment', 'mood_before', 'mood_after',
+    'tags', 'is_private', 'created_at', 'updated_at'
+)
+
+MOOD_ENTRY = ReadModel('MoodEntryRecord', MoodEntry, MOOD_FIELDS)
+# Mood history rows carry the alert raised when the entry was logged, if any
+MOOD_HISTORY = ReadModel('MoodHistoryRecord', MoodEntry, MOOD_FIELDS, expressions={
+    'anomaly_z_score': db.select(MoodAlert.z_score)
+    .where(MoodAlert.mood_entry_id == MoodEntry.id)
+    .limit(1).scalar_subquery()
+}, computed={'is_anomaly': lambda record: record.anomaly_z_score is not None})
+JOURNAL_ENTRY = ReadModel('JournalEntryRecord', JournalEntry, JOURNAL_FIELDS)
+
+EXERCISE_SESSION = ReadModel('ExerciseSessionRecord', ExerciseSession, (
+    'id', 'user_id', 'exercise_type', 'exercise_name', 'duration_seconds', 'completed',
+    'session_date', 'completed_at', 'created_at'
+), computed={'duration_minutes': _duration_minutes})
+
+MEDITATION_SESSION = ReadModel('MeditationSessionRecord', MeditationSession, (
+    'id', 'user_id', 'session_type', 'session_name', 'duration_seconds', 'breath_count',
+    'completed', 'session_date', 'completed_at', 'created_at'
+), computed={'duration_minutes': _duration_minutes})
+
+BREATHING_SESSION = ReadModel('BreathingMethodRecord', BreathingMethod, (
+    'id', 'user_id', 'method_type', 'method_name', 'duration_seconds', 'cycles_completed',
+    'completed', 'session_date', 'completed_at', 'created_at'
+), computed={'duration_minutes': _duration_minutes})
+
+NUTRITION_ENTRY = ReadModel('NutritionEntryRecord', NutritionEntry, (
+    'id', 'user_id', 'entry_type', 'name', 'meal_type', 'water_glasses', 'entry_date',
+    'entry_time', 'created_at'
+), computed={'entry_time': lambda record: record.entry_time.strftime('%H:%M:%S')})
+
+NUTRITION_DAY = ReadModel('NutritionDayRecord', DailyNutritionSummary, (
+    'summary_date', 'total_meals', 'total_water_glasses', 'mood_score'
+))
+
+# Narrow projections used by analytics
+MOOD_POINT = ReadModel('MoodPoint', MoodEntry, ('created_at', 'mood_score', 'mood_label'))
+JOURNAL_MOODS = ReadModel('JournalMoods', JournalEntry, ('created_at', 'mood_before', 'mood_after', 'tags'))
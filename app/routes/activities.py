@@ -1,18 +1,27 @@
 from flask import Blueprint, request, jsonify
-from flask_login import login_required, current_user
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
+from app.db_routing import read_only
+from app.query_budget import query_budget
 from app.models.exercise import ExerciseSession, MeditationSession, BreathingMethod
+from app.read_models import EXERCISE_SESSION, MEDITATION_SESSION, BREATHING_SESSION
+from app.series import FORMAT_ERROR, requested_format, to_columnar
+from app.services.streaks import streaks
 from datetime import datetime, date, timedelta
 import json
 
 activities_bp = Blueprint('activities', __name__)
 
+ACTIVITY_TRACKERS = ('exercise', 'meditation', 'breathing')
+
 # Exercise Routes
 @activities_bp.route('/api/exercise/complete', methods=['POST'])
-@login_required
+@query_budget(9)
+@jwt_required()
 def complete_exercise():
     
     try:
+        current_user_id = get_jwt_identity()
         data = request.get_json()
         exercise_type = data.get('exercise_type')
         exercise_name = data.get('exercise_name')
@@ -23,7 +32,7 @@ def complete_exercise():
         
         # Create exercise session
         exercise_session = ExerciseSession(
-            user_id=current_user.id,
+            user_id=current_user_id,
             exercise_type=exercise_type,
             exercise_name=exercise_name,
             duration_seconds=duration_seconds,
@@ -44,21 +53,33 @@ def complete_exercise():
         return jsonify({'error': str(e)}), 500
 
 @activities_bp.route('/api/exercise/history', methods=['GET'])
-@login_required
+@query_budget(2)
+@jwt_required()
+@read_only
 def get_exercise_history():
     
     try:
+        current_user_id = get_jwt_identity()
        
         days = request.args.get('days', 7, type=int)
         start_date = date.today() - timedelta(days=days)
+        series_format = requested_format()
+        if series_format is None:
+            return jsonify({'error': FORMAT_ERROR}), 400
+        
+        exercises = EXERCISE_SESSION.all(
+            EXERCISE_SESSION.select().where(
+                ExerciseSession.user_id == current_user_id,
+                ExerciseSession.session_date >= start_date
+            ).order_by(ExerciseSession.session_date.desc())
+        )
         
-        exercises = ExerciseSession.query.filter(
-            ExerciseSession.user_id == current_user.id,
-            ExerciseSession.session_date >= start_date
-        ).order_by(ExerciseSession.session_date.desc()).all()
+        exercises = EXERCISE_SESSION.dump(exercises)
+        if series_format == 'columnar':
+            exercises = to_columnar(exercises, 'session_date', dictionary_fields=('exercise_type', 'exercise_name'))
         
         return jsonify({
-            'exercises': [exercise.to_dict() for exercise in exercises]
+            'exercises': exercises
         }), 200
         
     except Exception as e:
@@ -66,10 +87,12 @@ def get_exercise_history():
 
 # Meditation Routes
 @activities_bp.route('/api/meditation/complete', methods=['POST'])
-@login_required
+@query_budget(9)
+@jwt_required()
 def complete_meditation():
     
     try:
+        current_user_id = get_jwt_identity()
         data = request.get_json()
         session_type = data.get('session_type', 'basic')
         session_name = data.get('session_name', 'Basic Meditation')
@@ -81,7 +104,7 @@ def complete_meditation():
         
         # Create meditation session
         meditation_session = MeditationSession(
-            user_id=current_user.id,
+            user_id=current_user_id,
             session_type=session_type,
             session_name=session_name,
             duration_seconds=duration_seconds,
@@ -103,21 +126,33 @@ def complete_meditation():
         return jsonify({'error': str(e)}), 500
 
 @activities_bp.route('/api/meditation/history', methods=['GET'])
-@login_required
+@query_budget(2)
+@jwt_required()
+@read_only
 def get_meditation_history():
     
     try:
+        current_user_id = get_jwt_identity()
         # Get date range from query params
         days = request.args.get('days', 7, type=int)
         start_date = date.today() - timedelta(days=days)
+        series_format = requested_format()
+        if series_format is None:
+            return jsonify({'error': FORMAT_ERROR}), 400
         
-        meditations = MeditationSession.query.filter(
-            MeditationSession.user_id == current_user.id,
-            MeditationSession.session_date >= start_date
-        ).order_by(MeditationSession.session_date.desc()).all()
+        meditations = MEDITATION_SESSION.all(
+            MEDITATION_SESSION.select().where(
+                MeditationSession.user_id == current_user_id,
+                MeditationSession.session_date >= start_date
+            ).order_by(MeditationSession.session_date.desc())
+        )
+        
+        meditations = MEDITATION_SESSION.dump(meditations)
+        if series_format == 'columnar':
+            meditations = to_columnar(meditations, 'session_date', dictionary_fields=('session_type', 'session_name'))
         
         return jsonify({
-            'meditations': [meditation.to_dict() for meditation in meditations]
+            'meditations': meditations
         }), 200
         
     except Exception as e:
@@ -125,10 +160,12 @@ def get_meditation_history():
 
 # Breathing Methods Routes
 @activities_bp.route('/api/breathing/complete', methods=['POST'])
-@login_required
+@query_budget(9)
+@jwt_required()
 def complete_breathing():
     
     try:
+        current_user_id = get_jwt_identity()
         data = request.get_json()
         method_type = data.get('method_type')
         method_name = data.get('method_name')
@@ -140,7 +177,7 @@ def complete_breathing():
         
         # Create breathing method session
         breathing_session = BreathingMethod(
-            user_id=current_user.id,
+            user_id=current_user_id,
             method_type=method_type,
             method_name=method_name,
             duration_seconds=duration_seconds,
@@ -162,21 +199,33 @@ def complete_breathing():
         return jsonify({'error': str(e)}), 500
 
 @activities_bp.route('/api/breathing/history', methods=['GET'])
-@login_required
+@query_budget(2)
+@jwt_required()
+@read_only
 def get_breathing_history():
     
     try:
+        current_user_id = get_jwt_identity()
         # Get date range from query params
         days = request.args.get('days', 7, type=int)
         start_date = date.today() - timedelta(days=days)
+        series_format = requested_format()
+        if series_format is None:
+            return jsonify({'error': FORMAT_ERROR}), 400
+        
+        breathing_sessions = BREATHING_SESSION.all(
+            BREATHING_SESSION.select().where(
+                BreathingMethod.user_id == current_user_id,
+                BreathingMethod.session_date >= start_date
+            ).order_by(BreathingMethod.session_date.desc())
+        )
         
-        breathing_sessions = BreathingMethod.query.filter(
-            BreathingMethod.user_id == current_user.id,
-            BreathingMethod.session_date >= start_date
-        ).order_by(BreathingMethod.session_date.desc()).all()
+        breathing_sessions = BREATHING_SESSION.dump(breathing_sessions)
+        if series_format == 'columnar':
+            breathing_sessions = to_columnar(breathing_sessions, 'session_date', dictionary_fields=('method_type', 'method_name'))
         
         return jsonify({
-            'breathing_sessions': [session.to_dict() for session in breathing_sessions]
+            'breathing_sessions': breathing_sessions
         }), 200
         
     except Exception as e:
@@ -184,28 +233,37 @@ def get_breathing_history():
 
 # Combined Activity Statistics
 @activities_bp.route('/api/activities/stats', methods=['GET'])
-@login_required
+@query_budget(12)
+@jwt_required()
+@read_only
 def get_activity_stats():
     
     try:
+        current_user_id = get_jwt_identity()
         today = date.today()
         
         # Today's exercise sessions
-        today_exercises = ExerciseSession.query.filter_by(
-            user_id=current_user.id,
-            session_date=today
+        today_exercises = db.session.execute(
+            db.select(ExerciseSession.duration_seconds).filter_by(
+                user_id=current_user_id,
+                session_date=today
+            )
         ).all()
         
         # Today's meditation sessions
-        today_meditations = MeditationSession.query.filter_by(
-            user_id=current_user.id,
-            session_date=today
+        today_meditations = db.session.execute(
+            db.select(MeditationSession.duration_seconds, MeditationSession.breath_count).filter_by(
+                user_id=current_user_id,
+                session_date=today
+            )
         ).all()
         
         # Today's breathing sessions
-        today_breathing = BreathingMethod.query.filter_by(
-            user_id=current_user.id,
-            session_date=today
+        today_breathing = db.session.execute(
+            db.select(BreathingMethod.duration_seconds).filter_by(
+                user_id=current_user_id,
+                session_date=today
+            )
         ).all()
         
         # Calculate totals
@@ -223,7 +281,8 @@ def get_activity_stats():
                 'breathing_sessions': len(today_breathing),
                 'breathing_time_minutes': round(total_breathing_time / 60, 1),
                 'total_breaths': total_breaths
-            }
+            },
+            'streaks': streaks(current_user_id, ACTIVITY_TRACKERS, today)
         }), 200
         
     except Exception as e:
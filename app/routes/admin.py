@@ -0,0 +1,41 @@
+from flask import Blueprint, current_app, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import db
+from app.db_routing import read_only
+from app.query_budget import query_budget
+from app.models.user import User
+from app.services.cohort_stats import latest_cohort_stats
+
+admin_bp = Blueprint('admin', __name__)
+
+def is_admin(user_id):
+    """Whether the user is listed in ADMIN_USERNAMES"""
+    username = db.session.execute(
+        db.select(User.username).where(User.id == user_id)
+    ).scalar()
+    return username is not None and username in current_app.config.get('ADMIN_USERNAMES', [])
+
+@admin_bp.route('/cohort-stats', methods=['GET'])
+@query_budget(3)
+@jwt_required()
+@read_only
+def get_cohort_stats():
+    """Get anonymized population statistics from the latest batch run"""
+    try:
+        if not is_admin(get_jwt_identity()):
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        # Precomputed by `flask cohort-stats`; never queries the entry tables
+        summary = latest_cohort_stats()
+        if summary is None:
+            return jsonify({
+                'run': None,
+                'stats': {},
+                'message': 'No cohort statistics computed yet'
+            }), 200
+        
+        summary['min_users'] = current_app.config.get('COHORT_MIN_USERS', 5)
+        return jsonify(summary), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get cohort statistics', 'details': str(e)}), 500
@@ -2,12 +2,15 @@ import logging
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from app import db
+from app.query_budget import query_budget
 from app.models.user import User
+from app.services.streaks import create_streak_bitmaps
 from email_validator import validate_email, EmailNotValidError
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/register', methods=['POST'])
+@query_budget(7)
 def register():
     """Register a new user"""
     try:
@@ -61,6 +64,8 @@ def register():
         )
         
         db.session.add(user)
+        db.session.flush()
+        create_streak_bitmaps(user.id)
         db.session.commit()
         
         # Create tokens
@@ -81,6 +86,7 @@ def register():
         return jsonify({'error': 'Registration failed', 'details': str(e)}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@query_budget(2)
 def login():
     """Login user"""
     try:
@@ -131,6 +137,7 @@ def login():
         return jsonify({'error': 'Login failed', 'details': str(e)}), 500
 
 @auth_bp.route('/refresh', methods=['POST'])
+@query_budget(1)
 @jwt_required(refresh=True)
 def refresh():
     """Refresh access token"""
@@ -146,12 +153,14 @@ def refresh():
         return jsonify({'error': 'Token refresh failed', 'details': str(e)}), 500
 
 @auth_bp.route('/logout', methods=['POST'])
+@query_budget(1)
 @jwt_required()
 def logout():
     """Logout user (client should discard tokens)"""
     return jsonify({'message': 'Logout successful'}), 200
 
 @auth_bp.route('/me', methods=['GET'])
+@query_budget(1)
 @jwt_required()
 def get_current_user():
     """Get current user information"""
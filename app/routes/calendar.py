@@ -0,0 +1,36 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify, make_response
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import db, water_coalescer
+from app.query_budget import query_budget
+from app.services.calendar import cached_activity_calendar, calendar_version
+
+calendar_bp = Blueprint('calendar', __name__)
+
+@calendar_bp.route('', methods=['GET'])
+@query_budget(11)
+@jwt_required()
+def get_calendar():
+    """Get a year of daily activity levels for every tracker"""
+    try:
+        current_user_id = get_jwt_identity()
+        year = request.args.get('year', datetime.utcnow().year, type=int)
+        if not 1900 <= year <= 9998:
+            return jsonify({'error': 'year must be between 1900 and 9998'}), 400
+        
+        # Read-your-writes for coalesced water taps
+        water_coalescer.flush_user(current_user_id)
+        
+        # Unchanged until the user's next write, so clients revalidate with If-None-Match
+        version, etag = calendar_version(current_user_id, year)
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = jsonify(cached_activity_calendar(current_user_id, year, version))
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to get calendar', 'details': str(e)}), 500
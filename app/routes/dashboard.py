@@ -0,0 +1,48 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import water_coalescer
+from app.db_routing import read_only
+from app.query_budget import query_budget
+from app.services.dashboard import SECTIONS, DashboardContext, build_summary
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+@dashboard_bp.route('/summary', methods=['GET'])
+@query_budget(17)
+@jwt_required()
+@read_only
+def get_dashboard_summary():
+    """Get everything the dashboard renders in one response
+
+    ``sections`` is a comma separated subset of profile, stats, mood,
+    journal and featured_resources (default: all of them).
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        days = request.args.get('days', 30, type=int)
+
+        sections = request.args.get('sections')
+        if sections:
+            sections = [name.strip() for name in sections.split(',') if name.strip()]
+            unknown = [name for name in sections if name not in SECTIONS]
+            if unknown:
+                return jsonify({
+                    'error': f"Unknown sections: {', '.join(unknown)}",
+                    'available_sections': list(SECTIONS)
+                }), 400
+        else:
+            sections = list(SECTIONS)
+
+        # Read-your-writes for coalesced water taps
+        water_coalescer.flush_user(current_user_id)
+
+        summary = build_summary(DashboardContext(current_user_id, days), sections)
+
+        # Profile and stats are the sections that look the user up
+        if any(name in summary and summary[name] is None for name in ('profile', 'stats')):
+            return jsonify({'error': 'User not found'}), 404
+
+        return jsonify(summary), 200
+
+    except Exception as e:
+        return jsonify({'error': 'Failed to get dashboard summary', 'details': str(e)}), 500
@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
+from app.db_routing import read_only
+from app.query_budget import query_budget
 from app.models.journal import JournalEntry
-from textblob import TextBlob
+from app.read_models import JOURNAL_ENTRY
+from app.services.dashboard import journal_analytics
 import json
 
 def get_sentiment(text):
@@ -10,6 +13,8 @@ def get_sentiment(text):
     try:
         if not text or not text.strip():
             return 'neutral'
+        # TextBlob pulls in NLTK, so load it on first use instead of at startup
+        from textblob import TextBlob
         blob = TextBlob(text)
         polarity = blob.sentiment.polarity
 
@@ -26,6 +31,7 @@ def get_sentiment(text):
 journal_bp = Blueprint('journal', __name__)
 
 @journal_bp.route('/', methods=['POST'])
+@query_budget(8)
 @jwt_required()
 def create_journal_entry():
     """Create a new journal entry"""
@@ -64,7 +70,9 @@ def create_journal_entry():
         return jsonify({'error': 'Failed to create journal entry', 'details': str(e)}), 500
 
 @journal_bp.route('/', methods=['GET'])
+@query_budget(1)
 @jwt_required()
+@read_only
 def get_journal_entries():
     """Get user's journal entries"""
     try:
@@ -77,11 +85,11 @@ def get_journal_entries():
         tags = request.args.get('tags', '')
         
         # Build query
-        query = JournalEntry.query.filter_by(user_id=current_user_id)
+        query = JOURNAL_ENTRY.select().where(JournalEntry.user_id == current_user_id)
         
         # Search functionality
         if search:
-            query = query.filter(
+            query = query.where(
                 JournalEntry.content.contains(search) | 
                 JournalEntry.title.contains(search)
             )
@@ -90,29 +98,25 @@ def get_journal_entries():
         if tags:
             tag_list = [tag.strip() for tag in tags.split(',')]
             for tag in tag_list:
-                query = query.filter(JournalEntry.tags.contains(tag))
+                query = query.where(JournalEntry.tags.contains(tag))
         
         # Order by creation date (newest first)
         query = query.order_by(JournalEntry.created_at.desc())
         
         # Get all entries for this user 
         if page == 1 and per_page >= 100:  
-            journal_entries = query.limit(100).all()
-            return jsonify([entry.to_dict() for entry in journal_entries]), 200
+            journal_entries = JOURNAL_ENTRY.all(query.limit(100))
+            return jsonify(JOURNAL_ENTRY.dump(journal_entries)), 200
         
-        # Paginate results
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        journal_entries = [entry.to_dict() for entry in pagination.items]
+        journal_entries = JOURNAL_ENTRY.page(query, page, per_page)
         
-        return jsonify(journal_entries), 200
+        return jsonify(JOURNAL_ENTRY.dump(journal_entries)), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to get journal entries', 'details': str(e)}), 500
 
 @journal_bp.route('/<int:entry_id>', methods=['GET'])
+@query_budget(1)
 @jwt_required()
 def get_journal_entry(entry_id):
     """Get a specific journal entry"""
@@ -134,6 +138,7 @@ def get_journal_entry(entry_id):
         return jsonify({'error': 'Failed to get journal entry', 'details': str(e)}), 500
 
 @journal_bp.route('/<int:entry_id>', methods=['PUT'])
+@query_budget(8)
 @jwt_required()
 def update_journal_entry(entry_id):
     """Update a journal entry"""
@@ -186,6 +191,7 @@ def update_journal_entry(entry_id):
         return jsonify({'error': 'Failed to update journal entry', 'details': str(e)}), 500
 
 @journal_bp.route('/<int:entry_id>', methods=['DELETE'])
+@query_budget(8)
 @jwt_required()
 def delete_journal_entry(entry_id):
     """Delete a journal entry"""
@@ -211,74 +217,15 @@ def delete_journal_entry(entry_id):
         return jsonify({'error': 'Failed to delete journal entry', 'details': str(e)}), 500
 
 @journal_bp.route('/analytics', methods=['GET'])
+@query_budget(9)
 @jwt_required()
+@read_only
 def get_journal_analytics():
     """Get journal analytics for the user"""
     try:
         current_user_id = get_jwt_identity()
         
-        # Get all journal entries for the user
-        journal_entries = JournalEntry.query.filter_by(user_id=current_user_id).all()
-        
-        if not journal_entries:
-            return jsonify({
-                'total_entries': 0,
-                'average_mood_before': 0,
-                'average_mood_after': 0,
-                'most_common_tags': [],
-                'writing_streak': 0,
-                'total_tags_used': 0,
-                'message': 'No journal entries available'
-            }), 200
-        
-        # Calculate analytics
-        total_entries = len(journal_entries)
-        
-        # Mood analytics
-        mood_before_entries = [e for e in journal_entries if e.mood_before is not None]
-        mood_after_entries = [e for e in journal_entries if e.mood_after is not None]
-        
-        average_mood_before = sum(e.mood_before for e in mood_before_entries) / len(mood_before_entries) if mood_before_entries else 0
-        average_mood_after = sum(e.mood_after for e in mood_after_entries) / len(mood_after_entries) if mood_after_entries else 0
-        
-        # Tag analytics
-        all_tags = []
-        for entry in journal_entries:
-            if entry.tags:
-                try:
-                    tags = json.loads(entry.tags)
-                    all_tags.extend(tags)
-                except:
-                    pass
-        
-        tag_counts = {}
-        for tag in all_tags:
-            tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-        most_common_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        
-        from datetime import datetime, timedelta
-        entry_dates = set(entry.created_at.date() for entry in journal_entries)
-        sorted_dates = sorted(entry_dates, reverse=True)
-        
-        writing_streak = 0
-        current_date = datetime.utcnow().date()
-        
-        for i in range(len(sorted_dates)):
-            if current_date - sorted_dates[i] == timedelta(days=i):
-                writing_streak += 1
-            else:
-                break
-        
-        return jsonify({
-            'total_entries': total_entries,
-            'average_mood_before': round(average_mood_before, 2),
-            'average_mood_after': round(average_mood_after, 2),
-            'most_common_tags': most_common_tags,
-            'writing_streak': writing_streak,
-            'total_tags_used': len(tag_counts)
-        }), 200
+        return jsonify(journal_analytics(current_user_id)), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to get journal analytics', 'details': str(e)}), 500 
\ No newline at end of file
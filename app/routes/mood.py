@@ -1,14 +1,24 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
+from app import db, water_coalescer
+from app.db_routing import read_only
+from app.query_budget import query_budget
 from app.models.mood import MoodEntry
 from app.models.user import User
+from app.read_models import MOOD_HISTORY
+from app.series import FORMAT_ERROR, downsample, requested_format, to_columnar
+from app.services.dashboard import mood_analytics, mood_rollup
+from app.services.daily_features import habit_comparison, load_daily_features
+from app.services.insights import cached_mood_insights
+from app.services.mood_activities import delete_mood_activities, entries_with_activity, set_mood_activities
+from app.services.mood_anomalies import check_mood_entry, delete_mood_alerts
+from app.services.mood_forecast import mood_forecast
 from datetime import datetime, timedelta
-import json
 
 mood_bp = Blueprint('mood', __name__)
 
 @mood_bp.route('/', methods=['POST'])
+@query_budget(12)
 @jwt_required()
 def log_mood():
     """Log a new mood entry"""
@@ -31,18 +41,21 @@ def log_mood():
             mood_score=mood_score,
             mood_label=data['mood_label'],
             notes=data.get('notes'),
-            activities=json.dumps(data.get('activities', [])) if data.get('activities') else None,
             sleep_hours=data.get('sleep_hours'),
             stress_level=data.get('stress_level'),
             energy_level=data.get('energy_level')
         )
         
         db.session.add(mood_entry)
+        set_mood_activities(mood_entry, data.get('activities'))
+        # Scored against the user's running baseline in O(1)
+        alert = check_mood_entry(mood_entry)
         db.session.commit()
         
         return jsonify({
             'message': 'Mood logged successfully',
-            'mood_entry': mood_entry.to_dict()
+            'mood_entry': mood_entry.to_dict(),
+            'anomaly': alert.to_dict() if alert else None
         }), 201
         
     except Exception as e:
@@ -50,7 +63,9 @@ def log_mood():
         return jsonify({'error': 'Failed to log mood', 'details': str(e)}), 500
 
 @mood_bp.route('/', methods=['GET'])
+@query_budget(1)
 @jwt_required()
+@read_only
 def get_mood_history():
     """Get user's mood history"""
     try:
@@ -60,131 +75,118 @@ def get_mood_history():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         days = request.args.get('days', type=int)
+        activity = request.args.get('activity')
         
         # Build query
-        query = MoodEntry.query.filter_by(user_id=current_user_id)
+        query = MOOD_HISTORY.select().where(MoodEntry.user_id == current_user_id)
         
         # Filter by days if specified
         if days:
             start_date = datetime.utcnow() - timedelta(days=days)
-            query = query.filter(MoodEntry.created_at >= start_date)
+            query = query.where(MoodEntry.created_at >= start_date)
+        
+        # Filter by activity through the (user_id, activity) index
+        if activity:
+            query = query.where(MoodEntry.id.in_(entries_with_activity(current_user_id, activity)))
         
         # Order by creation date (newest first)
         query = query.order_by(MoodEntry.created_at.desc())
         
         # Get all entries for this user (for simple list)
         if page == 1 and per_page >= 100:  
-            mood_entries = query.limit(100).all()
-            return jsonify([entry.to_dict() for entry in mood_entries]), 200
-        
-        # Paginate results
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+            mood_entries = MOOD_HISTORY.all(query.limit(100))
+            return jsonify(MOOD_HISTORY.dump(mood_entries)), 200
         
-        mood_entries = [entry.to_dict() for entry in pagination.items]
+        mood_entries = MOOD_HISTORY.page(query, page, per_page)
         
-        return jsonify(mood_entries), 200
+        return jsonify(MOOD_HISTORY.dump(mood_entries)), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to get mood history', 'details': str(e)}), 500
 
 @mood_bp.route('/analytics', methods=['GET'])
+@query_budget(11)
 @jwt_required()
+@read_only
 def get_mood_analytics():
     """Get mood analytics for the user"""
     try:
         current_user_id = get_jwt_identity()
         days = request.args.get('days', 30, type=int)
+        max_points = request.args.get('max_points', type=int)
+        series_format = requested_format()
+        if series_format is None:
+            return jsonify({'error': FORMAT_ERROR}), 400
+        if max_points is not None and max_points < 3:
+            return jsonify({'error': 'max_points must be at least 3'}), 400
+        
+        analytics = mood_analytics(current_user_id, days)
+        if max_points is not None:
+            # Buckets come from per-day aggregates rather than every entry
+            analytics['mood_data'], analytics['mood_data_resolution'] = downsample(
+                mood_rollup(current_user_id, days), max_points
+            )
+        if series_format == 'columnar':
+            analytics['mood_data'] = to_columnar(
+                analytics['mood_data'], 'date', dictionary_fields=('mood_label',)
+            )
+        
+        return jsonify(analytics), 200
         
-        # Calculate date range
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
-        
-        all_mood_entries = MoodEntry.query.filter_by(user_id=current_user_id).all()
-        
-        # Get mood entries in date range for analytics
-        mood_entries = MoodEntry.query.filter(
-            MoodEntry.user_id == current_user_id,
-            MoodEntry.created_at >= start_date,
-            MoodEntry.created_at <= end_date
-        ).order_by(MoodEntry.created_at.asc()).all()
-        
-        # Calculate basic stats
-        total_entries = len(all_mood_entries)
-        
-        if not all_mood_entries:
-            return jsonify({
-                'total_entries': 0,
-                'average_mood': 0,
-                'current_streak': 0,
-                'recent_trend': 0,
-                'mood_data': [],
-                'mood_distribution': {},
-                'message': 'No mood data available'
-            }), 200
-        
-        # Calculate average mood from all entries
-        average_mood = sum(entry.mood_score for entry in all_mood_entries) / len(all_mood_entries)
-        
-        # Calculate current streak
-        current_streak = 0
-        if all_mood_entries:
-            # Sort entries by date (newest first)
-            sorted_entries = sorted(all_mood_entries, key=lambda x: x.created_at, reverse=True)
-            current_date = datetime.utcnow().date()
-            
-            for entry in sorted_entries:
-                entry_date = entry.created_at.date()
-                if entry_date == current_date or entry_date == current_date - timedelta(days=1):
-                    current_streak += 1
-                    current_date = entry_date
-                else:
-                    break
-        
-        # Calculate recent trend (last 7 days vs previous 7 days)
-        recent_trend = 0
-        if len(all_mood_entries) >= 2:
-            last_week = end_date - timedelta(days=7)
-            previous_week = last_week - timedelta(days=7)
-            
-            recent_entries = [e for e in all_mood_entries if e.created_at >= last_week]
-            previous_entries = [e for e in all_mood_entries if last_week > e.created_at >= previous_week]
-            
-            if recent_entries and previous_entries:
-                recent_avg = sum(e.mood_score for e in recent_entries) / len(recent_entries)
-                previous_avg = sum(e.mood_score for e in previous_entries) / len(previous_entries)
-                recent_trend = recent_avg - previous_avg
-        
-        # Prepare mood data for chart (last 30 days)
-        mood_data = []
-        if mood_entries:
-            for entry in mood_entries:
-                mood_data.append({
-                    'date': entry.created_at.strftime('%Y-%m-%d'),
-                    'mood_score': entry.mood_score,
-                    'mood_label': entry.mood_label
-                })
-        
-        # Calculate mood distribution
-        mood_distribution = {}
-        for entry in all_mood_entries:
-            mood_distribution[entry.mood_label] = mood_distribution.get(entry.mood_label, 0) + 1
+    except Exception as e:
+        return jsonify({'error': 'Failed to get mood analytics', 'details': str(e)}), 500
+
+@mood_bp.route('/insights', methods=['GET'])
+@query_budget(2)
+@jwt_required()
+@read_only
+def get_mood_insights():
+    """Get correlations between mood, sleep, stress, energy and activities"""
+    try:
+        current_user_id = get_jwt_identity()
         
-        return jsonify({
-            'total_entries': total_entries,
-            'average_mood': round(average_mood, 2),
-            'current_streak': current_streak,
-            'recent_trend': round(recent_trend, 2),
-            'mood_data': mood_data,
-            'mood_distribution': mood_distribution
-        }), 200
+        return jsonify(cached_mood_insights(current_user_id)), 200
         
     except Exception as e:
-        return jsonify({'error': 'Failed to get mood analytics', 'details': str(e)}), 500
+        return jsonify({'error': 'Failed to get mood insights', 'details': str(e)}), 500
+
+@mood_bp.route('/insights/habits', methods=['GET'])
+@query_budget(8)
+@jwt_required()
+def get_mood_habits():
+    """Compare mood on days with and without exercise, meditation, breathing, water and journaling"""
+    try:
+        current_user_id = get_jwt_identity()
+
+        # Read-your-writes for coalesced water taps
+        water_coalescer.flush_user(current_user_id)
+        
+        # Built from raw entries on first call, then kept current by each write
+        matrix = load_daily_features(current_user_id)
+        
+        return jsonify(habit_comparison(matrix)), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to get mood habits', 'details': str(e)}), 500
+
+@mood_bp.route('/forecast', methods=['GET'])
+@query_budget(5)
+@jwt_required()
+def get_mood_forecast():
+    """Predict the user's mood for the next 7 days"""
+    try:
+        current_user_id = get_jwt_identity()
+        
+        # Evaluates coefficients fitted by `flask fit-mood-forecasts`
+        return jsonify(mood_forecast(current_user_id)), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to get mood forecast', 'details': str(e)}), 500
 
 @mood_bp.route('/<int:mood_id>', methods=['GET'])
+@query_budget(1)
 @jwt_required()
 def get_mood_entry(mood_id):
     """Get a specific mood entry"""
@@ -206,6 +208,7 @@ def get_mood_entry(mood_id):
         return jsonify({'error': 'Failed to get mood entry', 'details': str(e)}), 500
 
 @mood_bp.route('/<int:mood_id>', methods=['PUT'])
+@query_budget(9)
 @jwt_required()
 def update_mood_entry(mood_id):
     """Update a mood entry"""
@@ -234,7 +237,7 @@ def update_mood_entry(mood_id):
             mood_entry.notes = data['notes']
         
         if 'activities' in data:
-            mood_entry.activities = json.dumps(data['activities']) if data['activities'] else None
+            set_mood_activities(mood_entry, data['activities'])
         
         if 'sleep_hours' in data:
             mood_entry.sleep_hours = data['sleep_hours']
@@ -257,6 +260,7 @@ def update_mood_entry(mood_id):
         return jsonify({'error': 'Failed to update mood entry', 'details': str(e)}), 500
 
 @mood_bp.route('/<int:mood_id>', methods=['DELETE'])
+@query_budget(10)
 @jwt_required()
 def delete_mood_entry(mood_id):
     """Delete a mood entry"""
@@ -270,6 +274,8 @@ def delete_mood_entry(mood_id):
         if not mood_entry:
             return jsonify({'error': 'Mood entry not found'}), 404
         
+        delete_mood_activities(mood_entry.id)
+        delete_mood_alerts(mood_entry.id)
         db.session.delete(mood_entry)
         db.session.commit()
         
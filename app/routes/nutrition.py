@@ -1,17 +1,25 @@
 from flask import Blueprint, request, jsonify
-from flask_login import login_required, current_user
-from app import db
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import db, water_coalescer
+from app.query_budget import query_budget
 from app.models.nutrition import NutritionEntry, DailyNutritionSummary
-from datetime import datetime, date
+from app.read_models import NUTRITION_ENTRY, NUTRITION_DAY
+from app.series import FORMAT_ERROR, requested_format, to_columnar
+from app.services.daily_features import touch_day
+from app.services.data_versions import touch_data_version
+from app.services.streaks import touch_streak_day
+from datetime import datetime, date, timedelta
 import json
 
 nutrition_bp = Blueprint('nutrition', __name__)
 
 @nutrition_bp.route('/api/nutrition/meal', methods=['POST'])
-@login_required
+@query_budget(15)
+@jwt_required()
 def add_meal():
     """Add a meal entry"""
     try:
+        current_user_id = get_jwt_identity()
         data = request.get_json()
         meal_name = data.get('name')
         meal_type = data.get('type')
@@ -21,7 +29,7 @@ def add_meal():
         
         #  meal entry
         meal_entry = NutritionEntry(
-            user_id=current_user.id,
+            user_id=current_user_id,
             entry_type='meal',
             name=meal_name,
             meal_type=meal_type,
@@ -33,7 +41,7 @@ def add_meal():
         db.session.commit()
         
         # Update daily summary
-        update_daily_summary(current_user.id, date.today())
+        update_daily_summary(current_user_id, date.today())
         
         return jsonify({
             'message': 'Meal added successfully',
@@ -45,16 +53,30 @@ def add_meal():
         return jsonify({'error': str(e)}), 500
 
 @nutrition_bp.route('/api/nutrition/water', methods=['POST'])
-@login_required
+@query_budget(15)
+@jwt_required()
 def add_water():
     """Add water intake"""
     try:
+        current_user_id = get_jwt_identity()
         data = request.get_json()
         glasses = data.get('glasses', 1)
         
+        # Merge rapid taps into one row when coalescing is enabled; the tap
+        # is only accepted here and written when the coalescing window closes
+        if water_coalescer.enabled:
+            pending = water_coalescer.add(
+                current_user_id, glasses, date.today(), datetime.now().time()
+            )
+            return jsonify({
+                'message': 'Water intake accepted',
+                'water': pending,
+                'coalesced': True,
+                'committed': False
+            }), 202
         
         water_entry = NutritionEntry(
-            user_id=current_user.id,
+            user_id=current_user_id,
             entry_type='water',
             water_glasses=glasses,
             entry_date=date.today(),
@@ -65,7 +87,7 @@ def add_water():
         db.session.commit()
         
         # Update daily summary
-        update_daily_summary(current_user.id, date.today())
+        update_daily_summary(current_user_id, date.today())
         
         return jsonify({
             'message': 'Water intake recorded',
@@ -77,24 +99,33 @@ def add_water():
         return jsonify({'error': str(e)}), 500
 
 @nutrition_bp.route('/api/nutrition/daily/<date_str>', methods=['GET'])
-@login_required
+@query_budget(4)
+@jwt_required()
 def get_daily_nutrition(date_str):
     """Get nutrition data for a specific date"""
     try:
+        current_user_id = get_jwt_identity()
         target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
         
+        # Read-your-writes for coalesced water taps
+        water_coalescer.flush_user(current_user_id)
+        
         # Get meals for the date
-        meals = NutritionEntry.query.filter_by(
-            user_id=current_user.id,
-            entry_type='meal',
-            entry_date=target_date
-        ).all()
+        meals = NUTRITION_ENTRY.all(
+            NUTRITION_ENTRY.select().filter_by(
+                user_id=current_user_id,
+                entry_type='meal',
+                entry_date=target_date
+            )
+        )
         
         # Get water entries for the date
-        water_entries = NutritionEntry.query.filter_by(
-            user_id=current_user.id,
-            entry_type='water',
-            entry_date=target_date
+        water_entries = db.session.execute(
+            db.select(NutritionEntry.water_glasses).filter_by(
+                user_id=current_user_id,
+                entry_type='water',
+                entry_date=target_date
+            )
         ).all()
         
         # Calculate total water glasses
@@ -102,13 +133,13 @@ def get_daily_nutrition(date_str):
         
         # Get or create daily summary
         summary = DailyNutritionSummary.query.filter_by(
-            user_id=current_user.id,
+            user_id=current_user_id,
             summary_date=target_date
         ).first()
         
         if not summary:
             summary = DailyNutritionSummary(
-                user_id=current_user.id,
+                user_id=current_user_id,
                 summary_date=target_date,
                 total_meals=len(meals),
                 total_water_glasses=total_water
@@ -118,7 +149,7 @@ def get_daily_nutrition(date_str):
         
         return jsonify({
             'date': date_str,
-            'meals': [meal.to_dict() for meal in meals],
+            'meals': NUTRITION_ENTRY.dump(meals),
             'total_water_glasses': total_water,
             'summary': summary.to_dict()
         }), 200
@@ -126,14 +157,50 @@ def get_daily_nutrition(date_str):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@nutrition_bp.route('/api/nutrition/history', methods=['GET'])
+@query_budget(2)
+@jwt_required()
+def get_nutrition_history():
+    """Get daily meal and water totals for the last ``days`` days"""
+    try:
+        current_user_id = get_jwt_identity()
+        days = request.args.get('days', 30, type=int)
+        if not 1 <= days <= 3660:
+            return jsonify({'error': 'days must be between 1 and 3660'}), 400
+        series_format = requested_format()
+        if series_format is None:
+            return jsonify({'error': FORMAT_ERROR}), 400
+        
+        # Read-your-writes for coalesced water taps
+        water_coalescer.flush_user(current_user_id)
+        
+        history = NUTRITION_DAY.dump(NUTRITION_DAY.all(
+            NUTRITION_DAY.select().where(
+                DailyNutritionSummary.user_id == current_user_id,
+                DailyNutritionSummary.summary_date >= date.today() - timedelta(days=days)
+            ).order_by(DailyNutritionSummary.summary_date)
+        ))
+        if series_format == 'columnar':
+            history = to_columnar(history, 'summary_date', dictionary_fields=('mood_score',))
+        
+        return jsonify({
+            'days': days,
+            'history': history
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @nutrition_bp.route('/api/nutrition/meal/<int:meal_id>', methods=['DELETE'])
-@login_required
+@query_budget(15)
+@jwt_required()
 def delete_meal(meal_id):
     """Delete a meal entry"""
     try:
+        current_user_id = get_jwt_identity()
         meal = NutritionEntry.query.filter_by(
             id=meal_id,
-            user_id=current_user.id,
+            user_id=current_user_id,
             entry_type='meal'
         ).first()
         
@@ -144,7 +211,7 @@ def delete_meal(meal_id):
         db.session.commit()
         
         # Update daily summary
-        update_daily_summary(current_user.id, meal.entry_date)
+        update_daily_summary(current_user_id, meal.entry_date)
         
         return jsonify({'message': 'Meal deleted successfully'}), 200
         
@@ -153,21 +220,29 @@ def delete_meal(meal_id):
         return jsonify({'error': str(e)}), 500
 
 @nutrition_bp.route('/api/nutrition/reset-daily', methods=['POST'])
-@login_required
+@query_budget(9)
+@jwt_required()
 def reset_daily_nutrition():
     """Reset daily nutrition data"""
     try:
+        current_user_id = get_jwt_identity()
         today = date.today()
         
+        # Write pending water taps first so the reset removes them too
+        water_coalescer.flush_user(current_user_id)
+        
         # Delete today's entries
         NutritionEntry.query.filter_by(
-            user_id=current_user.id,
+            user_id=current_user_id,
             entry_date=today
         ).delete()
+        touch_day(current_user_id, today)
+        touch_streak_day(current_user_id, 'nutrition', today)
+        touch_data_version(current_user_id)
         
         # Delete today's summary
         DailyNutritionSummary.query.filter_by(
-            user_id=current_user.id,
+            user_id=current_user_id,
             summary_date=today
         ).delete()
         
@@ -179,8 +254,11 @@ def reset_daily_nutrition():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-def update_daily_summary(user_id, summary_date):
-    """Update daily nutrition summary"""
+def update_daily_summary(user_id, summary_date, commit=True):
+    """Update daily nutrition summary
+
+    Pass ``commit=False`` to leave the summary in the caller's transaction.
+    """
     try:
         # Count meals for the date
         meal_count = NutritionEntry.query.filter_by(
@@ -225,7 +303,8 @@ def update_daily_summary(user_id, summary_date):
             )
             db.session.add(summary)
         
-        db.session.commit()
+        if commit:
+            db.session.commit()
         
     except Exception as e:
         db.session.rollback()
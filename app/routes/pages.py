@@ -0,0 +1,103 @@
+from flask import Blueprint, jsonify, redirect
+from app import db, page_cache
+from app.query_budget import query_budget
+from datetime import datetime
+
+pages_bp = Blueprint('pages', __name__)
+
+@pages_bp.route('/')
+@query_budget(0)
+def index():
+    """Root endpoint - redirect to login"""
+    return redirect('/login')
+
+@pages_bp.route('/login')
+@query_budget(0)
+def login():
+    """Login page"""
+    return page_cache.render('login.html')
+
+@pages_bp.route('/dashboard')
+@query_budget(0)
+def dashboard():
+    """Dashboard page"""
+    return page_cache.render('dashboard.html')
+
+@pages_bp.route('/mood')
+@query_budget(0)
+def mood():
+    """Mood tracking page"""
+    return page_cache.render('mood.html')
+
+@pages_bp.route('/journal')
+@query_budget(0)
+def journal():
+    """Journal page"""
+    return page_cache.render('journal.html')
+
+@pages_bp.route('/resources')
+@query_budget(0)
+def resources():
+    """Resources page"""
+    return page_cache.render('resources.html')
+
+@pages_bp.route('/analytics')
+@query_budget(0)
+def analytics():
+    """Analytics page"""
+    return page_cache.render('analytics.html')
+
+@pages_bp.route('/profile')
+@query_budget(0)
+def profile():
+    """Profile page"""
+    return page_cache.render('profile.html')
+
+@pages_bp.route('/quiz')
+@query_budget(0)
+def quiz():
+    """Quiz page"""
+    return page_cache.render('quiz.html')
+
+@pages_bp.route('/api')
+@query_budget(0)
+def api_info():
+    """API information endpoint"""
+    return jsonify({
+        'status': 'success',
+        'message': 'Mental Health API is running',
+        'version': '1.0.0',
+        'endpoints': {
+            'auth': '/api/auth',
+            'user': '/api/user',
+            'mood': '/api/mood',
+            'journal': '/api/journal',
+            'resources': '/api/resources'
+        }
+    })
+
+@pages_bp.route('/health')
+@query_budget(0)
+def health_check():
+    """Health check endpoint"""
+    return jsonify({
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat()
+    })
+
+@pages_bp.app_errorhandler(404)
+def not_found(error):
+    """Handle 404 errors"""
+    return jsonify({
+        'error': 'Not found',
+        'message': 'The requested resource was not found'
+    }), 404
+
+@pages_bp.app_errorhandler(500)
+def internal_error(error):
+    """Handle 500 errors"""
+    db.session.rollback()
+    return jsonify({
+        'error': 'Internal server error',
+        'message': 'An unexpected error occurred'
+    }), 500
@@ -1,11 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
+from app.db_routing import read_only
+from app.query_budget import query_budget
 from app.models.resource import Resource
+from app.services.dashboard import featured_resources, section_cache
 
 resources_bp = Blueprint('resources', __name__)
 
 @resources_bp.route('/', methods=['GET'])
+@query_budget(2)
+@read_only
 def get_resources():
     """Get all active resources"""
     try:
@@ -67,6 +72,8 @@ def get_resources():
         return jsonify({'error': 'Failed to get resources', 'details': str(e)}), 500
 
 @resources_bp.route('/<int:resource_id>', methods=['GET'])
+@query_budget(1)
+@read_only
 def get_resource(resource_id):
     """Get a specific resource"""
     try:
@@ -85,6 +92,8 @@ def get_resource(resource_id):
         return jsonify({'error': 'Failed to get resource', 'details': str(e)}), 500
 
 @resources_bp.route('/categories', methods=['GET'])
+@query_budget(1)
+@read_only
 def get_categories():
     """Get all available resource categories"""
     try:
@@ -99,6 +108,8 @@ def get_categories():
         return jsonify({'error': 'Failed to get categories', 'details': str(e)}), 500
 
 @resources_bp.route('/types', methods=['GET'])
+@query_budget(1)
+@read_only
 def get_types():
     """Get all available resource types"""
     try:
@@ -113,24 +124,22 @@ def get_types():
         return jsonify({'error': 'Failed to get types', 'details': str(e)}), 500
 
 @resources_bp.route('/featured', methods=['GET'])
+@query_budget(1)
+@read_only
 def get_featured_resources():
     """Get featured resources"""
     try:
-        featured_resources = Resource.query.filter_by(
-            is_featured=True, is_active=True
-        ).order_by(Resource.created_at.desc()).limit(10).all()
-        
-        resources = [resource.to_dict() for resource in featured_resources]
-        
         return jsonify({
-            'featured_resources': resources
+            'featured_resources': featured_resources()
         }), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to get featured resources', 'details': str(e)}), 500
 
 @resources_bp.route('/recommended', methods=['GET'])
+@query_budget(3)
 @jwt_required()
+@read_only
 def get_recommended_resources():
     """Get recommended resources based on user's mood history"""
     try:
@@ -193,6 +202,7 @@ def get_recommended_resources():
 
 # Admin routes (would require admin authentication in production)
 @resources_bp.route('/', methods=['POST'])
+@query_budget(3)
 @jwt_required()
 def create_resource():
     """Create a new resource (admin only)"""
@@ -222,6 +232,7 @@ def create_resource():
         
         db.session.add(resource)
         db.session.commit()
+        section_cache.invalidate(section='featured_resources')
         
         return jsonify({
             'message': 'Resource created successfully',
@@ -233,6 +244,7 @@ def create_resource():
         return jsonify({'error': 'Failed to create resource', 'details': str(e)}), 500
 
 @resources_bp.route('/<int:resource_id>', methods=['PUT'])
+@query_budget(4)
 @jwt_required()
 def update_resource(resource_id):
     """Update a resource (admin only)"""
@@ -256,6 +268,7 @@ def update_resource(resource_id):
                 setattr(resource, field, data[field])
         
         db.session.commit()
+        section_cache.invalidate(section='featured_resources')
         
         return jsonify({
             'message': 'Resource updated successfully',
@@ -267,6 +280,7 @@ def update_resource(resource_id):
         return jsonify({'error': 'Failed to update resource', 'details': str(e)}), 500
 
 @resources_bp.route('/<int:resource_id>', methods=['DELETE'])
+@query_budget(3)
 @jwt_required()
 def delete_resource(resource_id):
     """Delete a resource (admin only)"""
@@ -278,6 +292,7 @@ def delete_resource(resource_id):
         
         db.session.delete(resource)
         db.session.commit()
+        section_cache.invalidate(section='featured_resources')
         
         return jsonify({
             'message': 'Resource deleted successfully'
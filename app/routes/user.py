@@ -1,13 +1,23 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
+from app import db, bcrypt, water_coalescer
+from app.db_routing import read_only
+from app.query_budget import query_budget
 from app.models.user import User
+from app.models.mood import MoodEntry
+from app.models.journal import JournalEntry
+from app.models.account_deletion import AccountDeletion
+from app.read_models import MOOD_ENTRY, JOURNAL_ENTRY
+from app.services.account_purge import schedule_purge
+from app.services.dashboard import user_stats
+from app.services.streaks import streak_report
 from email_validator import validate_email, EmailNotValidError
 from datetime import datetime
 
 user_bp = Blueprint('user', __name__)
 
 @user_bp.route('/profile', methods=['GET'])
+@query_budget(1)
 @jwt_required()
 def get_profile():
     """Get current user's profile"""
@@ -24,6 +34,7 @@ def get_profile():
         return jsonify({'error': 'Failed to get profile', 'details': str(e)}), 500
 
 @user_bp.route('/profile', methods=['PUT'])
+@query_budget(5)
 @jwt_required()
 def update_profile():
     """Update current user's profile"""
@@ -80,6 +91,7 @@ def update_profile():
         return jsonify({'error': 'Failed to update profile', 'details': str(e)}), 500
 
 @user_bp.route('/change-password', methods=['PUT'])
+@query_budget(4)
 @jwt_required()
 def change_password():
     """Change user's password"""
@@ -105,7 +117,7 @@ def change_password():
             return jsonify({'error': 'New password must be at least 6 characters long'}), 400
         
         # Update password
-        user.password_hash = user.bcrypt.generate_password_hash(data['new_password']).decode('utf-8')
+        user.password_hash = bcrypt.generate_password_hash(data['new_password']).decode('utf-8')
         user.updated_at = datetime.utcnow()
         
         db.session.commit()
@@ -119,44 +131,48 @@ def change_password():
         return jsonify({'error': 'Failed to change password', 'details': str(e)}), 500
 
 @user_bp.route('/stats', methods=['GET'])
+@query_budget(1)
 @jwt_required()
+@read_only
 def get_user_stats():
     """Get user statistics"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+
+        # Read-your-writes for coalesced water taps
+        water_coalescer.flush_user(current_user_id)
         
-        if not user:
+        stats = user_stats(current_user_id)
+        if stats is None:
             return jsonify({'error': 'User not found'}), 404
         
-        # Calculate statistics
-        total_mood_entries = len(user.mood_entries)
-        total_journal_entries = len(user.journal_entries)
-        
-        # Days since registration
-        days_since_registration = (datetime.utcnow() - user.created_at).days
+        return jsonify({'stats': stats}), 200
         
-        # Recent activity (last 7 days)
-        from datetime import timedelta
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_mood_entries = len([e for e in user.mood_entries if e.created_at >= week_ago])
-        recent_journal_entries = len([e for e in user.journal_entries if e.created_at >= week_ago])
+    except Exception as e:
+        return jsonify({'error': 'Failed to get user stats', 'details': str(e)}), 500
+
+@user_bp.route('/streaks', methods=['GET'])
+@query_budget(8)
+@jwt_required()
+@read_only
+def get_streaks():
+    """Get current and longest streaks and a daily heatmap for every tracker"""
+    try:
+        current_user_id = get_jwt_identity()
+        days = request.args.get('days', 365, type=int)
+        if not 1 <= days <= 3660:
+            return jsonify({'error': 'days must be between 1 and 3660'}), 400
+
+        # Read-your-writes for coalesced water taps
+        water_coalescer.flush_user(current_user_id)
         
-        return jsonify({
-            'stats': {
-                'total_mood_entries': total_mood_entries,
-                'total_journal_entries': total_journal_entries,
-                'days_since_registration': days_since_registration,
-                'recent_mood_entries': recent_mood_entries,
-                'recent_journal_entries': recent_journal_entries,
-                'account_age_days': days_since_registration
-            }
-        }), 200
+        return jsonify(streak_report(current_user_id, days)), 200
         
     except Exception as e:
-        return jsonify({'error': 'Failed to get user stats', 'details': str(e)}), 500
+        return jsonify({'error': 'Failed to get streaks', 'details': str(e)}), 500
 
 @user_bp.route('/settings', methods=['PUT'])
+@query_budget(2)
 @jwt_required()
 def update_settings():
     """Update user settings"""
@@ -184,7 +200,9 @@ def update_settings():
         return jsonify({'error': 'Failed to update settings', 'details': str(e)}), 500
 
 @user_bp.route('/export', methods=['GET'])
+@query_budget(3)
 @jwt_required()
+@read_only
 def export_data():
     """Export user data"""
     try:
@@ -197,8 +215,12 @@ def export_data():
         # Collect all user data
         data = {
             'user': user.to_dict(),
-            'mood_entries': [entry.to_dict() for entry in user.mood_entries],
-            'journal_entries': [entry.to_dict() for entry in user.journal_entries]
+            'mood_entries': MOOD_ENTRY.dump(MOOD_ENTRY.all(
+                MOOD_ENTRY.select().where(MoodEntry.user_id == user.id).order_by(MoodEntry.id)
+            )),
+            'journal_entries': JOURNAL_ENTRY.dump(JOURNAL_ENTRY.all(
+                JOURNAL_ENTRY.select().where(JournalEntry.user_id == user.id).order_by(JournalEntry.id)
+            ))
         }
 
         return jsonify(data), 200
@@ -207,6 +229,7 @@ def export_data():
         return jsonify({'error': 'Failed to export data', 'details': str(e)}), 500
 
 @user_bp.route('/delete', methods=['DELETE'])
+@query_budget(7)
 @jwt_required()
 def delete_account():
     """Delete user account"""
@@ -217,14 +240,48 @@ def delete_account():
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
-        # Delete user (cascade will delete related entries)
-        db.session.delete(user)
+        # Deactivate now and leave the data purge to a background job
+        job = AccountDeletion.query.filter(
+            AccountDeletion.user_id == current_user_id,
+            AccountDeletion.status != 'completed'
+        ).first()
+        if not job:
+            job = AccountDeletion(user_id=current_user_id)
+            db.session.add(job)
+
+        user.is_active = False
+        user.updated_at = datetime.utcnow()
         db.session.commit()
 
+        schedule_purge(job.id)
+
         return jsonify({
-            'message': 'Account deleted successfully'
-        }), 200
+            'message': 'Account deletion scheduled',
+            'deletion': job.to_dict()
+        }), 202
 
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to delete account', 'details': str(e)}), 500
+
+@user_bp.route('/delete/status', methods=['GET'])
+@query_budget(1)
+@jwt_required()
+def get_deletion_status():
+    """Get progress of the current user's account deletion"""
+    try:
+        current_user_id = get_jwt_identity()
+
+        job = AccountDeletion.query.filter_by(
+            user_id=current_user_id
+        ).order_by(AccountDeletion.created_at.desc()).first()
+
+        if not job:
+            return jsonify({'error': 'No account deletion in progress'}), 404
+
+        return jsonify({
+            'deletion': job.to_dict()
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': 'Failed to get deletion status', 'details': str(e)}), 500
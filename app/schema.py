@@ -0,0 +1,70 @@
+"""Versioned schema check run at startup instead of ``db.create_all()``
+
+Startup reads one row from ``schema_meta`` and only creates tables when
+the stored version is missing or older than ``SCHEMA_VERSION``. Bump
+``SCHEMA_VERSION`` whenever a model adds a table.
+"""
+
+import logging
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app import db
+from app.models.schema_meta import SchemaMeta
+
+SCHEMA_VERSION = 8
+
+
+def get_schema_version():
+    """Return the stored schema version, or None for an unversioned database"""
+    # Select from the table rather than the entity: an ORM query would
+    # configure every mapper at startup instead of on the first request
+    schema_meta = SchemaMeta.__table__
+    try:
+        return db.session.execute(
+            db.select(schema_meta.c.version).where(schema_meta.c.id == 1)
+        ).scalar()
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return None
+
+
+def upgrade_schema():
+    """Create missing tables and record the current schema version"""
+    db.create_all()
+
+    meta = db.session.get(SchemaMeta, 1)
+    if meta:
+        meta.version = SCHEMA_VERSION
+    else:
+        db.session.add(SchemaMeta(id=1, version=SCHEMA_VERSION))
+    db.session.commit()
+
+
+def ensure_schema(app):
+    """Check the schema version and upgrade it only when it is behind"""
+    with app.app_context():
+        version = get_schema_version()
+
+        if version is None or version < SCHEMA_VERSION:
+            upgrade_schema()
+        elif version > SCHEMA_VERSION:
+            logging.warning(
+                f"Database schema v{version} is newer than this code (v{SCHEMA_VERSION})"
+            )
+
+        db.session.remove()
+
+        # Drop startup connections so forked workers open their own
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create missing tables and stamp the schema version"""
+    upgrade_schema()
+    click.echo(f"✅ Database schema at v{SCHEMA_VERSION}")
@@ -0,0 +1,157 @@
+"""Compact chart time series: columnar encoding and downsampling
+
+With ``format=columnar`` a list of row objects is returned as parallel
+arrays instead. Dates become day offsets from the previous point (the
+first one relative to ``start_date``), and repetitive strings are
+dictionary encoded: the column holds indexes into ``dictionaries[field]``.
+Offsets are negative when the series is ordered newest first.
+
+    {"format": "columnar", "length": 3, "start_date": "2024-01-01",
+     "day_deltas": [0, 1, 2], "columns": {"mood_score": [7, 5, 6],
+     "mood_label": [0, 1, 0]}, "dictionaries": {"mood_label": ["Okay", "Sad"]}}
+"""
+
+from datetime import date, datetime
+
+from flask import request
+
+FORMATS = ('rows', 'columnar')
+FORMAT_ERROR = 'format must be rows or columnar'
+
+
+def requested_format():
+    """The ``format`` query argument, or None if it is not a known format"""
+    value = request.args.get('format', 'rows')
+    return value if value in FORMATS else None
+
+
+def as_date(value):
+    """The calendar day of a date, datetime or ISO string"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def to_columnar(rows, date_field, dictionary_fields=()):
+    """Encode ``rows`` (dicts with the same keys) as columnar arrays"""
+    if not rows:
+        return {'format': 'columnar', 'length': 0, 'start_date': None,
+                'day_deltas': [], 'columns': {}, 'dictionaries': {}}
+
+    fields = [field for field in rows[0] if field != date_field]
+    columns = {field: [row[field] for row in rows] for field in fields}
+
+    dictionaries = {}
+    for field in dictionary_fields:
+        values = columns[field]
+        index = {}
+        columns[field] = [index.setdefault(value, len(index)) for value in values]
+        dictionaries[field] = list(index)
+
+    days = [as_date(row[date_field]) for row in rows]
+    previous = days[0]
+    day_deltas = []
+    for day in days:
+        day_deltas.append((day - previous).days)
+        previous = day
+
+    return {
+        'format': 'columnar',
+        'length': len(rows),
+        'start_date': days[0].isoformat(),
+        'day_deltas': day_deltas,
+        'columns': columns,
+        'dictionaries': dictionaries
+    }
+
+
+def _bucket(rows, date_field, value_field, label_field):
+    """Merge aggregate rows into one bucket dated by the first of them"""
+    count = sum(row['count'] for row in rows)
+    mean = sum(row['sum'] for row in rows) / count
+    labels = {}
+    for row in rows:
+        labels[row[label_field]] = labels.get(row[label_field], 0) + row['count']
+    return {
+        date_field: rows[0][date_field],
+        value_field: round(mean, 2),
+        label_field: max(labels, key=labels.get),
+        'min': min(row['min'] for row in rows),
+        'max': max(row['max'] for row in rows),
+        'mean': round(mean, 2),
+        'count': count
+    }
+
+
+def _group(rows, key):
+    groups = {}
+    for row in rows:
+        groups.setdefault(key(row), []).append(row)
+    return list(groups.values())
+
+
+def _lttb_indexes(xs, ys, threshold):
+    """Indexes kept by Largest-Triangle-Three-Buckets, first and last included"""
+    n = len(xs)
+    every = (n - 2) / (threshold - 2)
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        # Average of the next bucket is the third corner of the triangle
+        next_start, next_end = end, min(int((i + 2) * every) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        avg_x = sum(xs[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(ys[next_start:next_end]) / (next_end - next_start)
+
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+def downsample(rows, max_points, date_field='date', value_field='mood_score', label_field='mood_label'):
+    """Reduce a series of daily aggregates to at most ``max_points`` buckets
+
+    ``rows`` come from a grouped query, oldest day first, one per day and
+    label with the ``count``, ``min``, ``max`` and ``sum`` of the values.
+    ``max_points`` must be at least 3. Returns ``(buckets, resolution)``:
+    one bucket per day, else per week, whichever first fits; if weekly
+    buckets still do not fit, LTTB picks the days that preserve the shape
+    of the series. Every bucket carries ``min``, ``max``, ``mean`` and
+    ``count`` of the entries it stands for.
+    """
+    days = _group(rows, lambda row: as_date(row[date_field]))
+    if len(days) <= max_points:
+        return [_bucket(day, date_field, value_field, label_field) for day in days], 'day'
+
+    def week_start(row):
+        day = as_date(row[date_field])
+        return day.toordinal() - day.weekday()
+
+    weeks = _group(rows, week_start)
+    if len(weeks) <= max_points:
+        return [_bucket(week, date_field, value_field, label_field) for week in weeks], 'week'
+
+    # LTTB over daily means. Each kept day keeps its own value, so the shape
+    # survives, and reports the statistics of the days up to the next kept one
+    daily = [_bucket(day, date_field, value_field, label_field) for day in days]
+    xs = [as_date(bucket[date_field]).toordinal() for bucket in daily]
+    ys = [bucket['mean'] for bucket in daily]
+    kept = _lttb_indexes(xs, ys, max_points)
+    buckets = []
+    for start, end in zip(kept, kept[1:] + [len(days)]):
+        bucket = _bucket([row for day in days[start:end] for row in day],
+                         date_field, value_field, label_field)
+        bucket[value_field] = daily[start][value_field]
+        buckets.append(bucket)
+    return buckets, 'lttb'
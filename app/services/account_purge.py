@@ -0,0 +1,156 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app import db
+from app.models.account_deletion import AccountDeletion
+from app.models.user import User
+from app.models.mood import MoodEntry, MoodActivity
+from app.models.journal import JournalEntry
+from app.models.exercise import ExerciseSession, MeditationSession, BreathingMethod
+from app.models.nutrition import NutritionEntry, DailyNutritionSummary
+from app.models.daily_features import DailyFeatures
+from app.models.mood_anomaly import MoodBaseline, MoodAlert
+from app.models.mood_forecast import MoodForecastModel
+from app.models.activity_bitmap import ActivityBitmap
+from app.models.data_version import UserDataVersion
+
+# Every table holding rows owned by a user, children before parents.
+USER_OWNED_MODELS = [
+    MoodActivity,
+    MoodAlert,
+    MoodEntry,
+    MoodBaseline,
+    MoodForecastModel,
+    JournalEntry,
+    ExerciseSession,
+    MeditationSession,
+    BreathingMethod,
+    NutritionEntry,
+    DailyNutritionSummary,
+    DailyFeatures,
+    ActivityBitmap,
+    UserDataVersion,
+]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def schedule_purge(job_id):
+    """Run the purge for ``job_id`` on the background worker thread"""
+    global _executor
+    app = current_app._get_current_object()
+    if not app.config.get('ACCOUNT_PURGE_IN_BACKGROUND', True):
+        return
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='account-purge')
+        _executor.submit(_run_in_app, app, job_id)
+
+
+def _run_in_app(app, job_id):
+    with app.app_context():
+        try:
+            run_purge(job_id)
+        except Exception:
+            logging.exception(f"Account purge job {job_id} failed")
+
+
+def run_purge(job_id):
+    """Delete everything owned by the job's user in bounded chunks
+
+    Each chunk is its own short transaction, so SQLite's write lock is
+    released between chunks and live requests can interleave.
+    """
+    job = db.session.get(AccountDeletion, job_id)
+    if job is None or job.status == 'completed':
+        return job
+
+    chunk_size = current_app.config.get('ACCOUNT_PURGE_CHUNK_SIZE', 500)
+    pause = current_app.config.get('ACCOUNT_PURGE_PAUSE_MS', 10) / 1000
+    user_id = job.user_id
+
+    try:
+        job.status = 'running'
+        job.error = None
+        job.rows_total = (job.rows_deleted or 0) + sum(
+            db.session.execute(
+                db.select(db.func.count()).select_from(model).where(model.user_id == user_id)
+            ).scalar()
+            for model in USER_OWNED_MODELS
+        )
+        db.session.commit()
+
+        # Keep sweeping until a full pass finds nothing, which also catches
+        # rows written by requests that were in flight when deletion began.
+        while True:
+            deleted_in_pass = 0
+            for model in USER_OWNED_MODELS:
+                deleted_in_pass += _purge_table(job, model, chunk_size, pause)
+            if not deleted_in_pass:
+                break
+
+        job.current_table = User.__tablename__
+        db.session.execute(db.delete(User.__table__).where(User.__table__.c.id == user_id))
+        job.status = 'completed'
+        job.current_table = None
+        job.completed_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(AccountDeletion, job_id)
+        job.status = 'failed'
+        job.error = str(e)
+        db.session.commit()
+        raise
+
+    return job
+
+
+def _purge_table(job, model, chunk_size, pause):
+    table = model.__table__
+    deleted = 0
+    while True:
+        ids = db.session.execute(
+            db.select(table.c.id).where(table.c.user_id == job.user_id).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            return deleted
+
+        db.session.execute(db.delete(table).where(table.c.id.in_(ids)))
+        job.current_table = table.name
+        job.rows_deleted = (job.rows_deleted or 0) + len(ids)
+        db.session.commit()
+        deleted += len(ids)
+
+        if len(ids) < chunk_size:
+            return deleted
+        if pause:
+            time.sleep(pause)
+
+
+@click.command('purge-accounts')
+@with_appcontext
+def purge_accounts_command():
+    """Run or resume unfinished account deletion jobs"""
+    jobs = AccountDeletion.query.filter(
+        AccountDeletion.status != 'completed'
+    ).order_by(AccountDeletion.created_at.asc()).all()
+
+    for job in jobs:
+        click.echo(f"Purging user {job.user_id} (job {job.id})...")
+        try:
+            job = run_purge(job.id)
+        except Exception as e:
+            click.echo(f"  failed: {e}")
+            continue
+        click.echo(f"  {job.rows_deleted} rows deleted")
+
+    click.echo(f"✅ {len(jobs)} deletion job(s) processed")
@@ -0,0 +1,61 @@
+"""Plumbing shared by the offline jobs that fan work out to processes
+
+Workers never touch the Flask app or its session. Each opens its own
+read-only connection from the URI ``read_only_source()`` returns: SQLite
+files are opened with ``mode=ro``, other databases through the ``read``
+bind when one is configured. The parent process writes the results.
+"""
+
+from flask import current_app
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import NullPool
+
+from app import db
+from app.db_routing import READ_BIND, sqlite_read_only_uri
+from app.engine_profile import apply_sqlite_pragmas
+
+# Worker-process engines by URI; NullPool keeps no connection open across a fork
+_engines = {}
+
+
+def worker_engine(uri, pragmas):
+    engine = _engines.get(uri)
+    if engine is None:
+        engine = _engines[uri] = create_engine(uri, poolclass=NullPool)
+        if engine.dialect.name == 'sqlite' and pragmas:
+            @event.listens_for(engine, 'connect')
+            def set_sqlite_pragmas(dbapi_connection, connection_record):
+                apply_sqlite_pragmas(dbapi_connection, pragmas)
+    return engine
+
+
+def read_only_source():
+    """URI the workers read from, and the SQLite pragmas to open it with"""
+    config = current_app.config
+    if READ_BIND in db.engines:
+        uri = db.engines[READ_BIND].url.render_as_string(hide_password=False)
+    else:
+        uri = db.engine.url.render_as_string(hide_password=False)
+        uri = sqlite_read_only_uri(uri) or uri
+    # A read-only connection cannot change the journal mode
+    pragmas = {k: v for k, v in (config.get('SQLITE_PRAGMAS') or {}).items() if k != 'journal_mode'}
+    return uri, pragmas
+
+
+def shard_ranges(user_ids, shards):
+    """Split sorted ``user_ids`` into at most ``shards`` (first, last) id ranges"""
+    if not user_ids:
+        return []
+    size = -(-len(user_ids) // max(shards, 1))
+    return [(user_ids[i], user_ids[min(i + size, len(user_ids)) - 1])
+            for i in range(0, len(user_ids), size)]
+
+
+def map_in_processes(func, tasks, processes):
+    """``[func(task) for task in tasks]``, across ``processes`` workers when more than one"""
+    if processes == 1:
+        return [func(task) for task in tasks]
+    # Imported here so multiprocessing is not loaded at app startup
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(func, tasks))
@@ -0,0 +1,98 @@
+"""Year calendar of activity levels across every tracker
+
+Served from the daily feature matrix (``daily_features``), which already
+rolls each tracker up per day, so a year is one indexed range read of at
+most 366 rows rather than a scan of the raw entry tables. Each tracker
+becomes a 366-element array of levels 0-4 indexed by day of year; the
+last element is null outside leap years.
+
+The ETag is derived from the user's persisted data version, not from the
+cached payload, so every worker answers a revalidation the same way, with
+one primary key read and without building the calendar.
+"""
+
+import hashlib
+import json
+from bisect import bisect_right
+from datetime import date
+
+from flask import current_app
+
+from app import db
+from app.models.daily_features import DailyFeatures
+from app.services.daily_features import load_daily_features
+from app.services.dashboard import section_cache
+from app.services.data_versions import data_version
+
+# Tracker -> (daily feature columns summed into its amount, amounts starting levels 1-4)
+LEVELS = {
+    'mood': (('mood_entries',), (1, 2, 3, 4)),
+    'journal': (('journal_entries',), (1, 2, 3, 4)),
+    'exercise': (('exercise_seconds',), (60, 900, 1800, 3600)),
+    'meditation': (('meditation_seconds',), (60, 300, 600, 1200)),
+    'breathing': (('breathing_seconds',), (60, 180, 300, 600)),
+    'nutrition': (('meals', 'water_glasses'), (1, 3, 6, 9)),
+}
+
+CALENDAR_DAYS = 366
+
+_COLUMNS = tuple(dict.fromkeys(name for fields, _ in LEVELS.values() for name in fields))
+
+# Changing the levels changes every ETag
+_LEVELS_TAG = json.dumps(LEVELS, sort_keys=True)
+
+
+def _year_rows(user_id, year):
+    table = DailyFeatures.__table__
+    return db.session.execute(
+        db.select(table.c.feature_date, *(table.c[name] for name in _COLUMNS))
+        .where(table.c.user_id == user_id,
+               table.c.feature_date.between(date(year, 1, 1), date(year, 12, 31)))
+    ).mappings().all()
+
+
+def _is_built(user_id):
+    table = DailyFeatures.__table__
+    return db.session.execute(
+        db.select(table.c.id).where(table.c.user_id == user_id).limit(1)
+    ).scalar() is not None
+
+
+def activity_calendar(user_id, year):
+    """Levels per tracker for every day of ``year``"""
+    rows = _year_rows(user_id, year)
+    if not rows and not _is_built(user_id):
+        # First use builds the user's matrix, which later writes keep current
+        rows = [day for day in load_daily_features(user_id) if day['feature_date'].year == year]
+
+    days_in_year = (date(year + 1, 1, 1) - date(year, 1, 1)).days
+    levels = {tracker: [0] * days_in_year + [None] * (CALENDAR_DAYS - days_in_year) for tracker in LEVELS}
+    for row in rows:
+        index = row['feature_date'].timetuple().tm_yday - 1
+        for tracker, (fields, thresholds) in LEVELS.items():
+            levels[tracker][index] = bisect_right(thresholds, sum(row[name] for name in fields))
+
+    return {
+        'year': year,
+        'days_in_year': days_in_year,
+        'levels': levels,
+        'active_days': {tracker: sum(1 for level in days if level) for tracker, days in levels.items()},
+        'thresholds': {tracker: list(thresholds) for tracker, (_, thresholds) in LEVELS.items()}
+    }
+
+
+def calendar_version(user_id, year):
+    """``(data version, etag)`` of the user's calendar for ``year`` (one query)"""
+    version = data_version(user_id)
+    tag = f'{user_id}:{year}:{version}:{_LEVELS_TAG}'.encode()
+    return version, hashlib.sha256(tag).hexdigest()[:32]
+
+
+def cached_activity_calendar(user_id, year, version):
+    """``activity_calendar`` through the section cache, valid while the user's data version is"""
+    key = ('calendar', str(user_id), year)
+    calendar = section_cache.get(key, version)
+    if calendar is None:
+        calendar = activity_calendar(user_id, year)
+        section_cache.set(key, calendar, current_app.config.get('CALENDAR_CACHE_SECONDS', 3600), version)
+    return calendar
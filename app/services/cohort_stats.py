@@ -0,0 +1,199 @@
+"""Population statistics computed offline across all users
+
+``run_cohort_stats`` splits users into contiguous id ranges (shards) and
+aggregates each shard in a ``ProcessPoolExecutor`` worker over its own
+read-only connection: SQLite files are opened with ``mode=ro``, other
+databases through the ``read`` bind when one is configured. Shards hold
+disjoint users, so per-shard counts, sums and distinct-user counts merge
+by addition. The merged result is written to ``cohort_stats`` in one
+transaction and served by ``/api/admin/cohort-stats``; buckets with fewer
+than COHORT_MIN_USERS users are never stored.
+"""
+
+import logging
+import os
+import time
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app import db
+from app.models.cohort_stats import CohortRun, CohortStat
+from app.models.user import User
+from app.models.mood import MoodEntry
+from app.models.journal import JournalEntry
+from app.models.exercise import ExerciseSession, MeditationSession, BreathingMethod
+from app.models.nutrition import NutritionEntry
+from app.services.batch import map_in_processes, read_only_source, shard_ranges, worker_engine
+
+METRICS = ('mood_by_weekday', 'activity_adoption', 'sentiment_mix')
+
+TRACKERS = {
+    'mood': MoodEntry.__table__,
+    'journal': JournalEntry.__table__,
+    'exercise': ExerciseSession.__table__,
+    'meditation': MeditationSession.__table__,
+    'breathing': BreathingMethod.__table__,
+    'nutrition': NutritionEntry.__table__,
+}
+
+# extract('dow') numbering, Sunday first
+WEEKDAYS = ('Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday')
+
+
+def shard_stats(task):
+    """Additive aggregates for users ``first_id..last_id`` (runs in a worker)"""
+    uri, pragmas, first_id, last_id = task
+    users = User.__table__
+    mood = TRACKERS['mood']
+    journal = TRACKERS['journal']
+
+    with worker_engine(uri, pragmas).connect() as conn:
+        partial = {'users': conn.execute(
+            db.select(db.func.count()).select_from(users)
+            .where(users.c.id.between(first_id, last_id))
+        ).scalar()}
+
+        weekday = db.extract('dow', mood.c.created_at)
+        partial['mood_by_weekday'] = {
+            WEEKDAYS[int(day)]: [entries, int(score_sum or 0), user_count]
+            for day, entries, score_sum, user_count in conn.execute(
+                db.select(weekday, db.func.count(), db.func.sum(mood.c.mood_score),
+                          db.func.count(db.distinct(mood.c.user_id)))
+                .where(mood.c.user_id.between(first_id, last_id))
+                .group_by(weekday)
+            )
+        }
+
+        counts = []
+        for table in TRACKERS.values():
+            in_shard = table.c.user_id.between(first_id, last_id)
+            counts.append(db.select(db.func.count(db.distinct(table.c.user_id)))
+                          .where(in_shard).scalar_subquery())
+            counts.append(db.select(db.func.count()).select_from(table)
+                          .where(in_shard).scalar_subquery())
+        row = conn.execute(db.select(*counts)).one()
+        partial['activity_adoption'] = {
+            name: [row[2 * i], row[2 * i + 1]] for i, name in enumerate(TRACKERS)
+        }
+
+        partial['sentiment_mix'] = {
+            sentiment or 'unscored': [entries, user_count]
+            for sentiment, entries, user_count in conn.execute(
+                db.select(journal.c.sentiment, db.func.count(),
+                          db.func.count(db.distinct(journal.c.user_id)))
+                .where(journal.c.user_id.between(first_id, last_id))
+                .group_by(journal.c.sentiment)
+            )
+        }
+    return partial
+
+
+def merge_partials(partials):
+    """Sum shard results bucket by bucket"""
+    merged = {'users': 0, **{metric: {} for metric in METRICS}}
+    for partial in partials:
+        merged['users'] += partial['users']
+        for metric in METRICS:
+            for bucket, values in partial[metric].items():
+                current = merged[metric].setdefault(bucket, [0] * len(values))
+                for i, value in enumerate(values):
+                    current[i] += value
+    return merged
+
+
+def build_stat_rows(merged, min_users):
+    """``cohort_stats`` rows for the merged result, small buckets suppressed"""
+    rows = []
+
+    for bucket, (entries, score_sum, users) in merged['mood_by_weekday'].items():
+        rows.append(('mood_by_weekday', bucket, users, entries, round(score_sum / entries, 3)))
+
+    for bucket, (users, entries) in merged['activity_adoption'].items():
+        share = round(users / merged['users'], 4) if merged['users'] else None
+        rows.append(('activity_adoption', bucket, users, entries, share))
+
+    journal_total = sum(entries for entries, _ in merged['sentiment_mix'].values())
+    for bucket, (entries, users) in merged['sentiment_mix'].items():
+        rows.append(('sentiment_mix', bucket, users, entries, round(entries / journal_total, 4)))
+
+    return [
+        {'metric': metric, 'bucket': bucket, 'users': users, 'entries': entries, 'value': value}
+        for metric, bucket, users, entries, value in rows
+        if users >= min_users
+    ]
+
+
+def run_cohort_stats(processes=None, shards=None):
+    """Compute and store population statistics; returns the ``CohortRun``"""
+    config = current_app.config
+    processes = processes or config.get('COHORT_STATS_PROCESSES') or os.cpu_count() or 1
+    shards = shards or processes * config.get('COHORT_STATS_SHARDS_PER_PROCESS', 4)
+
+    run = CohortRun(processes=processes, shards=shards)
+    db.session.add(run)
+    db.session.commit()
+
+    started = time.perf_counter()
+    try:
+        user_ids = db.session.execute(db.select(User.id).order_by(User.id)).scalars().all()
+        # End the read transaction before forking workers
+        db.session.commit()
+
+        uri, pragmas = read_only_source()
+        tasks = [(uri, pragmas, first, last) for first, last in shard_ranges(user_ids, shards)]
+        merged = merge_partials(map_in_processes(shard_stats, tasks, processes))
+
+        rows = build_stat_rows(merged, config.get('COHORT_MIN_USERS', 5))
+        db.session.execute(db.delete(CohortStat.__table__))
+        if rows:
+            db.session.execute(db.insert(CohortStat.__table__), [{'run_id': run.id, **row} for row in rows])
+        run.status = 'completed'
+        run.users_total = merged['users']
+        run.duration_ms = round((time.perf_counter() - started) * 1000)
+        run.completed_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        run.status = 'failed'
+        run.error = str(e)
+        db.session.commit()
+        logging.exception(f"Cohort stats run {run.id} failed")
+        raise
+
+    return run
+
+
+def latest_cohort_stats():
+    """The newest completed run and its stats grouped by metric, or None"""
+    run = db.session.execute(
+        db.select(CohortRun).where(CohortRun.status == 'completed')
+        .order_by(CohortRun.id.desc()).limit(1)
+    ).scalar()
+    if run is None:
+        return None
+
+    stats = {metric: [] for metric in METRICS}
+    table = CohortStat.__table__
+    for row in db.session.execute(
+        db.select(table.c.metric, table.c.bucket, table.c.users, table.c.entries, table.c.value)
+        .where(table.c.run_id == run.id)
+        .order_by(table.c.metric, table.c.id)
+    ):
+        stats.setdefault(row.metric, []).append({
+            'bucket': row.bucket, 'users': row.users, 'entries': row.entries, 'value': row.value
+        })
+    return {'run': run.to_dict(), 'stats': stats}
+
+
+@click.command('cohort-stats')
+@click.option('--processes', type=int, default=None, help='Worker processes (default: CPU count)')
+@click.option('--shards', type=int, default=None, help='User shards (default: 4 per process)')
+@with_appcontext
+def cohort_stats_command(processes, shards):
+    """Recompute population statistics from all users"""
+    run = run_cohort_stats(processes, shards)
+    click.echo(f"✅ Cohort stats for {run.users_total} users in {run.duration_ms} ms "
+               f"({run.processes} processes, {run.shards} shards)")
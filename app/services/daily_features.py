@@ -0,0 +1,258 @@
+"""Per-user daily feature matrix across every tracker
+
+Each ``daily_features`` row joins one user's mood, journal sentiment,
+exercise/meditation/breathing time and meals/water for one day. A user's
+matrix is built on first read with one grouped query per tracker, joined
+in memory on the day. After that it is maintained incrementally: session
+hooks note the (user, day) pairs every flush touches and, at commit,
+recompute just those rows with one statement each.
+"""
+
+from datetime import datetime, time, timedelta
+from itertools import chain
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.db_routing import RoutingSession
+from app.models.daily_features import DailyFeatures
+from app.models.mood import MoodEntry
+from app.models.journal import JournalEntry
+from app.models.exercise import ExerciseSession, MeditationSession, BreathingMethod
+from app.models.nutrition import NutritionEntry
+from app.models.user import User
+from app.series import as_date
+
+PENDING_KEY = 'daily_feature_days'
+
+_SENTIMENT = db.case(
+    (JournalEntry.sentiment == 'positive', 1.0),
+    (JournalEntry.sentiment == 'negative', -1.0),
+    else_=0.0
+)
+
+# (model, day column, {feature: aggregate}); one grouped query per source
+SOURCES = [
+    (MoodEntry, MoodEntry.created_at, {
+        'mood_entries': db.func.count(),
+        'mood_mean': db.func.avg(MoodEntry.mood_score),
+    }),
+    (JournalEntry, JournalEntry.created_at, {
+        'journal_entries': db.func.count(),
+        'sentiment_mean': db.func.avg(_SENTIMENT),
+    }),
+    (ExerciseSession, ExerciseSession.session_date, {
+        'exercise_seconds': db.func.sum(ExerciseSession.duration_seconds),
+    }),
+    (MeditationSession, MeditationSession.session_date, {
+        'meditation_seconds': db.func.sum(MeditationSession.duration_seconds),
+    }),
+    (BreathingMethod, BreathingMethod.session_date, {
+        'breathing_seconds': db.func.sum(BreathingMethod.duration_seconds),
+    }),
+    (NutritionEntry, NutritionEntry.entry_date, {
+        'meals': db.func.sum(db.case((NutritionEntry.entry_type == 'meal', 1), else_=0)),
+        'water_glasses': db.func.sum(db.case(
+            (NutritionEntry.entry_type == 'water', NutritionEntry.water_glasses), else_=0)),
+    }),
+]
+
+MEANS = ('mood_mean', 'sentiment_mean')
+COUNTERS = tuple(name for _, _, aggregates in SOURCES for name in aggregates if name not in MEANS)
+FEATURES = tuple(name for _, _, aggregates in SOURCES for name in aggregates)
+
+# Model -> attribute holding the day its rows count towards
+TRACKED = {model: column.key for model, column, _ in SOURCES}
+
+
+def _is_timestamp(column):
+    return isinstance(column.type, db.DateTime)
+
+
+def _group_by_day(column):
+    return db.func.date(column) if _is_timestamp(column) else column
+
+
+def _on_day(column, day):
+    if _is_timestamp(column):
+        start = datetime.combine(day, time.min)
+        return db.and_(column >= start, column < start + timedelta(days=1))
+    return column == day
+
+
+def _clean(features):
+    """Counters default to 0 and means are rounded"""
+    for name in COUNTERS:
+        features[name] = int(features.get(name) or 0)
+    for name in MEANS:
+        value = features.get(name)
+        features[name] = round(float(value), 3) if value is not None else None
+    return features
+
+
+def _active(features):
+    return any(features[name] for name in COUNTERS)
+
+
+def build_daily_features(user_id):
+    """The user's whole matrix from raw entries, oldest day first"""
+    days = {}
+    for model, column, aggregates in SOURCES:
+        day = _group_by_day(column)
+        rows = db.session.execute(
+            db.select(day, *aggregates.values())
+            .where(model.user_id == user_id)
+            .group_by(day)
+        )
+        for row in rows:
+            days.setdefault(as_date(row[0]), {}).update(zip(aggregates, row[1:]))
+
+    matrix = []
+    for day in sorted(days):
+        features = _clean(days[day])
+        if _active(features):
+            matrix.append({'feature_date': day, **features})
+    return matrix
+
+
+def load_daily_features(user_id):
+    """The user's matrix, building and storing it on first use"""
+    table = DailyFeatures.__table__
+    columns = [table.c.feature_date] + [table.c[name] for name in FEATURES]
+    rows = db.session.execute(
+        db.select(*columns)
+        .where(table.c.user_id == user_id)
+        .order_by(table.c.feature_date.asc())
+    ).all()
+    if rows:
+        return [row._asdict() for row in rows]
+
+    matrix = build_daily_features(user_id)
+    if matrix:
+        try:
+            db.session.execute(db.insert(table), [{'user_id': user_id, **day} for day in matrix])
+            db.session.commit()
+        except IntegrityError:
+            # Another request built it first; its rows match these
+            db.session.rollback()
+    return matrix
+
+
+def refresh_day(session, user_id, day):
+    """Recompute one stored row from raw entries (one query, one write)"""
+    table = DailyFeatures.__table__
+    columns = {
+        # Users whose matrix was never built are skipped; their first read builds it
+        'built': db.select(table.c.id).where(table.c.user_id == user_id).limit(1).scalar_subquery(),
+        'row_id': db.select(table.c.id)
+        .where(table.c.user_id == user_id, table.c.feature_date == day).scalar_subquery(),
+    }
+    for model, column, aggregates in SOURCES:
+        for name, aggregate in aggregates.items():
+            columns[name] = db.select(aggregate).where(
+                model.user_id == user_id, _on_day(column, day)
+            ).scalar_subquery()
+
+    values = dict(zip(columns, session.execute(db.select(*columns.values())).one()))
+    if values.pop('built') is None:
+        return
+    row_id = values.pop('row_id')
+    features = _clean(values)
+
+    if not _active(features):
+        if row_id is not None:
+            session.execute(db.delete(table).where(table.c.id == row_id))
+    elif row_id is not None:
+        session.execute(db.update(table).where(table.c.id == row_id).values(**features))
+    else:
+        session.execute(db.insert(table).values(user_id=user_id, feature_date=day, **features))
+
+
+def touch_day(user_id, day, session=None):
+    """Mark a day for refresh at commit; for bulk statements the hooks cannot see"""
+    session = session or db.session
+    session.info.setdefault(PENDING_KEY, set()).add((int(user_id), day))
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _collect_touched_days(session, flush_context):
+    for instance in chain(session.new, session.dirty, session.deleted):
+        field = TRACKED.get(type(instance))
+        if field is None:
+            continue
+        state = inspect(instance).dict
+        user_id, value = state.get('user_id'), state.get(field)
+        if user_id is not None and value is not None:
+            touch_day(user_id, as_date(value), session)
+
+
+@event.listens_for(RoutingSession, 'before_commit')
+def _refresh_touched_days(session):
+    session.flush()
+    touched = session.info.pop(PENDING_KEY, None)
+    for user_id, day in sorted(touched or ()):
+        refresh_day(session, user_id, day)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_touched_days(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+def _mean(values):
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def habit_comparison(matrix, water_glasses=None):
+    """Mean daily mood on days with each habit against days without it"""
+    if water_glasses is None:
+        water_glasses = current_app.config.get('ADEQUATE_WATER_GLASSES', 6)
+    habits = {
+        'exercise': lambda day: day['exercise_seconds'] > 0,
+        'meditation': lambda day: day['meditation_seconds'] > 0,
+        'breathing': lambda day: day['breathing_seconds'] > 0,
+        'adequate_water': lambda day: day['water_glasses'] >= water_glasses,
+        'journaling': lambda day: day['journal_entries'] > 0,
+    }
+
+    mood_days = [day for day in matrix if day['mood_mean'] is not None]
+    comparison = {}
+    for name, has_habit in habits.items():
+        with_habit = [day['mood_mean'] for day in mood_days if has_habit(day)]
+        without_habit = [day['mood_mean'] for day in mood_days if not has_habit(day)]
+        mood_with, mood_without = _mean(with_habit), _mean(without_habit)
+        comparison[name] = {
+            'days_with': len(with_habit),
+            'days_without': len(without_habit),
+            'mood_with': mood_with,
+            'mood_without': mood_without,
+            'delta': round(mood_with - mood_without, 2)
+            if mood_with is not None and mood_without is not None else None
+        }
+
+    return {
+        'days': len(matrix),
+        'mood_days': len(mood_days),
+        'adequate_water_glasses': water_glasses,
+        'habits': comparison
+    }
+
+
+@click.command('rebuild-daily-features')
+@click.option('--user-id', type=int, default=None, help='Rebuild one user instead of everyone')
+@with_appcontext
+def rebuild_daily_features_command(user_id):
+    """Rebuild stored daily features from the raw tracker tables"""
+    table = DailyFeatures.__table__
+    user_ids = [user_id] if user_id else db.session.execute(db.select(User.id)).scalars().all()
+    for uid in user_ids:
+        db.session.execute(db.delete(table).where(table.c.user_id == uid))
+        matrix = build_daily_features(uid)
+        if matrix:
+            db.session.execute(db.insert(table), [{'user_id': uid, **day} for day in matrix])
+        db.session.commit()
+    click.echo(f"✅ Rebuilt daily features for {len(user_ids)} user(s)")
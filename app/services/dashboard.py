@@ -0,0 +1,359 @@
+"""Dashboard sections and their cache
+
+Each section is built by a plain function that the matching API view also
+uses, so ``/api/dashboard/summary`` returns exactly what the individual
+endpoints would. Built sections are cached per process: user sections for
+DASHBOARD_CACHE_SECONDS and shared ones (featured resources) for
+DASHBOARD_SHARED_CACHE_SECONDS. User sections are stored with the user's
+data version (``app.services.data_versions``) and only served while it is
+current, so a write on any worker retires them on every worker.
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from app import db
+from app.models.user import User
+from app.models.mood import MoodEntry
+from app.models.journal import JournalEntry
+from app.models.exercise import ExerciseSession, MeditationSession, BreathingMethod
+from app.models.nutrition import NutritionEntry
+from app.models.resource import Resource
+from app.read_models import MOOD_POINT, JOURNAL_MOODS
+from app.series import as_date
+from app.services.data_versions import data_version
+from app.services.mood_activities import activity_stats
+from app.services.mood_anomalies import recent_alerts
+from app.services.streaks import streaks
+
+
+def mood_analytics(user_id, days=30):
+    """Mood totals, streak, trend, chart data and alerts for the last ``days`` days"""
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=days)
+
+    # One query of the three columns needed; the chart window is a slice of it
+    all_mood_entries = MOOD_POINT.all(
+        MOOD_POINT.select()
+        .where(MoodEntry.user_id == user_id)
+        .order_by(MoodEntry.created_at.asc())
+    )
+
+    if not all_mood_entries:
+        return {
+            'total_entries': 0,
+            'average_mood': 0,
+            'current_streak': 0,
+            'longest_streak': 0,
+            'recent_trend': 0,
+            'mood_data': [],
+            'mood_distribution': {},
+            'activity_stats': [],
+            'anomalies': [],
+            'message': 'No mood data available'
+        }
+
+    total_entries = len(all_mood_entries)
+    average_mood = sum(entry.mood_score for entry in all_mood_entries) / total_entries
+
+    mood_streaks = streaks(user_id, ['mood'])['mood']
+
+    # Recent trend (last 7 days vs previous 7 days)
+    recent_trend = 0
+    if total_entries >= 2:
+        last_week = end_date - timedelta(days=7)
+        previous_week = last_week - timedelta(days=7)
+
+        recent_entries = [e for e in all_mood_entries if e.created_at >= last_week]
+        previous_entries = [e for e in all_mood_entries if last_week > e.created_at >= previous_week]
+
+        if recent_entries and previous_entries:
+            recent_avg = sum(e.mood_score for e in recent_entries) / len(recent_entries)
+            previous_avg = sum(e.mood_score for e in previous_entries) / len(previous_entries)
+            recent_trend = recent_avg - previous_avg
+
+    mood_data = [
+        {
+            'date': entry.created_at.strftime('%Y-%m-%d'),
+            'mood_score': entry.mood_score,
+            'mood_label': entry.mood_label
+        }
+        for entry in all_mood_entries
+        if start_date <= entry.created_at <= end_date
+    ]
+
+    mood_distribution = {}
+    for entry in all_mood_entries:
+        mood_distribution[entry.mood_label] = mood_distribution.get(entry.mood_label, 0) + 1
+
+    return {
+        'total_entries': total_entries,
+        'average_mood': round(average_mood, 2),
+        'current_streak': mood_streaks['current_streak'],
+        'longest_streak': mood_streaks['longest_streak'],
+        'recent_trend': round(recent_trend, 2),
+        'mood_data': mood_data,
+        'mood_distribution': mood_distribution,
+        'activity_stats': activity_stats(user_id),
+        # Entries in the window that were flagged as sudden drops when logged
+        'anomalies': recent_alerts(user_id, start_date)
+    }
+
+
+def mood_rollup(user_id, days=30):
+    """Count, min, max and sum of mood scores per day and label, oldest day first
+
+    The aggregated source ``series.downsample`` buckets the chart from.
+    """
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=days)
+    day = db.func.date(MoodEntry.created_at)
+
+    rows = db.session.execute(
+        db.select(
+            day, MoodEntry.mood_label, db.func.count(),
+            db.func.min(MoodEntry.mood_score), db.func.max(MoodEntry.mood_score),
+            db.func.sum(MoodEntry.mood_score)
+        )
+        .where(
+            MoodEntry.user_id == user_id,
+            MoodEntry.created_at >= start_date,
+            MoodEntry.created_at <= end_date
+        )
+        .group_by(day, MoodEntry.mood_label)
+        .order_by(day, MoodEntry.mood_label)
+    ).all()
+    return [
+        {
+            'date': as_date(row[0]).isoformat(),
+            'mood_label': row[1],
+            'count': row[2],
+            'min': row[3],
+            'max': row[4],
+            'sum': row[5]
+        }
+        for row in rows
+    ]
+
+
+def journal_analytics(user_id):
+    """Journal totals, average moods, common tags and writing streak"""
+    journal_entries = JOURNAL_MOODS.all(
+        JOURNAL_MOODS.select().where(JournalEntry.user_id == user_id)
+    )
+
+    if not journal_entries:
+        return {
+            'total_entries': 0,
+            'average_mood_before': 0,
+            'average_mood_after': 0,
+            'most_common_tags': [],
+            'writing_streak': 0,
+            'longest_writing_streak': 0,
+            'total_tags_used': 0,
+            'message': 'No journal entries available'
+        }
+
+    total_entries = len(journal_entries)
+
+    mood_before_entries = [e for e in journal_entries if e.mood_before is not None]
+    mood_after_entries = [e for e in journal_entries if e.mood_after is not None]
+
+    average_mood_before = sum(e.mood_before for e in mood_before_entries) / len(mood_before_entries) if mood_before_entries else 0
+    average_mood_after = sum(e.mood_after for e in mood_after_entries) / len(mood_after_entries) if mood_after_entries else 0
+
+    tag_counts = {}
+    for entry in journal_entries:
+        if entry.tags:
+            try:
+                for tag in json.loads(entry.tags):
+                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
+            except (TypeError, ValueError):
+                continue
+
+    most_common_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+
+    writing_streaks = streaks(user_id, ['journal'])['journal']
+
+    return {
+        'total_entries': total_entries,
+        'average_mood_before': round(average_mood_before, 2),
+        'average_mood_after': round(average_mood_after, 2),
+        'most_common_tags': most_common_tags,
+        'writing_streak': writing_streaks['current_streak'],
+        'longest_writing_streak': writing_streaks['longest_streak'],
+        'total_tags_used': len(tag_counts)
+    }
+
+
+def user_stats(user_id):
+    """Activity counts for the user, or None if the user does not exist"""
+    week_ago = datetime.utcnow() - timedelta(days=7)
+
+    # Counts come from one statement of indexed COUNT subqueries, so
+    # no entry rows are loaded however long the user's history is
+    counts = {
+        'created_at': db.select(User.created_at)
+        .where(User.id == user_id).scalar_subquery()
+    }
+    for name, model, date_column, since in (
+        ('mood_entries', MoodEntry, MoodEntry.created_at, week_ago),
+        ('journal_entries', JournalEntry, JournalEntry.created_at, week_ago),
+        ('exercise_sessions', ExerciseSession, ExerciseSession.session_date, week_ago.date()),
+        ('meditation_sessions', MeditationSession, MeditationSession.session_date, week_ago.date()),
+        ('breathing_sessions', BreathingMethod, BreathingMethod.session_date, week_ago.date()),
+        ('nutrition_entries', NutritionEntry, NutritionEntry.entry_date, week_ago.date())
+    ):
+        counts['total_' + name] = db.select(db.func.count()).select_from(model).where(
+            model.user_id == user_id
+        ).scalar_subquery()
+        counts['recent_' + name] = db.select(db.func.count()).select_from(model).where(
+            model.user_id == user_id, date_column >= since
+        ).scalar_subquery()
+
+    row = db.session.execute(db.select(*counts.values())).one()
+    stats = dict(zip(counts.keys(), row))
+
+    created_at = stats.pop('created_at')
+    if created_at is None:
+        return None
+
+    days_since_registration = (datetime.utcnow() - created_at).days
+    stats['days_since_registration'] = days_since_registration
+    stats['account_age_days'] = days_since_registration
+    return stats
+
+
+def featured_resources(limit=10):
+    """The newest active featured resources"""
+    resources = Resource.query.filter_by(
+        is_featured=True, is_active=True
+    ).order_by(Resource.created_at.desc()).limit(limit).all()
+    return [resource.to_dict() for resource in resources]
+
+
+class SectionCache:
+    """Per-process TTL cache of built dashboard sections
+
+    Entries of a user's data pass the user's data version to ``set`` and
+    ``get``; an entry built at another version is a miss.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key, version=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, entry_version, value = entry
+            if expires < time.monotonic() or entry_version != version:
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl, version=None):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, version, value)
+
+    def invalidate(self, user_id=None, section=None):
+        """Drop every section of ``user_id`` and/or every entry of ``section``"""
+        with self._lock:
+            for key in list(self._entries):
+                key_section, key_user = key[0], key[1]
+                if user_id is not None and key_user == str(user_id):
+                    del self._entries[key]
+                elif section is not None and key_section == section:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+section_cache = SectionCache()
+
+
+class DashboardContext:
+    """State shared by every section built for one summary request"""
+
+    def __init__(self, user_id, days=30):
+        self.user_id = user_id
+        self.days = days
+        self._user = None
+        self._data_version = None
+
+    @property
+    def user(self):
+        if self._user is None:
+            self._user = db.session.get(User, self.user_id)
+        return self._user
+
+    @property
+    def data_version(self):
+        if self._data_version is None:
+            self._data_version = data_version(self.user_id)
+        return self._data_version
+
+
+# name -> (builder, shared between users)
+SECTIONS = {
+    'profile': (lambda ctx: ctx.user.to_dict() if ctx.user else None, False),
+    'stats': (lambda ctx: user_stats(ctx.user_id), False),
+    'mood': (lambda ctx: mood_analytics(ctx.user_id, ctx.days), False),
+    'journal': (lambda ctx: journal_analytics(ctx.user_id), False),
+    'featured_resources': (lambda ctx: featured_resources(), True),
+}
+
+
+def build_summary(ctx, sections):
+    """Build the requested sections, reusing cached ones where allowed"""
+    config = current_app.config
+
+    summary = {}
+    for name in sections:
+        builder, shared = SECTIONS[name]
+        if shared:
+            key, version = (name, None), None
+            ttl = config.get('DASHBOARD_SHARED_CACHE_SECONDS', 300)
+        else:
+            key = (name, str(ctx.user_id), ctx.days if name == 'mood' else None)
+            ttl = config.get('DASHBOARD_CACHE_SECONDS', 30)
+            # Read before any section is built, so no section is newer than its version
+            version = ctx.data_version if ttl > 0 else None
+
+        value = section_cache.get(key, version) if ttl > 0 else None
+        if value is None:
+            value = builder(ctx)
+            section_cache.set(key, value, ttl, version)
+        summary[name] = value
+    return summary
+
+
+def init_dashboard_cache(app, db):
+    """Free a user's cached sections in this process after a request of theirs wrote
+
+    Other workers' copies are retired by the version check instead.
+    """
+
+    @app.after_request
+    def invalidate_after_write(response):
+        if not db.session.registry.has() or not db.session.info.get('wrote'):
+            return response
+        try:
+            verify_jwt_in_request(optional=True)
+            user_id = get_jwt_identity()
+        except Exception:
+            user_id = None
+        if user_id is not None:
+            section_cache.invalidate(user_id=user_id)
+        return response
@@ -0,0 +1,92 @@
+"""Per-user data versions that keep process-local caches coherent
+
+Section, insights and calendar caches live in each worker's memory, so
+dropping them after a write only helps the worker that handled it. Instead
+every cached value carries the user's data version from when it was built,
+and readers compare it with the stored one: one primary key read replaces
+rebuilding, and a write on any worker (or a background flush without a
+request) retires the user's entries everywhere.
+
+Session hooks note the users whose rows each flush touches and, at commit,
+bump their version with one upsert each. Bulk statements the hooks cannot
+see call ``touch_data_version``.
+"""
+
+from datetime import datetime
+from itertools import chain
+
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.db_routing import RoutingSession
+from app.models.account_deletion import AccountDeletion
+from app.models.data_version import UserDataVersion
+from app.models.user import User
+
+PENDING_KEY = 'data_version_users'
+
+# Rows with a user_id that are not the user's data; purge progress updates
+# on AccountDeletion would otherwise recreate the version row being purged
+_NOT_USER_DATA = (UserDataVersion, AccountDeletion)
+
+_UPSERT_DIALECTS = {'sqlite': sqlite, 'postgresql': postgresql}
+
+
+def data_version(user_id):
+    """The user's current data version (one query); 0 before their first write"""
+    table = UserDataVersion.__table__
+    return db.session.execute(
+        db.select(table.c.version).where(table.c.user_id == user_id)
+    ).scalar() or 0
+
+
+def touch_data_version(user_id, session=None):
+    """Bump the user's version at commit; for bulk statements the hooks cannot see"""
+    session = session or db.session
+    session.info.setdefault(PENDING_KEY, set()).add(int(user_id))
+
+
+def bump_data_versions(session, user_ids):
+    """Increment the versions of ``user_ids``, creating missing rows"""
+    table = UserDataVersion.__table__
+    dialect = _UPSERT_DIALECTS.get(session.get_bind().dialect.name)
+    for user_id in sorted(user_ids):
+        values = {'user_id': user_id, 'version': 1, 'updated_at': datetime.utcnow()}
+        if dialect is not None:
+            statement = dialect.insert(table).values(**values)
+            session.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={'version': table.c.version + 1, 'updated_at': values['updated_at']}
+            ))
+            continue
+        updated = session.execute(
+            db.update(table).where(table.c.user_id == user_id)
+            .values(version=table.c.version + 1, updated_at=values['updated_at'])
+        )
+        if not updated.rowcount:
+            session.execute(db.insert(table).values(**values))
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _collect_written_users(session, flush_context):
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, _NOT_USER_DATA):
+            continue
+        state = inspect(instance).dict
+        user_id = state.get('id') if isinstance(instance, User) else state.get('user_id')
+        if user_id is not None:
+            touch_data_version(user_id, session)
+
+
+@event.listens_for(RoutingSession, 'before_commit')
+def _bump_written_users(session):
+    session.flush()
+    user_ids = session.info.pop(PENDING_KEY, None)
+    if user_ids:
+        bump_data_versions(session, user_ids)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_written_users(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,141 @@
+"""Mood insights: how sleep, stress, energy and activities relate to mood
+
+The user's whole history is read in one query, loaded into NumPy arrays
+and analysed with vectorized operations. NumPy is imported on first use so
+it does not slow down application startup. Results are cached in the
+dashboard section cache under the user's data version, so any write of
+theirs, on any worker, retires them.
+"""
+
+import json
+
+from flask import current_app
+
+from app import db
+from app.models.mood import MoodEntry
+from app.services.dashboard import section_cache
+from app.services.data_versions import data_version
+
+MIN_SAMPLES = 3
+
+
+def _pearson(np, x, y):
+    """Pearson r over the pairs where both values are present"""
+    mask = ~(np.isnan(x) | np.isnan(y))
+    n = int(mask.sum())
+    if n < MIN_SAMPLES:
+        return {'r': None, 'n': n}
+    x, y = x[mask], y[mask]
+    x = x - x.mean()
+    y = y - y.mean()
+    denominator = np.sqrt((x * x).sum() * (y * y).sum())
+    if denominator == 0:
+        return {'r': None, 'n': n}
+    return {'r': round(float((x * y).sum() / denominator), 3), 'n': n}
+
+
+def _daily_means(np, inverse, days_count, values):
+    """Mean of ``values`` per day, NaN where a day has no value"""
+    present = ~np.isnan(values)
+    sums = np.bincount(inverse, weights=np.where(present, values, 0.0), minlength=days_count)
+    counts = np.bincount(inverse, weights=present.astype(float), minlength=days_count)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def mood_insights(user_id):
+    """Correlations, lagged effects and per-activity mood deltas for the user"""
+    import numpy as np
+
+    # Core table columns skip ORM row processing, and the calendar day comes
+    # back as a string so no datetime objects are built per row
+    table = MoodEntry.__table__
+    rows = db.session.execute(
+        db.select(db.func.date(table.c.created_at), table.c.mood_score, table.c.sleep_hours,
+                  table.c.stress_level, table.c.energy_level, table.c.activities)
+        .where(table.c.user_id == user_id)
+        .order_by(table.c.created_at.asc())
+    ).all()
+
+    if not rows:
+        return {
+            'entries': 0,
+            'correlations': {},
+            'lagged': {},
+            'activities': [],
+            'message': 'No mood data available'
+        }
+
+    entry_days, mood, sleep, stress, energy, activities = zip(*rows)
+    mood = np.array(mood, dtype=float)
+    factors = {
+        'sleep_hours': np.array(sleep, dtype=float),
+        'stress_level': np.array(stress, dtype=float),
+        'energy_level': np.array(energy, dtype=float),
+    }
+
+    correlations = {name: _pearson(np, values, mood) for name, values in factors.items()}
+
+    # Lagged effects: yesterday's factor against today's mood, per calendar day
+    ordinals = np.array(entry_days, dtype='datetime64[D]').astype(np.int64)
+    days, inverse = np.unique(ordinals, return_inverse=True)
+    daily_mood = _daily_means(np, inverse, len(days), mood)
+    consecutive = np.flatnonzero(np.diff(days) == 1)
+    lagged = {}
+    for name, values in factors.items():
+        daily_factor = _daily_means(np, inverse, len(days), values)
+        lagged[name] = _pearson(np, daily_factor[consecutive], daily_mood[consecutive + 1])
+
+    # Per-activity deltas: mean mood with the activity minus mean mood without it
+    # Users repeat the same few combinations, so each distinct value is parsed once
+    by_value = {}
+    for position, raw in enumerate(activities):
+        if raw:
+            by_value.setdefault(raw, []).append(position)
+
+    index = {}
+    for raw, positions in by_value.items():
+        try:
+            names = json.loads(raw)
+        except ValueError:
+            continue
+        if not isinstance(names, list):
+            continue
+        for activity in set(names):
+            if isinstance(activity, str):
+                index.setdefault(activity, []).extend(positions)
+
+    total = mood.sum()
+    activity_deltas = []
+    for activity, positions in index.items():
+        positions = np.array(positions, dtype=np.int64)
+        count = len(positions)
+        with_mean = mood[positions].mean()
+        without_count = len(mood) - count
+        without_mean = (total - mood[positions].sum()) / without_count if without_count else None
+        activity_deltas.append({
+            'activity': activity,
+            'count': count,
+            'mean_mood': round(float(with_mean), 2),
+            'delta': round(float(with_mean - without_mean), 2) if without_mean is not None else None
+        })
+    activity_deltas.sort(key=lambda item: (item['delta'] is None, -(item['delta'] or 0)))
+
+    return {
+        'entries': len(rows),
+        'correlations': correlations,
+        'lagged': lagged,
+        'activities': activity_deltas
+    }
+
+
+def cached_mood_insights(user_id):
+    """``mood_insights`` through the section cache, valid while the user's data version is"""
+    key = ('insights', str(user_id), None)
+    # Read before the entries, so a cached result is never newer than its version
+    version = data_version(user_id)
+    insights = section_cache.get(key, version)
+    if insights is None:
+        insights = mood_insights(user_id)
+        section_cache.set(key, insights, current_app.config.get('MOOD_INSIGHTS_CACHE_SECONDS', 3600), version)
+    return insights
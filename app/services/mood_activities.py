@@ -0,0 +1,107 @@
+"""The normalized ``mood_entry_activities`` table
+
+``set_mood_activities`` keeps the table in step with the JSON
+``activities`` column on every write, with one bulk statement per change
+however many activities an entry has. ``backfill_mood_activities`` fills
+it for entries written before the table existed or by bulk inserts.
+"""
+
+import json
+
+from app import db
+from app.models.mood import MoodEntry, MoodActivity
+
+ACTIVITY_MAX_LENGTH = MoodActivity.__table__.c.activity.type.length
+
+
+def normalize_activities(activities):
+    """Distinct, stripped activity names from a list (or a single name)"""
+    if isinstance(activities, str):
+        activities = [activities]
+    if not isinstance(activities, (list, tuple)):
+        return []
+    names = []
+    for activity in activities:
+        if isinstance(activity, str):
+            name = activity.strip()[:ACTIVITY_MAX_LENGTH]
+            if name and name not in names:
+                names.append(name)
+    return names
+
+
+def set_mood_activities(mood_entry, activities):
+    """Store ``activities`` on an entry in the session, as JSON and as rows"""
+    mood_entry.activities = json.dumps(activities) if activities else None
+    if mood_entry.id is None:
+        # The rows need the entry's id
+        db.session.flush()
+    else:
+        delete_mood_activities(mood_entry.id)
+
+    names = normalize_activities(activities)
+    if names:
+        db.session.execute(db.insert(MoodActivity.__table__), [
+            {'mood_entry_id': mood_entry.id, 'user_id': mood_entry.user_id, 'activity': name}
+            for name in names
+        ])
+
+
+def delete_mood_activities(mood_entry_id):
+    table = MoodActivity.__table__
+    db.session.execute(db.delete(table).where(table.c.mood_entry_id == mood_entry_id))
+
+
+def entries_with_activity(user_id, activity):
+    """Subquery of the user's mood entry ids tagged with ``activity``"""
+    return db.select(MoodActivity.mood_entry_id).where(
+        MoodActivity.user_id == user_id, MoodActivity.activity == activity
+    )
+
+
+def activity_stats(user_id):
+    """Entry count and average mood per activity, most frequent first"""
+    count = db.func.count().label('count')
+    rows = db.session.execute(
+        db.select(MoodActivity.activity, count, db.func.avg(MoodEntry.mood_score))
+        .join(MoodEntry, MoodEntry.id == MoodActivity.mood_entry_id)
+        .where(MoodActivity.user_id == user_id)
+        .group_by(MoodActivity.activity)
+        .order_by(count.desc(), MoodActivity.activity)
+    )
+    return [
+        {'activity': activity, 'count': entries, 'average_mood': round(float(average), 2)}
+        for activity, entries, average in rows
+    ]
+
+
+def backfill_mood_activities(batch_size=1000):
+    """Add missing rows for entries with activities; returns rows inserted"""
+    entries = MoodEntry.__table__
+    links = MoodActivity.__table__
+    missing = ~db.exists().where(links.c.mood_entry_id == entries.c.id)
+
+    inserted = 0
+    last_id = 0
+    while True:
+        batch = db.session.execute(
+            db.select(entries.c.id, entries.c.user_id, entries.c.activities)
+            .where(entries.c.id > last_id, entries.c.activities.is_not(None), missing)
+            .order_by(entries.c.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return inserted
+
+        rows = []
+        for entry_id, user_id, raw in batch:
+            try:
+                names = normalize_activities(json.loads(raw))
+            except ValueError:
+                continue
+            rows.extend({'mood_entry_id': entry_id, 'user_id': user_id, 'activity': name}
+                        for name in names)
+        if rows:
+            db.session.execute(db.insert(links), rows)
+        db.session.commit()
+        inserted += len(rows)
+        last_id = batch[-1][0]
@@ -0,0 +1,172 @@
+"""Streaming detection of sudden mood drops
+
+Every logged mood is scored against the user's running baseline, an
+exponentially weighted mean and variance kept in ``mood_baselines``, and
+then folded into it. Both steps are O(1): one baseline row is read and
+written, whatever the length of the history. Entries scoring
+MOOD_ANOMALY_Z_THRESHOLD standard deviations or more below the baseline
+get a ``mood_alerts`` row. Scores are judged once, when logged: editing or
+deleting an entry later does not unwind the baseline, whose weighting
+forgets it within a few dozen entries anyway. ``flask rebuild-mood-baselines``
+replays history exactly.
+"""
+
+import math
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app import db
+from app.models.mood import MoodEntry
+from app.models.mood_anomaly import MoodBaseline, MoodAlert
+from app.models.user import User
+
+
+def _settings():
+    config = current_app.config
+    return {
+        'alpha': config.get('MOOD_BASELINE_ALPHA', 0.1),
+        'min_entries': config.get('MOOD_BASELINE_MIN_ENTRIES', 7),
+        'min_std': config.get('MOOD_ANOMALY_MIN_STD', 1.0),
+        'threshold': config.get('MOOD_ANOMALY_Z_THRESHOLD', 2.0),
+    }
+
+
+def observe(baseline, score, settings):
+    """Score ``score`` against ``baseline``, then fold it in
+
+    Returns ``(z_score, std)``, or ``(None, None)`` while the baseline
+    has fewer than ``min_entries`` entries. The standard deviation is
+    floored at ``min_std`` so a user who always logs the same score is
+    not alerted for a one point dip.
+    """
+    z_score = std = None
+    if baseline.entries >= settings['min_entries']:
+        std = max(math.sqrt(baseline.variance), settings['min_std'])
+        z_score = (score - baseline.mean) / std
+
+    if baseline.entries == 0:
+        baseline.mean, baseline.variance = float(score), 0.0
+    else:
+        # Incremental exponentially weighted mean and variance
+        alpha = settings['alpha']
+        diff = score - baseline.mean
+        increment = alpha * diff
+        baseline.mean += increment
+        baseline.variance = (1 - alpha) * (baseline.variance + diff * increment)
+    baseline.entries += 1
+    return z_score, std
+
+
+def _alert(mood_entry, baseline_mean, z_score, std):
+    return MoodAlert(
+        user_id=mood_entry.user_id,
+        mood_entry_id=mood_entry.id,
+        mood_score=mood_entry.mood_score,
+        baseline_mean=round(baseline_mean, 3),
+        baseline_std=round(std, 3),
+        z_score=round(z_score, 3),
+        created_at=mood_entry.created_at
+    )
+
+
+def check_mood_entry(mood_entry):
+    """Update the user's baseline with a new entry; returns a MoodAlert or None"""
+    settings = _settings()
+    if mood_entry.id is None:
+        db.session.flush()
+
+    # Locks the row on databases that support it, so concurrent logs queue up
+    baseline = db.session.execute(
+        db.select(MoodBaseline).where(MoodBaseline.user_id == mood_entry.user_id).with_for_update()
+    ).scalar()
+    if baseline is None:
+        baseline = MoodBaseline(user_id=mood_entry.user_id, entries=0, mean=0.0, variance=0.0)
+        db.session.add(baseline)
+
+    baseline_mean = baseline.mean
+    z_score, std = observe(baseline, mood_entry.mood_score, settings)
+    if z_score is None or z_score > -settings['threshold']:
+        return None
+
+    alert = _alert(mood_entry, baseline_mean, z_score, std)
+    db.session.add(alert)
+    return alert
+
+
+def delete_mood_alerts(mood_entry_id):
+    table = MoodAlert.__table__
+    db.session.execute(db.delete(table).where(table.c.mood_entry_id == mood_entry_id))
+
+
+def recent_alerts(user_id, since):
+    """The user's alerts for entries logged since ``since``, oldest first"""
+    table = MoodAlert.__table__
+    rows = db.session.execute(
+        db.select(table.c.mood_entry_id, table.c.mood_score, table.c.baseline_mean,
+                  table.c.z_score, table.c.created_at)
+        .where(table.c.user_id == user_id, table.c.created_at >= since)
+        .order_by(table.c.created_at.asc())
+    )
+    return [
+        {
+            'mood_entry_id': entry_id,
+            'date': created_at.strftime('%Y-%m-%d'),
+            'mood_score': score,
+            'baseline_mean': baseline_mean,
+            'z_score': z_score
+        }
+        for entry_id, score, baseline_mean, z_score, created_at in rows
+    ]
+
+
+def replay_user(user_id, settings):
+    """Rebuild one user's baseline and alerts from their history; returns alerts"""
+    db.session.execute(db.delete(MoodAlert.__table__).where(MoodAlert.user_id == user_id))
+
+    baseline = db.session.execute(
+        db.select(MoodBaseline).where(MoodBaseline.user_id == user_id)
+    ).scalar()
+    if baseline is None:
+        baseline = MoodBaseline(user_id=user_id)
+        db.session.add(baseline)
+    baseline.entries, baseline.mean, baseline.variance = 0, 0.0, 0.0
+
+    entries = db.session.execute(
+        db.select(MoodEntry.id, MoodEntry.user_id, MoodEntry.mood_score, MoodEntry.created_at)
+        .where(MoodEntry.user_id == user_id)
+        .order_by(MoodEntry.created_at.asc(), MoodEntry.id.asc())
+    ).all()
+
+    alerts = []
+    for entry in entries:
+        baseline_mean = baseline.mean
+        z_score, std = observe(baseline, entry.mood_score, settings)
+        if z_score is not None and z_score <= -settings['threshold']:
+            alerts.append(_alert(entry, baseline_mean, z_score, std))
+
+    if entries:
+        db.session.add_all(alerts)
+    else:
+        db.session.delete(baseline)
+    db.session.commit()
+    return len(alerts)
+
+
+def rebuild_mood_baselines(user_ids=None):
+    """Replay history for ``user_ids`` (default: everyone); returns (users, alerts)"""
+    settings = _settings()
+    if user_ids is None:
+        user_ids = db.session.execute(db.select(User.id)).scalars().all()
+    alerts = sum(replay_user(user_id, settings) for user_id in user_ids)
+    return len(user_ids), alerts
+
+
+@click.command('rebuild-mood-baselines')
+@click.option('--user-id', type=int, default=None, help='Rebuild one user instead of everyone')
+@with_appcontext
+def rebuild_mood_baselines_command(user_id):
+    """Replay mood history into baselines and alerts"""
+    users, alerts = rebuild_mood_baselines([user_id] if user_id else None)
+    click.echo(f"✅ Rebuilt mood baselines for {users} user(s), {alerts} alert(s)")
@@ -0,0 +1,299 @@
+"""Seven day mood forecasts from coefficients fitted offline
+
+The model for a user is fitted from their daily mean mood:
+
+- weekday offsets: mean deviation from the user's average per weekday,
+  shrunk towards zero for weekdays with few days;
+- sleep and stress coefficients: least squares of the deseasonalized mood
+  on the day's centred sleep hours and stress level;
+- level: exponentially weighted mean (MOOD_FORECAST_ALPHA) of the mood
+  with weekday, sleep and stress effects removed.
+
+A forecast day is ``level + weekday offset + coefficients * (recent sleep
+and stress - their means)``, where recent values are weighted means with
+the same smoothing. Fitting is vectorized with NumPy and run for many
+users across a process pool by ``flask fit-mood-forecasts`` (nightly, or
+on demand). It only refits users whose mood entries changed since their
+last fit. ``/api/mood/forecast`` evaluates the stored coefficients and
+only fits inline for a user who has never been fitted.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app import db
+from app.models.mood import MoodEntry
+from app.models.mood_forecast import MoodForecastModel
+from app.series import as_date
+from app.services.batch import map_in_processes, read_only_source, worker_engine
+
+HORIZON_DAYS = 7
+
+# Days of history a weekday offset is shrunk by, so rare weekdays stay near zero
+WEEKDAY_SHRINKAGE = 2
+
+TASKS_PER_PROCESS = 4
+
+# Users per DELETE ... IN and INSERT when storing models
+STORE_BATCH_SIZE = 500
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def _settings():
+    config = current_app.config
+    return {
+        'alpha': config.get('MOOD_FORECAST_ALPHA', 0.1),
+        'min_days': config.get('MOOD_FORECAST_MIN_DAYS', 14),
+    }
+
+
+def _recent_mean(np, values, alpha):
+    """Exponentially weighted mean of the present values, newest last; None if none"""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    weights = (1 - alpha) ** np.arange(len(values) - 1, -1, -1, dtype=float)
+    return float(weights @ values / weights.sum())
+
+
+def fit_series(np, days, mood, sleep, stress, settings):
+    """Coefficients for one user's daily series; ``level`` is None with too few days"""
+    n = len(days)
+    if n < settings['min_days']:
+        return {
+            'days': n, 'last_day': as_date(days[-1]), 'level': None, 'weekday_offsets': None,
+            'sleep_coef': 0.0, 'stress_coef': 0.0, 'sleep_mean': None, 'stress_mean': None,
+            'recent_sleep': None, 'recent_stress': None, 'residual_std': None,
+        }
+    alpha = settings['alpha']
+
+    # 1970-01-01 was a Thursday; Monday is 0
+    weekday = (np.array(days, dtype='datetime64[D]').astype(np.int64) + 3) % 7
+    deviation = mood - mood.mean()
+    offsets = (np.bincount(weekday, weights=deviation, minlength=7)
+               / (np.bincount(weekday, minlength=7) + WEEKDAY_SHRINKAGE))
+    deseasonalized = mood - offsets[weekday]
+
+    sleep_mean = float(np.nanmean(sleep)) if not np.isnan(sleep).all() else None
+    stress_mean = float(np.nanmean(stress)) if not np.isnan(stress).all() else None
+    sleep_coef = stress_coef = 0.0
+    centred_sleep = np.nan_to_num(sleep - sleep_mean) if sleep_mean is not None else np.zeros(n)
+    centred_stress = np.nan_to_num(stress - stress_mean) if stress_mean is not None else np.zeros(n)
+    both = ~(np.isnan(sleep) | np.isnan(stress))
+    if both.sum() >= settings['min_days']:
+        design = np.column_stack([np.ones(both.sum()), centred_sleep[both], centred_stress[both]])
+        if np.linalg.matrix_rank(design) == 3:
+            _, sleep_coef, stress_coef = np.linalg.lstsq(design, deseasonalized[both], rcond=None)[0]
+
+    adjusted = deseasonalized - sleep_coef * centred_sleep - stress_coef * centred_stress
+    # Exponentially weighted mean seeded with the first day; old weights underflow to zero
+    weights = alpha * (1 - alpha) ** np.arange(n - 1, -1, -1, dtype=float)
+    weights[0] = (1 - alpha) ** (n - 1)
+    level = float(weights @ adjusted)
+    residual_std = float(np.sqrt(np.mean((adjusted[-30:] - level) ** 2)))
+
+    return {
+        'days': n,
+        'last_day': as_date(days[-1]),
+        'level': level,
+        'weekday_offsets': json.dumps([round(float(offset), 4) for offset in offsets]),
+        'sleep_coef': float(sleep_coef),
+        'stress_coef': float(stress_coef),
+        'sleep_mean': sleep_mean,
+        'stress_mean': stress_mean,
+        'recent_sleep': _recent_mean(np, sleep, alpha),
+        'recent_stress': _recent_mean(np, stress, alpha),
+        'residual_std': residual_std,
+    }
+
+
+def as_datetime(value):
+    """A MAX() of a DateTime column, which SQLite returns as a string"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def fit_users(conn, user_ids, settings):
+    """Model rows for those of ``user_ids`` with mood entries, read over ``conn``"""
+    import numpy as np
+
+    table = MoodEntry.__table__
+    day = db.func.date(table.c.created_at)
+    rows = conn.execute(
+        db.select(table.c.user_id, day, db.func.avg(table.c.mood_score), db.func.avg(table.c.sleep_hours),
+                  db.func.avg(table.c.stress_level), db.func.count(), db.func.max(table.c.updated_at))
+        .where(table.c.user_id.in_(user_ids))
+        .group_by(table.c.user_id, day)
+        .order_by(table.c.user_id, day)
+    ).all()
+
+    by_user = {}
+    for row in rows:
+        by_user.setdefault(row[0], []).append(row[1:])
+
+    fitted = []
+    for user_id, series in by_user.items():
+        days, mood, sleep, stress, counts, updated = zip(*series)
+        coefficients = fit_series(
+            np, days, np.array(mood, dtype=float), np.array(sleep, dtype=float),
+            np.array(stress, dtype=float), settings
+        )
+        # Users with too little history get a row too, so they are not refitted until they log more
+        fitted.append({
+            'user_id': user_id,
+            'entries': sum(counts),
+            'entries_updated_at': as_datetime(max(filter(None, updated), default=None)),
+            'fitted_at': datetime.utcnow(),
+            **coefficients
+        })
+    return fitted
+
+
+def fit_task(task):
+    """``fit_users`` over a worker's own read-only connection"""
+    uri, pragmas, user_ids, settings = task
+    with worker_engine(uri, pragmas).connect() as conn:
+        return fit_users(conn, user_ids, settings)
+
+
+def _store(user_ids, rows):
+    """Replace the models of ``user_ids`` with ``rows``"""
+    table = MoodForecastModel.__table__
+    db.session.execute(db.delete(table).where(table.c.user_id.in_(user_ids)))
+    if rows:
+        db.session.execute(db.insert(table), rows)
+
+
+def stale_users():
+    """Users whose mood entries changed since their model was fitted"""
+    table = MoodEntry.__table__
+    current = {
+        user_id: (entries, as_datetime(updated_at))
+        for user_id, entries, updated_at in db.session.execute(
+            db.select(table.c.user_id, db.func.count(), db.func.max(table.c.updated_at))
+            .group_by(table.c.user_id)
+        )
+    }
+    models = MoodForecastModel.__table__
+    fitted = {
+        user_id: (entries, updated_at)
+        for user_id, entries, updated_at in db.session.execute(
+            db.select(models.c.user_id, models.c.entries, models.c.entries_updated_at)
+        )
+    }
+    # Models of users whose entries are all gone are dropped too
+    return sorted(user_id for user_id in current.keys() | fitted.keys()
+                  if current.get(user_id) != fitted.get(user_id))
+
+
+def fit_mood_forecasts(processes=None, refit_all=False):
+    """Refit changed users (or all) across a process pool; returns (refitted, fitted, ms)
+
+    ``fitted`` counts the users with enough history for a forecast.
+    """
+    config = current_app.config
+    processes = processes or config.get('MOOD_FORECAST_PROCESSES') or os.cpu_count() or 1
+    started = time.perf_counter()
+
+    if refit_all:
+        user_ids = db.session.execute(
+            db.select(MoodEntry.user_id).distinct().order_by(MoodEntry.user_id)
+        ).scalars().all()
+    else:
+        user_ids = stale_users()
+    # End the read transaction before forking workers
+    db.session.commit()
+
+    settings = _settings()
+    uri, pragmas = read_only_source()
+    size = -(-len(user_ids) // (processes * TASKS_PER_PROCESS)) or 1
+    tasks = [(uri, pragmas, user_ids[i:i + size], settings) for i in range(0, len(user_ids), size)]
+    rows = [row for fitted in map_in_processes(fit_task, tasks, processes) for row in fitted]
+
+    by_user = {row['user_id']: row for row in rows}
+    for i in range(0, len(user_ids), STORE_BATCH_SIZE):
+        batch = user_ids[i:i + STORE_BATCH_SIZE]
+        _store(batch, [by_user[user_id] for user_id in batch if user_id in by_user])
+    db.session.commit()
+    fitted = sum(1 for row in rows if row['level'] is not None)
+    return len(user_ids), fitted, round((time.perf_counter() - started) * 1000)
+
+
+def evaluate(model, start):
+    """``HORIZON_DAYS`` predictions from ``start`` for a model row mapping"""
+    offsets = json.loads(model['weekday_offsets'])
+    shift = 0.0
+    if model['recent_sleep'] is not None and model['sleep_mean'] is not None:
+        shift += model['sleep_coef'] * (model['recent_sleep'] - model['sleep_mean'])
+    if model['recent_stress'] is not None and model['stress_mean'] is not None:
+        shift += model['stress_coef'] * (model['recent_stress'] - model['stress_mean'])
+    spread = model['residual_std']
+
+    forecast = []
+    for i in range(HORIZON_DAYS):
+        day = start + timedelta(days=i)
+        predicted = min(max(model['level'] + offsets[day.weekday()] + shift, 1.0), 10.0)
+        forecast.append({
+            'date': day.isoformat(),
+            'weekday': WEEKDAYS[day.weekday()],
+            'mood_score': round(predicted, 2),
+            'low': round(max(predicted - spread, 1.0), 2),
+            'high': round(min(predicted + spread, 10.0), 2)
+        })
+    return forecast
+
+
+def mood_forecast(user_id):
+    """The user's forecast for the next ``HORIZON_DAYS`` days"""
+    table = MoodForecastModel.__table__
+    model = db.session.execute(db.select(table).where(table.c.user_id == user_id)).mappings().first()
+    if model is not None and model['level'] is None:
+        # Too little history when last fitted; once they log more, the
+        # forecast should not wait for the next scheduled fit
+        entries = db.session.execute(
+            db.select(db.func.count()).select_from(MoodEntry).where(MoodEntry.user_id == user_id)
+        ).scalar()
+        if entries != model['entries']:
+            model = None
+    if model is None:
+        # Never fitted (or stale without a forecast): fit this user now
+        rows = fit_users(db.session.connection(), [user_id], _settings())
+        _store([user_id], rows)
+        db.session.commit()
+        model = rows[0] if rows else None
+
+    if model is None or model['level'] is None:
+        return {
+            'forecast': [],
+            'message': f"At least {_settings()['min_days']} days of mood entries are needed for a forecast"
+        }
+
+    return {
+        'forecast': evaluate(model, datetime.utcnow().date() + timedelta(days=1)),
+        'model': {
+            'days': model['days'],
+            'last_day': model['last_day'].isoformat(),
+            'fitted_at': model['fitted_at'].isoformat(),
+            'weekday_offsets': dict(zip(WEEKDAYS, json.loads(model['weekday_offsets']))),
+            'sleep_coef': round(model['sleep_coef'], 3),
+            'stress_coef': round(model['stress_coef'], 3)
+        }
+    }
+
+
+@click.command('fit-mood-forecasts')
+@click.option('--processes', type=int, default=None, help='Worker processes (default: CPU count)')
+@click.option('--all', 'refit_all', is_flag=True, help='Refit every user, not only those with changes')
+@with_appcontext
+def fit_mood_forecasts_command(processes, refit_all):
+    """Fit mood forecast coefficients for users whose mood entries changed"""
+    refitted, fitted, duration_ms = fit_mood_forecasts(processes, refit_all)
+    click.echo(f"✅ Refitted {refitted} user(s) in {duration_ms} ms, {fitted} with enough history")
@@ -0,0 +1,366 @@
+"""Streaks and activity heatmaps from per-tracker day bitmaps
+
+Each ``activity_bitmaps`` row holds one bit per day for one user and one
+tracker (see ``ActivityBitmap``). Streaks and heatmaps are answered with
+integer bit operations on the decoded bitmap instead of walking entries:
+
+- current streak: consecutive active days ending today, or yesterday
+  when nothing has been logged yet today;
+- longest streak: the number of ``x &= x >> 1`` steps that empty it;
+- heatmap: a shifted, masked slice of the bitmap.
+
+Bitmaps are maintained like the daily feature matrix: session hooks note
+the (user, tracker, day) triples each flush touches and, at commit, set
+the bits of days that gained an entry and re-check days that lost one.
+That is one SELECT per user plus one UPDATE per changed bitmap, whatever
+the length of the history. New users get empty bitmaps at registration.
+Users from before the table existed get theirs built from the raw tables
+on first read, like the daily feature matrix; writes before that skip
+them, as the build will include those entries. ``flask rebuild-streaks``
+(run by the add_activity_bitmaps migration) builds everyone's at once.
+"""
+
+from datetime import datetime, time, timedelta
+from itertools import chain
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.db_routing import RoutingSession
+from app.models.activity_bitmap import ActivityBitmap
+from app.models.mood import MoodEntry
+from app.models.journal import JournalEntry
+from app.models.exercise import ExerciseSession, MeditationSession, BreathingMethod
+from app.models.nutrition import NutritionEntry
+from app.models.user import User
+from app.series import as_date
+
+PENDING_KEY = 'streak_days'
+
+# Tracker -> (model, attribute holding the day an entry counts towards)
+TRACKERS = {
+    'mood': (MoodEntry, 'created_at'),
+    'journal': (JournalEntry, 'created_at'),
+    'exercise': (ExerciseSession, 'session_date'),
+    'meditation': (MeditationSession, 'session_date'),
+    'breathing': (BreathingMethod, 'session_date'),
+    'nutrition': (NutritionEntry, 'entry_date'),
+}
+
+_BY_MODEL = {model: (tracker, field) for tracker, (model, field) in TRACKERS.items()}
+
+
+# Bitmap operations; a bitmap is (start_date, bits) with start_date None when empty
+
+def encode_days(days):
+    """Bitmap of a collection of dates"""
+    days = sorted(set(days))
+    if not days:
+        return None, b''
+    start = days[0]
+    bits = bytearray((days[-1] - start).days // 8 + 1)
+    for day in days:
+        index = (day - start).days
+        bits[index >> 3] |= 1 << (index & 7)
+    return start, bytes(bits)
+
+
+def _as_int(bits):
+    return int.from_bytes(bits, 'little')
+
+
+def set_day(bitmap, day, active):
+    """The bitmap with ``day`` set or cleared"""
+    start, bits = bitmap
+    if start is None:
+        return encode_days([day]) if active else bitmap
+
+    index = (day - start).days
+    if index < 0:
+        if not active:
+            return bitmap
+        # Backdated entry: shift everything up so the new day is bit 0
+        value = (_as_int(bits) << -index) | 1
+        return day, value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+    byte, mask = index >> 3, 1 << (index & 7)
+    if not active:
+        if byte >= len(bits) or not bits[byte] & mask:
+            return bitmap
+        bits = bytearray(bits)
+        bits[byte] &= ~mask
+        return start, bytes(bits)
+
+    if byte < len(bits) and bits[byte] & mask:
+        return bitmap
+    bits = bytearray(bits)
+    if byte >= len(bits):
+        bits.extend(bytes(byte + 1 - len(bits)))
+    bits[byte] |= mask
+    return start, bytes(bits)
+
+
+def current_streak(bitmap, today):
+    """Active days in a row ending today, or yesterday if today is not active yet"""
+    start, bits = bitmap
+    if start is None:
+        return 0
+    end = (today - start).days
+    value = _as_int(bits)
+    if end >= 0 and not value >> end & 1:
+        end -= 1
+    if end < 0 or not value >> end & 1:
+        return 0
+    # The highest inactive day at or before ``end`` bounds the streak
+    gaps = ~value & ((1 << (end + 1)) - 1)
+    return end + 1 - gaps.bit_length()
+
+
+def longest_streak(bitmap):
+    """Longest run of active days; each step shortens every run by one"""
+    value = _as_int(bitmap[1])
+    steps = 0
+    while value:
+        value &= value >> 1
+        steps += 1
+    return steps
+
+
+def day_flags(bitmap, first, last):
+    """0/1 per day from ``first`` to ``last`` inclusive"""
+    start, bits = bitmap
+    length = (last - first).days + 1
+    if start is None or length <= 0:
+        return [0] * max(length, 0)
+    offset = (first - start).days
+    value = _as_int(bits)
+    value = value >> offset if offset >= 0 else value << -offset
+    value &= (1 << length) - 1
+    return [int(flag) for flag in reversed(format(value, f'0{length}b'))]
+
+
+def summarize(bitmap, today):
+    start, bits = bitmap
+    return {
+        'current_streak': current_streak(bitmap, today),
+        'longest_streak': longest_streak(bitmap),
+        'active_days': _as_int(bits).bit_count(),
+        'first_day': start.isoformat() if start else None
+    }
+
+
+# Storage
+
+def _day_column(tracker):
+    model, field = TRACKERS[tracker]
+    column = getattr(model, field)
+    return db.func.date(column) if isinstance(column.type, db.DateTime) else column
+
+
+def _on_day(tracker, day):
+    """Index-friendly condition for entries counting towards ``day``"""
+    model, field = TRACKERS[tracker]
+    column = getattr(model, field)
+    if isinstance(column.type, db.DateTime):
+        start = datetime.combine(day, time.min)
+        return db.and_(column >= start, column < start + timedelta(days=1))
+    return column == day
+
+
+def load_bitmaps(user_id, trackers=TRACKERS):
+    """``{tracker: bitmap}`` from the stored rows (one query), building them on first use"""
+    table = ActivityBitmap.__table__
+    rows = db.session.execute(
+        db.select(table.c.tracker, table.c.start_date, table.c.bits)
+        .where(table.c.user_id == user_id, table.c.tracker.in_(list(trackers)))
+    ).all()
+    if not rows:
+        # Every tracker's row is written together, so none of them exist yet
+        rows = [(row['tracker'], row['start_date'], row['bits'])
+                for row in _create_bitmaps(user_id) if row['tracker'] in trackers]
+
+    bitmaps = dict.fromkeys(trackers, (None, b''))
+    bitmaps.update((tracker, (start, bits)) for tracker, start, bits in rows)
+    return bitmaps
+
+
+def _create_bitmaps(user_id):
+    """Build and store the user's bitmaps; later writes keep them current"""
+    rows = build_streak_bitmaps([user_id])
+    try:
+        db.session.execute(db.insert(ActivityBitmap.__table__), rows)
+        db.session.commit()
+    except IntegrityError:
+        # Another request built them first; its rows match these
+        db.session.rollback()
+    return rows
+
+
+def streaks(user_id, trackers=TRACKERS, today=None):
+    """Current and longest streak and active days per tracker"""
+    today = today or datetime.utcnow().date()
+    return {tracker: summarize(bitmap, today)
+            for tracker, bitmap in load_bitmaps(user_id, trackers).items()}
+
+
+def heatmap(user_id, first, last, trackers=TRACKERS):
+    """0/1 per day from ``first`` to ``last`` for each tracker"""
+    return {tracker: day_flags(bitmap, first, last)
+            for tracker, bitmap in load_bitmaps(user_id, trackers).items()}
+
+
+def streak_report(user_id, days, today=None):
+    """Streaks of every tracker and their heatmap for the last ``days`` days"""
+    today = today or datetime.utcnow().date()
+    first = today - timedelta(days=days - 1)
+    bitmaps = load_bitmaps(user_id)
+    return {
+        'streaks': {tracker: summarize(bitmap, today) for tracker, bitmap in bitmaps.items()},
+        'heatmap': {
+            'start_date': first.isoformat(),
+            'end_date': today.isoformat(),
+            'trackers': {tracker: day_flags(bitmap, first, today) for tracker, bitmap in bitmaps.items()}
+        }
+    }
+
+
+# Incremental maintenance
+
+def touch_streak_day(user_id, tracker, day, session=None):
+    """Re-check a day at commit; for bulk statements the hooks cannot see"""
+    session = session or db.session
+    session.info.setdefault(PENDING_KEY, {})[(int(user_id), tracker, day)] = None
+
+
+def _note(session, user_id, tracker, day, active):
+    pending = session.info.setdefault(PENDING_KEY, {})
+    key = (int(user_id), tracker, day)
+    # A day that lost an entry anywhere in the transaction has to be re-checked
+    pending[key] = active if pending.get(key, active) is not None else None
+
+
+def create_streak_bitmaps(user_id):
+    """Empty bitmaps for a new user, so their writes maintain them from the start"""
+    db.session.execute(db.insert(ActivityBitmap.__table__), [
+        {'user_id': user_id, 'tracker': tracker, 'start_date': None, 'bits': b'',
+         'updated_at': datetime.utcnow()}
+        for tracker in TRACKERS
+    ])
+
+
+def apply_pending(session, pending):
+    """Bring touched bitmaps up to date; ``pending`` maps triples to True or None (re-check)"""
+    table = ActivityBitmap.__table__
+    by_user = {}
+    for (user_id, tracker, day), active in pending.items():
+        by_user.setdefault(user_id, {}).setdefault(tracker, {})[day] = active
+
+    for user_id, trackers in sorted(by_user.items()):
+        checks = [(tracker, day) for tracker, days in trackers.items()
+                  for day, active in days.items() if active is None]
+        # One statement reads the bitmaps and whether each re-checked day still has an entry
+        counts = [
+            db.select(db.func.count()).select_from(TRACKERS[tracker][0])
+            .where(TRACKERS[tracker][0].user_id == user_id, _on_day(tracker, day))
+            .scalar_subquery()
+            for tracker, day in checks
+        ]
+        rows = session.execute(
+            db.select(table.c.id, table.c.tracker, table.c.start_date, table.c.bits, *counts)
+            .where(table.c.user_id == user_id, table.c.tracker.in_(list(trackers)))
+        ).all()
+        # Users whose bitmaps were never built are skipped; their first read builds them
+        if not rows:
+            continue
+        for (tracker, day), count in zip(checks, rows[0][4:]):
+            trackers[tracker][day] = bool(count)
+
+        for row_id, tracker, start, bits, *_ in rows:
+            bitmap = updated = (start, bits)
+            for day, active in trackers[tracker].items():
+                updated = set_day(updated, day, active)
+            if updated != bitmap:
+                session.execute(db.update(table).where(table.c.id == row_id).values(
+                    start_date=updated[0], bits=updated[1], updated_at=datetime.utcnow()
+                ))
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _collect_streak_days(session, flush_context):
+    for instance in chain(session.new, session.dirty, session.deleted):
+        tracked = _BY_MODEL.get(type(instance))
+        if tracked is None:
+            continue
+        tracker, field = tracked
+        state = inspect(instance)
+        user_id, value = state.dict.get('user_id'), state.dict.get(field)
+        if user_id is None:
+            continue
+        if value is not None:
+            _note(session, user_id, tracker, as_date(value), None if instance in session.deleted else True)
+        # A moved entry may have been the old day's last one
+        for old in state.attrs[field].history.deleted:
+            if old is not None:
+                _note(session, user_id, tracker, as_date(old), None)
+
+
+@event.listens_for(RoutingSession, 'before_commit')
+def _apply_streak_days(session):
+    session.flush()
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        apply_pending(session, pending)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_streak_days(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+def build_streak_bitmaps(user_ids=None):
+    """Bitmap rows of ``user_ids`` (everyone by default) from the raw tables, one grouped query per tracker"""
+    scope = user_ids
+    if user_ids is None:
+        user_ids = db.session.execute(db.select(User.id)).scalars().all()
+
+    rows = []
+    for tracker, (model, _) in TRACKERS.items():
+        query = db.select(model.user_id, _day_column(tracker)).distinct()
+        if scope is not None:
+            query = query.where(model.user_id.in_(scope))
+        days = {}
+        for user_id, value in db.session.execute(query):
+            days.setdefault(user_id, []).append(as_date(value))
+        # Users without entries get an empty bitmap, so their writes maintain it
+        for user_id in user_ids:
+            start, bits = encode_days(days.get(user_id, ()))
+            rows.append({'user_id': user_id, 'tracker': tracker, 'start_date': start,
+                         'bits': bits, 'updated_at': datetime.utcnow()})
+    return rows
+
+
+def rebuild_streak_bitmaps(user_ids=None):
+    """Rebuild bitmaps (of everyone by default); returns the number of rows"""
+    table = ActivityBitmap.__table__
+    rows = build_streak_bitmaps(user_ids)
+
+    delete = db.delete(table)
+    if user_ids is not None:
+        delete = delete.where(table.c.user_id.in_(user_ids))
+    db.session.execute(delete)
+    if rows:
+        db.session.execute(db.insert(table), rows)
+    db.session.commit()
+    return len(rows)
+
+
+@click.command('rebuild-streaks')
+@click.option('--user-id', type=int, default=None, help='Rebuild one user instead of everyone')
+@with_appcontext
+def rebuild_streaks_command(user_id):
+    """Rebuild activity day bitmaps from the raw tracker tables"""
+    rows = rebuild_streak_bitmaps([user_id] if user_id else None)
+    click.echo(f"✅ Rebuilt {rows} activity bitmap(s)")
@@ -0,0 +1,196 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+
+class WaterCoalescer:
+    """Write-coalescing buffer for high-frequency water taps.
+
+    Taps from the same user on the same day that arrive within
+    ``WATER_COALESCE_WINDOW_MS`` of the first pending tap are merged into a
+    single ``NutritionEntry`` row, and the row plus its daily summary are
+    written in one transaction. Pending taps are flushed when the window
+    closes, before any read of the same user's nutrition data and on
+    worker shutdown.
+
+    Taps are acknowledged (202) before they are committed: a worker that
+    dies without running its exit handlers (SIGKILL, OOM, crash) loses the
+    taps of at most one window. Leave coalescing disabled where every tap
+    must be durable once acknowledged.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+        self._hooks_registered = False
+        self._reset_stats()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('WATER_COALESCE_ENABLED', False)
+        app.config.setdefault('WATER_COALESCE_WINDOW_MS', 500)
+        self.app = app
+        app.extensions['water_coalescer'] = self
+        # Process hooks cannot be unregistered; create_app may run many times
+        if not self._hooks_registered:
+            self._hooks_registered = True
+            atexit.register(self.flush_all)
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=self._after_fork)
+
+    @property
+    def enabled(self):
+        return bool(self.app and self.app.config.get('WATER_COALESCE_ENABLED'))
+
+    def add(self, user_id, glasses, entry_date, entry_time):
+        """Buffer a water tap and return the pending total for the day"""
+        key = (user_id, entry_date)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = {
+                    'glasses': 0,
+                    'taps': 0,
+                    'entry_time': entry_time
+                }
+            pending['glasses'] += glasses
+            pending['taps'] += 1
+            self.taps_received += 1
+            self._schedule_flush()
+
+            return {
+                'user_id': user_id,
+                'entry_type': 'water',
+                'water_glasses': pending['glasses'],
+                'taps': pending['taps'],
+                'entry_date': entry_date.isoformat(),
+                'entry_time': pending['entry_time'].strftime('%H:%M:%S')
+            }
+
+    def flush_user(self, user_id):
+        """Flush pending taps for one user so their next read sees them"""
+        with self._lock:
+            keys = [key for key in self._pending if key[0] == user_id]
+        if keys:
+            self._flush(keys)
+
+    def flush_all(self):
+        """Flush every pending tap (used by the timer and on shutdown)"""
+        with self._lock:
+            self._timer = None
+            keys = list(self._pending)
+        if keys:
+            self._flush(keys)
+
+    def stats(self):
+        """Snapshot of coalescing ratio and flush latency"""
+        with self._lock:
+            return {
+                'taps_received': self.taps_received,
+                'taps_flushed': self.taps_flushed,
+                'rows_written': self.rows_written,
+                'pending_taps': sum(p['taps'] for p in self._pending.values()),
+                'coalescing_ratio': round(self.taps_flushed / self.rows_written, 2) if self.rows_written else 0,
+                'flushes': self.flushes,
+                'flush_failures': self.flush_failures,
+                'flush_latency_total_ms': round(self.flush_seconds_total * 1000, 3),
+                'flush_latency_avg_ms': round(self.flush_seconds_total / self.flushes * 1000, 2) if self.flushes else 0,
+                'flush_latency_max_ms': round(self.flush_seconds_max * 1000, 2)
+            }
+
+    def _schedule_flush(self):
+        # Caller holds the lock. The window starts at the first pending tap.
+        if self._timer is None:
+            window = self.app.config['WATER_COALESCE_WINDOW_MS'] / 1000
+            self._timer = threading.Timer(window, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self):
+        try:
+            self.flush_all()
+        except Exception:
+            # Already logged and re-queued by _flush; the next tap or
+            # shutdown retries the write.
+            pass
+
+    def _flush(self, keys):
+        from app import db
+        from app.models.nutrition import NutritionEntry
+        from app.routes.nutrition import update_daily_summary
+        from app.services.dashboard import section_cache
+
+        with self._lock:
+            batch = {key: self._pending.pop(key) for key in keys if key in self._pending}
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        with self.app.app_context():
+            try:
+                for (user_id, entry_date), pending in batch.items():
+                    db.session.add(NutritionEntry(
+                        user_id=user_id,
+                        entry_type='water',
+                        water_glasses=pending['glasses'],
+                        entry_date=entry_date,
+                        entry_time=pending['entry_time']
+                    ))
+                db.session.flush()
+
+                for user_id, entry_date in batch:
+                    update_daily_summary(user_id, entry_date, commit=False)
+
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logging.exception("Failed to flush coalesced water entries")
+                self._requeue(batch)
+                raise
+
+        # No request wrote, so the after-request invalidation never ran
+        for user_id in {user_id for user_id, _ in batch}:
+            section_cache.invalidate(user_id=user_id)
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.flushes += 1
+            self.rows_written += len(batch)
+            self.taps_flushed += sum(p['taps'] for p in batch.values())
+            self.flush_seconds_total += elapsed
+            self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+
+    def _requeue(self, batch):
+        with self._lock:
+            self.flush_failures += 1
+            for key, pending in batch.items():
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = pending
+                else:
+                    current['glasses'] += pending['glasses']
+                    current['taps'] += pending['taps']
+                    current['entry_time'] = pending['entry_time']
+            if self._pending:
+                self._schedule_flush()
+
+    def _reset_stats(self):
+        self.taps_received = 0
+        self.taps_flushed = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+
+    def _after_fork(self):
+        # Timers do not survive fork; start each worker with a clean buffer.
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+        self._reset_stats()
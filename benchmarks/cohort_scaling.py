@@ -0,0 +1,91 @@
+"""
+Cohort statistics scaling report: batch job wall time by process count
+
+Seeds N users into a temporary SQLite database, then runs the
+population statistics job with each process count and reports the median
+wall time, speedup and parallel efficiency against one process as JSON.
+Every run must store the same statistics.
+
+    python -m benchmarks.cohort_scaling --users 200 --years 1 --processes 1,2,4,8
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def _stored_stats(db):
+    from app.models.cohort_stats import CohortStat
+    table = CohortStat.__table__
+    return sorted(
+        tuple(row) for row in db.session.execute(
+            db.select(table.c.metric, table.c.bucket, table.c.users, table.c.entries, table.c.value)
+        )
+    )
+
+
+def run(app, db, users, years, process_counts, repeat):
+    from benchmarks.generator import generate
+    from app.services.cohort_stats import run_cohort_stats
+
+    with app.app_context():
+        counts = generate(db, users=users, years=years, seed=42)
+        results = {
+            'cpu_count': os.cpu_count(),
+            'users': users,
+            'rows': sum(counts.values()),
+            'shards_per_process': app.config['COHORT_STATS_SHARDS_PER_PROCESS'],
+            'runs': {},
+        }
+
+        reference = None
+        for processes in process_counts:
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run_cohort_stats(processes=processes)
+                samples.append(time.perf_counter() - started)
+                stats = _stored_stats(db)
+                if reference is None:
+                    reference = stats
+                elif stats != reference:
+                    raise AssertionError(f"{processes} processes stored different statistics")
+            results['runs'][processes] = {'median_ms': round(statistics.median(samples) * 1000, 1)}
+
+        baseline = results['runs'][process_counts[0]]['median_ms']
+        for processes, entry in results['runs'].items():
+            entry['speedup'] = round(baseline / entry['median_ms'], 2)
+            entry['efficiency'] = round(entry['speedup'] / processes, 2)
+        results['identical_results'] = True
+        results['stats_rows'] = len(reference)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--years', type=float, default=1)
+    parser.add_argument('--processes', default='1,2,4,8')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+    process_counts = [int(n) for n in args.processes.split(',')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['TEST_DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'cohort.db')}"
+        from app import create_app, db
+        app = create_app('testing')
+        results = run(app, db, args.users, args.years, process_counts, args.repeat)
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Synthetic data generator for benchmarks
+
+Seeds N users with several years of mood, journal, exercise, meditation,
+breathing and nutrition history plus a resource catalog, using Core
+bulk inserts (executemany) in large batches rather than ORM objects.
+
+    DATABASE_URL=sqlite:////tmp/bench.db python -m benchmarks.generator --users 50 --years 3
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+BENCH_PASSWORD = 'bench-password'
+BATCH_SIZE = 5000
+
+MOOD_LABELS = {
+    1: 'Awful', 2: 'Very Sad', 3: 'Sad', 4: 'Down', 5: 'Okay',
+    6: 'Fine', 7: 'Good', 8: 'Happy', 9: 'Great', 10: 'Amazing',
+}
+ACTIVITIES = ['exercise', 'work', 'family', 'friends', 'reading', 'music', 'outdoors', 'gaming', 'cooking', 'meditation']
+TAGS = ['gratitude', 'work', 'anxiety', 'sleep', 'family', 'goals', 'health', 'reflection']
+WORDS = (
+    'today felt calm busy heavy bright slow hopeful tired grateful anxious focused '
+    'walked talked rested worked cooked laughed worried planned finished started '
+    'morning evening friend family project walk coffee rain sun music book'
+).split()
+EXERCISES = [('cardio', 'Jumping Jacks'), ('strength', 'Push-ups'), ('cardio', 'Running'), ('flexibility', 'Yoga')]
+MEDITATIONS = [('basic', 'Basic Meditation'), ('body-scan', 'Body Scan'), ('loving-kindness', 'Loving Kindness')]
+BREATHING = [('box', 'Box Breathing'), ('478', '4-7-8 Breathing'), ('triangle', 'Triangle Breathing')]
+MEALS = ['Oatmeal', 'Salad', 'Pasta', 'Rice Bowl', 'Sandwich', 'Soup', 'Curry', 'Fruit']
+RESOURCE_CATEGORIES = ['Anxiety', 'Depression', 'Coping', 'Self-Care', 'Wellness', 'Meditation',
+                       'Exercise', 'Growth', 'Mindfulness', 'Happiness']
+RESOURCE_TYPES = ['Article', 'Video', 'Exercise']
+
+
+class _Batcher:
+    """Buffers rows per table and flushes them with executemany"""
+
+    def __init__(self, db):
+        self.db = db
+        self.rows = {}
+        self.counts = {}
+
+    def add(self, table, row):
+        rows = self.rows.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= BATCH_SIZE:
+            self.flush(table)
+
+    def flush(self, table=None):
+        for name in ([table] if table else list(self.rows)):
+            rows = self.rows.get(name)
+            if rows:
+                self.db.session.execute(self.db.metadata.tables[name].insert(), rows)
+                self.counts[name] = self.counts.get(name, 0) + len(rows)
+                self.rows[name] = []
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _mood_score(rng, day_index, user_bias):
+    weekly = 0.8 * math.sin(2 * math.pi * day_index / 7)
+    seasonal = 0.6 * math.sin(2 * math.pi * day_index / 365)
+    return max(1, min(10, round(6 + user_bias + weekly + seasonal + rng.gauss(0, 1.4))))
+
+
+def generate(db, users=10, years=1, seed=42, start_user_index=0):
+    """Insert ``users`` users with ``years`` of daily history; returns row counts
+
+    Must be called inside an application context. Usernames are
+    ``bench_user_<n>`` and every user's password is ``BENCH_PASSWORD``.
+    """
+    from app import bcrypt
+
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    days = int(years * 365)
+    password_hash = bcrypt.generate_password_hash(BENCH_PASSWORD).decode('utf-8')
+    batcher = _Batcher(db)
+
+    if not db.session.execute(db.text('SELECT COUNT(*) FROM resources')).scalar():
+        for i in range(200):
+            created = now - timedelta(days=rng.randint(0, days))
+            batcher.add('resources', {
+                'title': f'Resource {i}: {_sentence(rng, 3)}',
+                'description': _sentence(rng, 12),
+                'content': ' '.join(_sentence(rng, 15) for _ in range(20)),
+                'category': rng.choice(RESOURCE_CATEGORIES),
+                'type': rng.choice(RESOURCE_TYPES),
+                'duration': rng.randint(2, 45),
+                'difficulty_level': rng.choice(['Beginner', 'Intermediate', 'Advanced']),
+                'tags': json.dumps(rng.sample(TAGS, 2)),
+                'is_featured': rng.random() < 0.1,
+                'is_active': True,
+                'created_at': created,
+                'updated_at': created,
+            })
+        batcher.flush('resources')
+
+    users_table = db.metadata.tables['users']
+    for n in range(start_user_index, start_user_index + users):
+        registered = now - timedelta(days=days)
+        user_id = db.session.execute(users_table.insert().values(
+            username=f'bench_user_{n}',
+            email=f'bench_user_{n}@example.org',
+            password_hash=password_hash,
+            first_name='Bench',
+            last_name=str(n),
+            created_at=registered,
+            updated_at=registered,
+            is_active=True,
+        )).inserted_primary_key[0]
+        batcher.counts['users'] = batcher.counts.get('users', 0) + 1
+        bias = rng.uniform(-1.5, 1.5)
+
+        for day_index in range(days):
+            day = registered + timedelta(days=day_index)
+
+            # Most users log mood daily, some days twice, some days not at all
+            for _ in range(rng.choices([0, 1, 2], weights=[15, 70, 15])[0]):
+                score = _mood_score(rng, day_index, bias)
+                created = day + timedelta(hours=rng.randint(7, 22), minutes=rng.randint(0, 59))
+                batcher.add('mood_entries', {
+                    'user_id': user_id,
+                    'mood_score': score,
+                    'mood_label': MOOD_LABELS[score],
+                    'notes': _sentence(rng, 8) if rng.random() < 0.4 else None,
+                    'activities': json.dumps(rng.sample(ACTIVITIES, rng.randint(1, 3))) if rng.random() < 0.7 else None,
+                    'sleep_hours': round(rng.uniform(4, 9.5), 1),
+                    'stress_level': rng.randint(1, 10),
+                    'energy_level': rng.randint(1, 10),
+                    'created_at': created,
+                    'updated_at': created,
+                })
+
+            if rng.random() < 0.4:
+                created = day + timedelta(hours=rng.randint(19, 23))
+                before = rng.randint(2, 8)
+                batcher.add('journal_entries', {
+                    'user_id': user_id,
+                    'title': _sentence(rng, 4).rstrip('.'),
+                    'content': ' '.join(_sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(3, 12))),
+                    'sentiment': rng.choice(['positive', 'neutral', 'negative']),
+                    'mood_before': before,
+                    'mood_after': min(10, before + rng.randint(0, 2)),
+                    'tags': json.dumps(rng.sample(TAGS, rng.randint(1, 3))),
+                    'is_private': True,
+                    'created_at': created,
+                    'updated_at': created,
+                })
+
+            for table, chance, kinds, type_column, name_column, extra in (
+                ('exercise_sessions', 0.5, EXERCISES, 'exercise_type', 'exercise_name', {}),
+                ('meditation_sessions', 0.35, MEDITATIONS, 'session_type', 'session_name',
+                 {'breath_count': rng.randint(10, 80)}),
+                ('breathing_methods', 0.25, BREATHING, 'method_type', 'method_name',
+                 {'cycles_completed': rng.randint(3, 12)}),
+            ):
+                if rng.random() < chance:
+                    kind, name = rng.choice(kinds)
+                    completed = day + timedelta(hours=rng.randint(6, 21))
+                    batcher.add(table, dict(extra, **{
+                        'user_id': user_id,
+                        type_column: kind,
+                        name_column: name,
+                        'duration_seconds': rng.randint(60, 1800),
+                        'completed': True,
+                        'session_date': day.date(),
+                        'completed_at': completed,
+                        'created_at': completed,
+                    }))
+
+            meals = rng.randint(1, 4)
+            glasses = 0
+            for meal_type in ['breakfast', 'lunch', 'dinner', 'snack'][:meals]:
+                at = day + timedelta(hours={'breakfast': 8, 'lunch': 13, 'dinner': 19, 'snack': 16}[meal_type])
+                batcher.add('nutrition_entries', {
+                    'user_id': user_id, 'entry_type': 'meal', 'name': rng.choice(MEALS),
+                    'meal_type': meal_type, 'water_glasses': None,
+                    'entry_date': day.date(), 'entry_time': at.time(), 'created_at': at,
+                })
+            for _ in range(rng.randint(0, 4)):
+                at = day + timedelta(hours=rng.randint(7, 22))
+                amount = rng.randint(1, 3)
+                glasses += amount
+                batcher.add('nutrition_entries', {
+                    'user_id': user_id, 'entry_type': 'water', 'name': None, 'meal_type': None,
+                    'water_glasses': amount, 'entry_date': day.date(), 'entry_time': at.time(), 'created_at': at,
+                })
+            batcher.add('daily_nutrition_summaries', {
+                'user_id': user_id, 'summary_date': day.date(), 'total_meals': meals,
+                'total_water_glasses': glasses, 'mood_score': '😊', 'created_at': day, 'updated_at': day,
+            })
+
+    batcher.flush()
+    db.session.commit()
+
+    # Mood entry ids are only known once inserted
+    from app.services.mood_activities import backfill_mood_activities
+    batcher.counts['mood_entry_activities'] = backfill_mood_activities(batch_size=BATCH_SIZE)
+    from app.services.mood_anomalies import rebuild_mood_baselines
+    batcher.counts['mood_alerts'] = rebuild_mood_baselines()[1]
+    from app.services.streaks import rebuild_streak_bitmaps
+    batcher.counts['activity_bitmaps'] = rebuild_streak_bitmaps()
+    return batcher.counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--years', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--config', default='production',
+                        help='config name; production reads DATABASE_URL')
+    args = parser.parse_args(argv)
+
+    from app import create_app, db
+    app = create_app(args.config)
+    with app.app_context():
+        started = time.perf_counter()
+        counts = generate(db, users=args.users, years=args.years, seed=args.seed)
+        elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    print(json.dumps({'rows': counts, 'total_rows': total, 'seconds': round(elapsed, 2),
+                      'rows_per_sec': round(total / elapsed)}, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Drives key endpoints through the Flask test client or a running server"""
+
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.generator import BENCH_PASSWORD, WORDS
+
+
+class TestClientTarget:
+    """Calls the app in-process through ``app.test_client()``"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def session(self):
+        client = self.app.test_client()
+
+        def request(method, path, headers=None, body=None):
+            response = client.open(path, method=method, headers=headers, json=body)
+            return response.status_code, response.get_data()
+        return request
+
+
+class HttpTarget:
+    """Calls a running server (e.g. a local gunicorn) over keep-alive HTTP"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+
+    def session(self):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+        def request(method, path, headers=None, body=None):
+            headers = dict(headers or {})
+            payload = None
+            if body is not None:
+                payload = json.dumps(body)
+                headers['Content-Type'] = 'application/json'
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        return request
+
+
+def login(target, username):
+    status, body = target.session()('POST', '/api/auth/login', body={'username': username, 'password': BENCH_PASSWORD})
+    if status != 200:
+        raise RuntimeError(f'Login failed for {username}: {status} {body[:200]!r}')
+    return {'Authorization': 'Bearer ' + json.loads(body)['access_token']}
+
+
+# Each scenario returns (method, path, body) for a randomly chosen user
+SCENARIOS = {
+    'login': lambda rng, user: ('POST', '/api/auth/login', {'username': user, 'password': BENCH_PASSWORD}),
+    'mood_analytics': lambda rng, user: ('GET', '/api/mood/analytics?days=365', None),
+    'journal_analytics': lambda rng, user: ('GET', '/api/journal/analytics', None),
+    'mood_history_page': lambda rng, user: ('GET', f'/api/mood/?page={rng.randint(1, 20)}&per_page=20', None),
+    'journal_search': lambda rng, user: ('GET', f'/api/journal/?search={rng.choice(WORDS)}', None),
+    'export': lambda rng, user: ('GET', '/api/user/export', None),
+}
+
+
+def run_scenario(target, name, users, tokens, requests, concurrency, seed=0):
+    """Issue ``requests`` calls of one scenario from ``concurrency`` threads"""
+    build = SCENARIOS[name]
+    latencies = []
+    counters = {'errors': 0, 'bytes': 0}
+    lock = threading.Lock()
+    per_thread = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def worker(index, count):
+        rng = random.Random(seed * 1000 + index)
+        request = target.session()
+        local, errors, size = [], 0, 0
+        for _ in range(count):
+            user = rng.choice(users)
+            method, path, body = build(rng, user)
+            started = time.perf_counter()
+            status, data = request(method, path, headers=tokens[user], body=body)
+            local.append(time.perf_counter() - started)
+            size += len(data)
+            if status >= 400:
+                errors += 1
+        with lock:
+            latencies.extend(local)
+            counters['errors'] += errors
+            counters['bytes'] += size
+
+    threads = [threading.Thread(target=worker, args=(i, n)) for i, n in enumerate(per_thread) if n]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - started, counters['errors'], counters['bytes']
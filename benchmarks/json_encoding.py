@@ -0,0 +1,102 @@
+"""
+JSON encoding benchmark: Flask's default provider vs FastJSONProvider
+
+Builds N transient mood and journal entries and times turning them into a
+JSON response body: to_dict() through Flask's default provider, to_dict()
+through FastJSONProvider (orjson when installed) and the list endpoints'
+ReadModel.dump() through FastJSONProvider. No database is needed.
+
+    python -m benchmarks.json_encoding --rows 10000 --repeat 5
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.json_provider import FastJSONProvider, orjson
+from app.models.journal import JournalEntry
+from app.models.mood import MoodEntry
+from app.models.user import User  # noqa: F401 - read_models' models relate to it by name
+from app.read_models import JOURNAL_ENTRY, MOOD_ENTRY
+
+
+def build_entries(rows, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    moods, journals = [], []
+    for i in range(rows):
+        created = start + timedelta(hours=i * 6, microseconds=rng.randrange(1000000))
+        mood = MoodEntry(
+            user_id=1, mood_score=rng.randint(1, 10), mood_label='Okay',
+            notes='Slept well, walked for an hour', activities='["walk", "reading"]',
+            sleep_hours=round(rng.uniform(4, 9), 1), stress_level=rng.randint(1, 10),
+            energy_level=rng.randint(1, 10), created_at=created, updated_at=created
+        )
+        mood.id = i + 1
+        journal = JournalEntry(
+            user_id=1, content=' '.join(['calm'] * rng.randint(20, 80)), title=f'Entry {i}',
+            sentiment='positive', mood_before=rng.randint(1, 10), mood_after=rng.randint(1, 10),
+            tags='["gratitude", "sleep"]', is_private=True, created_at=created, updated_at=created
+        )
+        journal.id = i + 1
+        moods.append(mood)
+        journals.append(journal)
+    return moods, journals
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 2), len(body)
+
+
+def run(rows, repeat):
+    app = Flask(__name__)
+    default = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    moods, journals = build_entries(rows)
+
+    results = {'rows': rows, 'orjson': orjson is not None, 'payloads': {}}
+    with app.app_context():
+        for name, read_model, entries in (('mood', MOOD_ENTRY, moods), ('journal', JOURNAL_ENTRY, journals)):
+            # The records the list endpoints load; the SELECT itself is not timed here
+            records = [read_model.record._make(getattr(e, f) for f in read_model.fields) for e in entries]
+            # dump() leaves datetimes to the provider, so it only pairs with FastJSONProvider
+            cases = {
+                'to_dict+default': lambda: default.response([e.to_dict() for e in entries]).get_data(),
+                'to_dict+fast': lambda: fast.response([e.to_dict() for e in entries]).get_data(),
+                'read_model+fast': lambda: fast.response(read_model.dump(records)).get_data(),
+            }
+            payload = {}
+            for case, fn in cases.items():
+                ms, size = _time(fn, repeat)
+                payload[case] = {'ms': ms, 'bytes': size}
+            baseline = payload['to_dict+default']['ms']
+            for entry in payload.values():
+                entry['speedup'] = round(baseline / entry['ms'], 2)
+            results['payloads'][name] = payload
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
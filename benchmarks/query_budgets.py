@@ -0,0 +1,306 @@
+"""
+Query-budget harness: drives every API endpoint against a seeded database
+
+Each endpoint is called once as a user with a short history and once as
+a user with a long one, with QUERY_BUDGET_ENFORCE on. The run fails
+(exit code 1) when a view has no ``@query_budget``, exceeds its budget,
+runs more statements as history grows (an N+1 pattern) or errors. Offending
+SQL is printed with the application frames that issued it.
+
+    python -m benchmarks.query_budgets --small 5 --large 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+import email_validator
+from flask import g, has_app_context
+
+# Endpoints that never touch the database
+EXEMPT_ENDPOINTS = {'static', 'assets', 'metrics'}
+
+PASSWORD = 'budget-pass-1'
+
+
+def _requests(ctx):
+    """(method, path, json body) for every endpoint, in a safe order"""
+    today = date.today().isoformat()
+    return [
+        ('POST', '/api/auth/register', lambda: _new_user(ctx['seq']())),
+        ('POST', '/api/auth/login', lambda: {'username': ctx['username'], 'password': PASSWORD}),
+        ('POST', '/api/auth/refresh', None),
+        ('GET', '/api/auth/me', None),
+        # Builds the daily feature matrix, so the writes below also maintain it
+        ('GET', '/api/mood/insights/habits', None),
+        ('POST', '/api/auth/logout', None),
+        ('GET', '/api/user/profile', None),
+        ('PUT', '/api/user/profile', lambda: {'first_name': 'Budget'}),
+        ('PUT', '/api/user/change-password', lambda: {'current_password': PASSWORD, 'new_password': PASSWORD}),
+        ('GET', '/api/user/stats', None),
+        ('GET', '/api/user/streaks', None),
+        ('GET', '/api/calendar', None),
+        ('PUT', '/api/user/settings', lambda: {'email_notifications': True}),
+        ('GET', '/api/user/export', None),
+        ('POST', '/api/mood/', lambda: {'mood_score': 6, 'mood_label': 'Calm', 'activities': ['walk']}),
+        ('GET', '/api/mood/', None),
+        ('GET', '/api/mood/?activity=walk', None),
+        ('GET', '/api/mood/analytics', None),
+        ('GET', '/api/mood/analytics?format=columnar', None),
+        ('GET', '/api/mood/analytics?days=400&max_points=20', None),
+        ('GET', '/api/mood/insights', None),
+        # Fits inline on the first call, then evaluates the stored model
+        ('GET', '/api/mood/forecast', None),
+        ('GET', '/api/mood/forecast', None),
+        ('GET', lambda: f"/api/mood/{ctx['mood_id']}", None),
+        ('PUT', lambda: f"/api/mood/{ctx['mood_id']}", lambda: {'notes': 'updated'}),
+        ('POST', '/api/journal/', lambda: {'content': 'A short budget entry', 'tags': ['budget']}),
+        ('GET', '/api/journal/', None),
+        ('GET', '/api/journal/analytics', None),
+        ('GET', lambda: f"/api/journal/{ctx['journal_id']}", None),
+        ('PUT', lambda: f"/api/journal/{ctx['journal_id']}", lambda: {'title': 'Updated'}),
+        ('GET', '/api/resources/', None),
+        ('GET', lambda: f"/api/resources/{ctx['resource_id']}", None),
+        ('GET', '/api/resources/categories', None),
+        ('GET', '/api/resources/types', None),
+        ('GET', '/api/resources/featured', None),
+        ('GET', '/api/dashboard/summary', None),
+        ('GET', '/api/dashboard/summary?sections=mood,featured_resources', None),
+        ('GET', '/api/admin/cohort-stats', None),
+        ('GET', '/api/resources/recommended', None),
+        ('POST', '/api/resources/', lambda: {
+            'title': 'Budget', 'description': 'd', 'content': 'c', 'category': 'Wellness', 'type': 'Article'}),
+        ('PUT', lambda: f"/api/resources/{ctx['resource_id']}", lambda: {'title': 'Updated'}),
+        ('POST', '/api/nutrition/api/nutrition/meal', lambda: {'name': 'Oats', 'type': 'breakfast'}),
+        ('POST', '/api/nutrition/api/nutrition/water', lambda: {'glasses': 1}),
+        ('GET', f'/api/nutrition/api/nutrition/daily/{today}', None),
+        ('GET', '/api/nutrition/api/nutrition/history', None),
+        ('GET', '/api/nutrition/api/nutrition/history?days=365&format=columnar', None),
+        ('DELETE', lambda: f"/api/nutrition/api/nutrition/meal/{ctx['meal_id']}", None),
+        ('POST', '/api/nutrition/api/nutrition/reset-daily', None),
+        ('POST', '/api/activities/api/exercise/complete', lambda: {
+            'exercise_type': 'cardio', 'exercise_name': 'Jumping jacks', 'duration_seconds': 60}),
+        ('GET', '/api/activities/api/exercise/history', None),
+        ('GET', '/api/activities/api/exercise/history?format=columnar', None),
+        ('POST', '/api/activities/api/meditation/complete', lambda: {'duration_seconds': 120}),
+        ('GET', '/api/activities/api/meditation/history', None),
+        ('POST', '/api/activities/api/breathing/complete', lambda: {
+            'method_type': 'box', 'method_name': 'Box breathing', 'duration_seconds': 90}),
+        ('GET', '/api/activities/api/breathing/history', None),
+        ('GET', '/api/activities/api/activities/stats', None),
+        ('GET', '/', None),
+        ('GET', '/login', None),
+        ('GET', '/dashboard', None),
+        ('GET', '/mood', None),
+        ('GET', '/journal', None),
+        ('GET', '/resources', None),
+        ('GET', '/analytics', None),
+        ('GET', '/profile', None),
+        ('GET', '/quiz', None),
+        ('GET', '/api', None),
+        ('GET', '/health', None),
+        ('DELETE', lambda: f"/api/mood/{ctx['mood_id']}", None),
+        ('DELETE', lambda: f"/api/journal/{ctx['journal_id']}", None),
+        ('DELETE', lambda: f"/api/resources/{ctx['resource_id']}", None),
+        ('DELETE', '/api/user/delete', None),
+        ('GET', '/api/user/delete/status', None),
+    ]
+
+
+def _new_user(username):
+    return {'username': username, 'email': f'{username}@example.org', 'password': PASSWORD}
+
+
+def seed_history(db, user_id, days):
+    """One entry per tracker per day for ``days`` days, plus a resource catalog"""
+    from app.models.mood import MoodEntry
+    from app.services.mood_activities import backfill_mood_activities
+    from app.services.mood_anomalies import rebuild_mood_baselines
+    from app.services.streaks import rebuild_streak_bitmaps
+    from app.models.journal import JournalEntry
+    from app.models.exercise import ExerciseSession, MeditationSession, BreathingMethod
+    from app.models.nutrition import NutritionEntry
+    from app.models.resource import Resource
+
+    now = datetime.utcnow()
+    rows = []
+    for i in range(days):
+        day = now - timedelta(days=i)
+        rows += [
+            MoodEntry(user_id=user_id, mood_score=i % 10 + 1, mood_label='Okay',
+                      activities='["walk"]', created_at=day, updated_at=day),
+            JournalEntry(user_id=user_id, content=f'Entry {i}', tags='["seed"]',
+                         mood_before=5, mood_after=6, created_at=day, updated_at=day),
+            ExerciseSession(user_id=user_id, exercise_type='cardio', exercise_name='Run',
+                            duration_seconds=600, session_date=day.date(), completed_at=day),
+            MeditationSession(user_id=user_id, session_type='basic', session_name='Sit',
+                              duration_seconds=300, session_date=day.date(), completed_at=day),
+            BreathingMethod(user_id=user_id, method_type='box', method_name='Box',
+                            duration_seconds=120, session_date=day.date(), completed_at=day),
+            NutritionEntry(user_id=user_id, entry_type='meal', name='Meal', meal_type='lunch',
+                           entry_date=day.date(), entry_time=day.time()),
+            NutritionEntry(user_id=user_id, entry_type='water', water_glasses=2,
+                           entry_date=day.date(), entry_time=day.time()),
+        ]
+    rows += [
+        Resource(title=f'Resource {i}', description='d', content='c',
+                 category=['Wellness', 'Coping', 'Growth'][i % 3], type='Article',
+                 is_featured=i % 2 == 0)
+        for i in range(10)
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    backfill_mood_activities()
+    rebuild_mood_baselines([user_id])
+    rebuild_streak_bitmaps([user_id])
+
+
+def create_harness_app(database_path):
+    # Must be set before config.py is first imported
+    os.environ['TEST_DATABASE_URL'] = 'sqlite:///' + database_path
+    # Keep the harness offline: skip the DNS lookup behind email validation
+    email_validator.CHECK_DELIVERABILITY = False
+
+    from app import create_app
+    app = create_app('testing')
+    app.config['ACCOUNT_PURGE_IN_BACKGROUND'] = False
+    app.config['ADMIN_USERNAMES'] = ['budget_small', 'budget_large']
+    return app
+
+
+def run_pass(app, username, history_days):
+    """Call every endpoint as ``username`` after seeding ``history_days`` of data"""
+    from app import db
+    from app.services.cohort_stats import run_cohort_stats
+
+    counter = iter(range(1, 1_000_000))
+    ctx = {'username': username, 'seq': lambda: f"{username}{next(counter)}"}
+    with app.test_client() as client:
+        response = client.post('/api/auth/register', json=_new_user(username))
+        tokens = response.get_json()
+        headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+        refresh_headers = {'Authorization': f"Bearer {tokens['refresh_token']}"}
+
+        with app.app_context():
+            seed_history(db, tokens['user']['id'], history_days)
+            # Gives /api/admin/cohort-stats a stored run to serve
+            run_cohort_stats(processes=1)
+
+        results = {}
+        for method, path, body in _requests(ctx):
+            path = path() if callable(path) else path
+            request_headers = refresh_headers if path.endswith('/refresh') else headers
+            if not path.startswith('/api/'):
+                # Pages are public; call them the way an anonymous visitor would
+                request_headers = None
+            error = None
+            try:
+                response = client.open(path, method=method, headers=request_headers,
+                                       json=body() if body else None)
+                status = response.status_code
+                payload = response.get_json(silent=True) or {}
+            except Exception as e:
+                status, payload, error = 500, {}, e
+
+            endpoint = _endpoint(app, path, method)
+            result = {
+                'status': status,
+                # The request context is only preserved when no exception escaped
+                'statements': g.get('query_log', []) if has_app_context() else [],
+                'budget': _budget(app, endpoint),
+                'error': error,
+            }
+            # Endpoints called with several query strings report their worst call
+            if endpoint not in results or _severity(result) > _severity(results[endpoint]):
+                results[endpoint] = result
+            _remember_ids(ctx, payload)
+    return results
+
+
+def _severity(result):
+    failed = result['error'] is not None or result['status'] >= 500
+    return failed, len(result['statements'])
+
+
+def _endpoint(app, path, method):
+    adapter = app.url_map.bind('localhost')
+    return adapter.match(path.split('?', 1)[0], method=method)[0]
+
+
+def _budget(app, endpoint):
+    from app.query_budget import get_query_budget
+    return get_query_budget(app, endpoint)
+
+
+def _remember_ids(ctx, payload):
+    for key, name in (('mood_entry', 'mood_id'), ('journal_entry', 'journal_id'),
+                      ('resource', 'resource_id'), ('meal', 'meal_id')):
+        if isinstance(payload, dict) and isinstance(payload.get(key), dict) and 'id' in payload[key]:
+            ctx[name] = payload[key]['id']
+    if isinstance(payload, dict) and payload.get('resources'):
+        ctx.setdefault('resource_id', payload['resources'][0]['id'])
+
+
+def find_failures(app, small, large, verbose=False):
+    """Budget violations across both passes, one message per failing endpoint"""
+    from app.query_budget import QueryBudgetExceeded, format_query_log
+
+    failures = []
+    for endpoint in sorted(set(app.view_functions) - EXEMPT_ENDPOINTS):
+        if endpoint not in large:
+            failures.append(f"{endpoint}: not exercised by the harness")
+            continue
+        budget = large[endpoint]['budget']
+        small_count = len(small[endpoint]['statements'])
+        large_count = len(large[endpoint]['statements'])
+
+        if verbose:
+            print(f"{endpoint:45s} {large[endpoint]['status']}  "
+                  f"{small_count:3d} -> {large_count:3d} statements (budget {budget})")
+
+        if budget is None:
+            failures.append(f"{endpoint}: no @query_budget declared ({large_count} statements)")
+            continue
+
+        errors = []
+        for result in (small[endpoint], large[endpoint]):
+            if isinstance(result['error'], QueryBudgetExceeded):
+                errors.append(str(result['error']))
+            elif result['error'] is not None:
+                errors.append(f"{endpoint}: {result['error']!r}")
+            elif result['status'] >= 500:
+                errors.append(f"{endpoint}: returned {result['status']}")
+        if errors:
+            failures.extend(dict.fromkeys(errors))
+        elif large_count > small_count:
+            failures.append(
+                f"{endpoint}: statements grow with history ({small_count} -> {large_count})\n"
+                + format_query_log(endpoint, budget, large[endpoint]['statements'])
+            )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--small', type=int, default=5, help='days of history for the first pass')
+    parser.add_argument('--large', type=int, default=200, help='days of history for the second pass')
+    parser.add_argument('--verbose', action='store_true', help='print every endpoint')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_harness_app(os.path.join(tmp, 'budget.db'))
+        small = run_pass(app, 'budget_small', args.small)
+        large = run_pass(app, 'budget_large', args.large)
+
+    failures = find_failures(app, small, large, verbose=args.verbose)
+    if failures:
+        print('\n'.join(['FAIL'] + failures))
+        return 1
+    print(f"OK: {len(large)} endpoints within budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
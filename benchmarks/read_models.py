@@ -0,0 +1,123 @@
+"""
+Read model benchmark: ORM instances vs column-projected records
+
+Seeds N mood and journal rows into a temporary SQLite database, then loads
+them as ORM instances and as ReadModel records and reports load time,
+load+dump time and memory retained per row (tracemalloc) as JSON.
+
+    python -m benchmarks.read_models --rows 10000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+
+def _seed(db, rows):
+    from app.models.user import User
+    from app.models.mood import MoodEntry
+    from app.models.journal import JournalEntry
+
+    user = User(username='readmodel', email='readmodel@example.com', password='x')
+    db.session.add(user)
+    db.session.commit()
+
+    start = datetime(2020, 1, 1)
+    moods, journals = [], []
+    for i in range(rows):
+        created = start + timedelta(hours=i * 5)
+        moods.append({
+            'user_id': user.id, 'mood_score': i % 10 + 1, 'mood_label': 'Okay',
+            'notes': 'Slept well, walked for an hour', 'activities': '["walk"]',
+            'sleep_hours': 7.5, 'stress_level': 4, 'energy_level': 6,
+            'created_at': created, 'updated_at': created,
+        })
+        journals.append({
+            'user_id': user.id, 'title': f'Entry {i}', 'content': 'calm ' * 60,
+            'sentiment': 'positive', 'mood_before': 4, 'mood_after': 6,
+            'tags': '["gratitude"]', 'is_private': True,
+            'created_at': created, 'updated_at': created,
+        })
+    db.session.execute(db.insert(MoodEntry), moods)
+    db.session.execute(db.insert(JournalEntry), journals)
+    db.session.commit()
+    return user.id
+
+
+def _measure(load, dump):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    items = load()
+    load_ms = (time.perf_counter() - started) * 1000
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    dump(items)
+    dump_ms = (time.perf_counter() - started) * 1000
+    return len(items), {
+        'load_ms': round(load_ms, 1),
+        'load_and_dump_ms': round(load_ms + dump_ms, 1),
+        'retained_bytes_per_row': round(retained / max(len(items), 1)),
+        'peak_bytes_per_row': round(peak / max(len(items), 1)),
+    }
+
+
+def run(app, db, rows):
+    from app.models.mood import MoodEntry
+    from app.models.journal import JournalEntry
+    from app.read_models import MOOD_ENTRY, JOURNAL_ENTRY
+
+    results = {'rows': rows, 'payloads': {}}
+    with app.app_context():
+        user_id = _seed(db, rows)
+        for name, model, read_model in (
+            ('mood', MoodEntry, MOOD_ENTRY),
+            ('journal', JournalEntry, JOURNAL_ENTRY),
+        ):
+            payload = {}
+            db.session.expunge_all()
+            _, payload['orm'] = _measure(
+                lambda: model.query.filter_by(user_id=user_id).all(),
+                lambda items: app.json.dumps([item.to_dict() for item in items])
+            )
+            db.session.expunge_all()
+            _, payload['read_model'] = _measure(
+                lambda: read_model.all(read_model.select().where(model.user_id == user_id)),
+                lambda items: app.json.dumps(read_model.dump(items))
+            )
+            orm, records = payload['orm'], payload['read_model']
+            payload['memory_ratio'] = round(
+                orm['retained_bytes_per_row'] / records['retained_bytes_per_row'], 2)
+            payload['speedup'] = round(orm['load_and_dump_ms'] / records['load_and_dump_ms'], 2)
+            results['payloads'][name] = payload
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['TEST_DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'read_models.db')}"
+        from app import create_app, db
+        app = create_app('testing')
+        results = run(app, db, args.rows)
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Latency/throughput summaries, peak RSS and run-to-run comparison"""
+
+import json
+import os
+import resource
+import statistics
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed, errors=0, response_bytes=0):
+    """p50/p95/p99 latency in ms and throughput for one scenario"""
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 2) if ordered else 0.0,
+        'throughput_rps': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'avg_response_bytes': round(response_bytes / len(ordered)) if ordered else 0,
+    }
+
+
+def peak_rss_mb(server_pid=None):
+    """Peak resident memory of this process, or of a server and its workers"""
+    if server_pid is None:
+        # ru_maxrss is KiB on Linux
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    total_kb = 0
+    for pid in [server_pid] + _children(server_pid):
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return round(total_kb / 1024, 1)
+
+
+def _children(pid):
+    children = []
+    for task in os.listdir(f'/proc/{pid}/task') if os.path.isdir(f'/proc/{pid}/task') else []:
+        try:
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                children += [int(child) for child in f.read().split()]
+        except OSError:
+            continue
+    return children
+
+
+def compare(current, baseline, tolerance=0.2):
+    """List scenarios whose p95 or throughput regressed beyond ``tolerance``"""
+    regressions = []
+    for name, result in current['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        if before['p95_ms'] and result['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {result['p95_ms']} ms")
+        if before['throughput_rps'] and result['throughput_rps'] < before['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_rps']} -> {result['throughput_rps']} rps")
+    before_rss = baseline.get('peak_rss_mb')
+    if before_rss and current['peak_rss_mb'] > before_rss * (1 + tolerance):
+        regressions.append(f"peak RSS {before_rss} -> {current['peak_rss_mb']} MB")
+    return regressions
+
+
+def write_report(report, path=None):
+    text = json.dumps(report, indent=2)
+    if path:
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+    return text
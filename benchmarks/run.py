@@ -0,0 +1,91 @@
+"""
+End-to-end benchmark: seed synthetic data, drive key endpoints, report JSON
+
+In-process (Flask test client against a fresh seeded SQLite database):
+
+    python -m benchmarks.run --users 20 --years 3 --requests 200 --output run.json
+
+Against a running server seeded with ``benchmarks.generator``:
+
+    python -m benchmarks.run --url http://127.0.0.1:8000 --users 20 --server-pid <gunicorn pid>
+
+Pass ``--compare baseline.json`` to exit non-zero when p95 latency,
+throughput or peak RSS regress beyond ``--tolerance``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from benchmarks import harness, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--years', type=float, default=2)
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--scenarios', default=','.join(harness.SCENARIOS))
+    parser.add_argument('--url', help='benchmark a running server instead of the test client')
+    parser.add_argument('--server-pid', type=int, help='gunicorn master pid, for peak RSS of the server')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--compare', help='baseline JSON report to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    usernames = [f'bench_user_{n}' for n in range(args.users)]
+    seed_seconds = None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            target = harness.HttpTarget(args.url)
+        else:
+            # ProductionConfig reads DATABASE_URL when config.py is first imported
+            os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+            from app import create_app, db
+            from benchmarks.generator import generate
+            app = create_app('production')
+            with app.app_context():
+                started = time.perf_counter()
+                generate(db, users=args.users, years=args.years)
+                seed_seconds = round(time.perf_counter() - started, 2)
+            target = harness.TestClientTarget(app)
+
+        tokens = {user: harness.login(target, user) for user in usernames}
+
+        scenarios = {}
+        for i, name in enumerate(args.scenarios.split(',')):
+            latencies, elapsed, errors, size = harness.run_scenario(
+                target, name, usernames, tokens, args.requests, args.concurrency, seed=i
+            )
+            scenarios[name] = report.summarize(latencies, elapsed, errors, size)
+
+    result = {
+        'target': args.url or 'test_client',
+        'users': args.users,
+        'years': args.years,
+        'concurrency': args.concurrency,
+        'seed_seconds': seed_seconds,
+        'python': platform.python_version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'scenarios': scenarios,
+        'peak_rss_mb': report.peak_rss_mb(args.server_pid),
+    }
+    print(report.write_report(result, args.output))
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = report.compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print('REGRESSIONS:\n  ' + '\n  '.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
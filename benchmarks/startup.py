@@ -0,0 +1,102 @@
+"""
+Startup-time benchmark for ``create_app()``
+
+Times import plus app construction in fresh interpreters against a
+throwaway SQLite database, and fails (exit code 1) when the median
+regresses past the recorded baseline or when a heavy optional
+dependency is imported at startup instead of on first use.
+
+    python -m benchmarks.startup                 # check against baseline
+    python -m benchmarks.startup --update-baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_baseline.json')
+
+# Modules that must only load on first use
+LAZY_MODULES = ['textblob', 'nltk', 'numpy']
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+create_app('production')
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    'ms': elapsed * 1000,
+    'eager_modules': [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def measure(runs):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(tmp, 'startup.db'))
+        samples = []
+        eager = set()
+        # The first run creates the schema; later runs are the steady-state cold start
+        for i in range(runs + 1):
+            output = subprocess.run(
+                [sys.executable, '-c', PROBE], cwd=ROOT, env=env,
+                capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            eager.update(result['eager_modules'])
+            if i:
+                samples.append(result['ms'])
+
+    return {
+        'runs': runs,
+        'median_ms': round(statistics.median(samples), 1),
+        'min_ms': round(min(samples), 1),
+        'max_ms': round(max(samples), 1),
+        'eager_modules': sorted(eager),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed fractional slowdown over the baseline median')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    result = measure(args.runs)
+    print(json.dumps(result, indent=2))
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump({'median_ms': result['median_ms']}, f, indent=2)
+            f.write('\n')
+        print(f"Baseline updated: {result['median_ms']} ms")
+        return 0
+
+    failures = []
+    if result['eager_modules']:
+        failures.append(f"imported at startup: {', '.join(result['eager_modules'])}")
+
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)['median_ms']
+        limit = baseline * (1 + args.tolerance)
+        if result['median_ms'] > limit:
+            failures.append(f"median {result['median_ms']} ms exceeds {limit:.1f} ms (baseline {baseline} ms)")
+
+    if failures:
+        print('FAIL: ' + '; '.join(failures))
+        return 1
+    print('OK')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,6 +10,91 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     CORS_HEADERS = 'Content-Type'
+    
+    # SQLite pragmas applied to every new connection (set a value to None to skip it)
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),  # negative = KiB, so 64MB
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 268435456)),  # 256MB
+        'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY')
+    }
+    
+    # Connection pool settings for server databases (ignored for SQLite)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    
+    # Optional read bind for analytics, history, export and catalog reads.
+    # 'auto' opens the primary SQLite file read-only; any other value is a replica URL.
+    SQLALCHEMY_READ_DATABASE_URI = os.environ.get('DATABASE_READ_URL')
+    READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+    
+    # Compare the stored schema version at startup and create tables only when behind
+    SCHEMA_CHECK_ON_STARTUP = os.environ.get('SCHEMA_CHECK_ON_STARTUP', 'true').lower() == 'true'
+    
+    # Per-endpoint request and SQL metrics served at /metrics. Point METRICS_DIR at a
+    # directory shared by all gunicorn workers to aggregate across processes.
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_DIR = os.environ.get('METRICS_DIR')
+    METRICS_FLUSH_INTERVAL = int(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+    # Bearer token Prometheus sends to /metrics; unset, only loopback requests are served
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # Merge rapid water taps from the same user into one write. Taps are acknowledged
+    # before they are committed, so a killed worker loses up to one window of them
+    WATER_COALESCE_ENABLED = os.environ.get('WATER_COALESCE_ENABLED', 'false').lower() == 'true'
+    WATER_COALESCE_WINDOW_MS = int(os.environ.get('WATER_COALESCE_WINDOW_MS', 500))
+    
+    # Fingerprinted /assets/ URLs never change content, so cache them for a year
+    ASSET_MAX_AGE = int(os.environ.get('ASSET_MAX_AGE', 31536000))
+    
+    # Render the static page templates once per process (re-rendered on change with auto-reload)
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+    
+    # Per-process cache of /api/dashboard/summary sections (0 disables)
+    DASHBOARD_CACHE_SECONDS = int(os.environ.get('DASHBOARD_CACHE_SECONDS', 30))
+    DASHBOARD_SHARED_CACHE_SECONDS = int(os.environ.get('DASHBOARD_SHARED_CACHE_SECONDS', 300))
+    
+    # /api/mood/insights results, retired early by any write of the user's (on any worker)
+    MOOD_INSIGHTS_CACHE_SECONDS = int(os.environ.get('MOOD_INSIGHTS_CACHE_SECONDS', 3600))
+    
+    # /api/calendar years, retired early by any write of the user's (on any worker)
+    CALENDAR_CACHE_SECONDS = int(os.environ.get('CALENDAR_CACHE_SECONDS', 3600))
+    
+    # Days with at least this many glasses count as adequate water in /api/mood/insights/habits
+    ADEQUATE_WATER_GLASSES = int(os.environ.get('ADEQUATE_WATER_GLASSES', 6))
+    
+    # Mood drop alerts: a logged score this many standard deviations below the user's
+    # exponentially weighted baseline (smoothing ALPHA) is flagged, once the baseline has
+    # MIN_ENTRIES entries; the deviation is floored at MIN_STD points
+    MOOD_ANOMALY_Z_THRESHOLD = float(os.environ.get('MOOD_ANOMALY_Z_THRESHOLD', 2.0))
+    MOOD_BASELINE_ALPHA = float(os.environ.get('MOOD_BASELINE_ALPHA', 0.1))
+    MOOD_BASELINE_MIN_ENTRIES = int(os.environ.get('MOOD_BASELINE_MIN_ENTRIES', 7))
+    MOOD_ANOMALY_MIN_STD = float(os.environ.get('MOOD_ANOMALY_MIN_STD', 1.0))
+    
+    # `flask fit-mood-forecasts` batch job: worker processes (default: CPU count), level
+    # smoothing, and the fewest days of mood history a forecast is fitted from
+    MOOD_FORECAST_PROCESSES = int(os.environ.get('MOOD_FORECAST_PROCESSES', 0)) or None
+    MOOD_FORECAST_ALPHA = float(os.environ.get('MOOD_FORECAST_ALPHA', 0.1))
+    MOOD_FORECAST_MIN_DAYS = int(os.environ.get('MOOD_FORECAST_MIN_DAYS', 14))
+    
+    # Usernames allowed to call /api/admin endpoints (comma separated)
+    ADMIN_USERNAMES = [name.strip() for name in os.environ.get('ADMIN_USERNAMES', '').split(',') if name.strip()]
+    
+    # `flask cohort-stats` batch job: worker processes (default: CPU count), user shards
+    # per process, and the fewest users a stored aggregate may describe
+    COHORT_STATS_PROCESSES = int(os.environ.get('COHORT_STATS_PROCESSES', 0)) or None
+    COHORT_STATS_SHARDS_PER_PROCESS = int(os.environ.get('COHORT_STATS_SHARDS_PER_PROCESS', 4))
+    COHORT_MIN_USERS = int(os.environ.get('COHORT_MIN_USERS', 5))
+    
+    # Account deletion purges user data in the background, in small chunks
+    ACCOUNT_PURGE_IN_BACKGROUND = os.environ.get('ACCOUNT_PURGE_IN_BACKGROUND', 'true').lower() == 'true'
+    ACCOUNT_PURGE_CHUNK_SIZE = int(os.environ.get('ACCOUNT_PURGE_CHUNK_SIZE', 500))
+    ACCOUNT_PURGE_PAUSE_MS = int(os.environ.get('ACCOUNT_PURGE_PAUSE_MS', 10))
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -24,7 +109,8 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///mental_health_test.db'
+    QUERY_BUDGET_ENFORCE = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite:///mental_health_test.db'
 
 config = {
     'development': DevelopmentConfig,
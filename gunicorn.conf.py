@@ -0,0 +1,83 @@
+"""Gunicorn configuration
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden from the environment (GUNICORN_*, PORT).
+Defaults are tuned for our mix of bcrypt-bound logins and SQLite-bound reads;
+see benchmarks/ for the load tests behind them.
+"""
+
+import glob
+import multiprocessing
+import os
+import tempfile
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 8000)}")
+
+# gthread: bcrypt releases the GIL and SQLite waits on I/O, so a few threads per
+# worker keep the CPU busy without the memory cost of extra processes.
+# sync: one request per process, use when requests are purely CPU bound.
+# gevent: many slow clients; requires the gevent package.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+if worker_class == 'sync':
+    default_workers = cpu_count * 2 + 1
+elif worker_class == 'gevent':
+    default_workers = cpu_count
+else:
+    default_workers = cpu_count + 1
+
+workers = int(os.environ.get('GUNICORN_WORKERS', default_workers))
+threads = int(os.environ.get('GUNICORN_THREADS', 4 if worker_class == 'gthread' else 1))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Load the app once in the master so workers share its memory copy-on-write
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Recycle workers to bound slow leaks; jitter stops them all restarting at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+# Workers are separate processes, so /metrics needs a shared snapshot directory.
+# Set it before the app is loaded so the preloaded app picks it up.
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'mental-health-metrics'))
+
+
+def on_starting(server):
+    """Drop metric snapshots left behind by a previous master"""
+    for path in glob.glob(os.path.join(os.environ['METRICS_DIR'], 'metrics-*.json')):
+        os.remove(path)
+
+
+def post_fork(server, worker):
+    """Give each worker its own database connections"""
+    app = server.app.wsgi()
+    from app import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    """Flush buffered writes and metrics before a worker is recycled"""
+    app = server.app.wsgi()
+    from app import metrics, water_coalescer
+    water_coalescer.flush_all()
+    if 'metrics' in app.extensions:
+        metrics.write_snapshot()
+
+
+def child_exit(server, worker):
+    """Fold the exited worker's metrics into the totals so its file can go"""
+    from app.metrics import retire_snapshot
+    retire_snapshot(os.environ['METRICS_DIR'], worker.pid)
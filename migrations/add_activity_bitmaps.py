@@ -0,0 +1,25 @@
+"""
+Migration script to add the activity_bitmaps table
+Run this script to create the table and build every user's per-tracker
+activity day bitmaps from the raw tracker tables
+"""
+
+from app import create_app, db
+from app.schema import upgrade_schema
+from app.services.streaks import rebuild_streak_bitmaps
+
+def migrate():
+    """Create activity_bitmaps and fill it from the tracker tables"""
+    app = create_app()
+
+    with app.app_context():
+        print("Creating activity_bitmaps table...")
+        upgrade_schema()
+
+        print("Building activity bitmaps from existing entries...")
+        rows = rebuild_streak_bitmaps()
+
+        print(f"✅ Migration completed successfully! {rows} bitmaps built")
+
+if __name__ == "__main__":
+    migrate()
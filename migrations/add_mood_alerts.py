@@ -0,0 +1,25 @@
+"""
+Migration script to add the mood_baselines and mood_alerts tables
+Run this script to create the tables and replay existing mood history
+into per-user baselines and drop alerts
+"""
+
+from app import create_app, db
+from app.schema import upgrade_schema
+from app.services.mood_anomalies import rebuild_mood_baselines
+
+def migrate():
+    """Create mood_baselines and mood_alerts and fill them from mood_entries"""
+    app = create_app()
+
+    with app.app_context():
+        print("Creating mood_baselines and mood_alerts tables...")
+        upgrade_schema()
+
+        print("Replaying mood history into baselines...")
+        users, alerts = rebuild_mood_baselines()
+
+        print(f"✅ Migration completed successfully! {users} baselines rebuilt, {alerts} alerts raised")
+
+if __name__ == "__main__":
+    migrate()
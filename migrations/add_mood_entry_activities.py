@@ -0,0 +1,25 @@
+"""
+Migration script to add the normalized mood_entry_activities table
+Run this script to create the table and backfill it from the JSON
+activities of existing mood entries
+"""
+
+from app import create_app, db
+from app.schema import upgrade_schema
+from app.services.mood_activities import backfill_mood_activities
+
+def migrate():
+    """Create mood_entry_activities and fill it from mood_entries.activities"""
+    app = create_app()
+
+    with app.app_context():
+        print("Creating mood_entry_activities table...")
+        upgrade_schema()
+
+        print("Backfilling activities from existing mood entries...")
+        inserted = backfill_mood_activities()
+
+        print(f"✅ Migration completed successfully! {inserted} activity rows added")
+
+if __name__ == "__main__":
+    migrate()
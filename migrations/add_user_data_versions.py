@@ -0,0 +1,21 @@
+"""
+Migration script to add the user_data_versions table
+Run this script to create the table; users get their row on their next
+write, and until then their version reads as 0
+"""
+
+from app import create_app, db
+from app.schema import upgrade_schema
+
+def migrate():
+    """Create user_data_versions"""
+    app = create_app()
+
+    with app.app_context():
+        print("Creating user_data_versions table...")
+        upgrade_schema()
+
+        print("✅ Migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,32 @@
+"""
+Migration script to add (user_id, date) indexes used by count-based stats
+Run this script to add the indexes to an existing database
+"""
+
+from app import create_app, db
+
+INDEXES = [
+    ('ix_mood_entries_user_created', 'mood_entries', 'user_id, created_at'),
+    ('ix_journal_entries_user_created', 'journal_entries', 'user_id, created_at'),
+    ('ix_exercise_sessions_user_date', 'exercise_sessions', 'user_id, session_date'),
+    ('ix_meditation_sessions_user_date', 'meditation_sessions', 'user_id, session_date'),
+    ('ix_breathing_methods_user_date', 'breathing_methods', 'user_id, session_date'),
+    ('ix_nutrition_entries_user_date', 'nutrition_entries', 'user_id, entry_date'),
+]
+
+def migrate():
+    """Create per-user date indexes on all tracker tables"""
+    app = create_app()
+
+    with app.app_context():
+        print("Adding per-user date indexes...")
+
+        for name, table, columns in INDEXES:
+            db.session.execute(db.text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+            print(f"- {name}")
+
+        db.session.commit()
+        print("✅ Migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks import query_budgets
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """The app create_app('testing') builds, on a throwaway SQLite database"""
+    return query_budgets.create_harness_app(str(tmp_path_factory.mktemp('app') / 'test.db'))
@@ -0,0 +1,30 @@
+"""The calendar is revalidated with If-None-Match instead of refetched"""
+
+import pytest
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    tokens = client.post('/api/auth/register', json={
+        'username': 'calendar_user', 'email': 'calendar_user@example.org', 'password': 'calendar-pass-1'
+    }).get_json()
+    client.environ_base['HTTP_AUTHORIZATION'] = f"Bearer {tokens['access_token']}"
+    return client
+
+
+def test_unchanged_calendar_is_not_modified(client):
+    first = client.get('/api/calendar')
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    assert first.headers['ETag']
+
+    second = client.get('/api/calendar', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
+    assert second.headers['Cache-Control'] == 'private, no-cache'
+    assert second.headers['ETag'] == first.headers['ETag']
+
+    client.post('/api/mood/', json={'mood_score': 6, 'mood_label': 'Calm'})
+    third = client.get('/api/calendar', headers={'If-None-Match': first.headers['ETag']})
+    assert third.status_code == 200
+    assert third.headers['ETag'] != first.headers['ETag']
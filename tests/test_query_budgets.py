@@ -0,0 +1,28 @@
+"""Runs the query-budget harness against the app create_app() builds
+
+Every API endpoint is called as a user with a short and a long history;
+the test fails on a missing or exceeded ``@query_budget``, on statements
+that grow with history and on server errors.
+"""
+
+import pytest
+
+from benchmarks import query_budgets
+
+
+@pytest.fixture(scope='module')
+def harness(app):
+    small = query_budgets.run_pass(app, 'budget_small', 5)
+    large = query_budgets.run_pass(app, 'budget_large', 60)
+    return app, small, large
+
+
+def test_endpoints_stay_within_query_budgets(harness):
+    failures = query_budgets.find_failures(*harness)
+    assert not failures, '\n'.join(failures)
+
+
+def test_every_endpoint_authenticates(harness):
+    app, small, large = harness
+    rejected = sorted(endpoint for endpoint, result in large.items() if result['status'] == 401)
+    assert not rejected, f"rejected the harness token: {', '.join(rejected)}"
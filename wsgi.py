@@ -0,0 +1,10 @@
+"""Production WSGI entry point
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import os
+
+from app import create_app
+
+app = create_app(os.environ.get('FLASK_CONFIG', 'production'))